@@ -0,0 +1,125 @@
+"""Per-command latency and Mongo round trips of /gamble, before and after.
+
+"before" replays the database calls the original gamble_helper made: every
+get_user_data was two full-document find_ones, called for the balance, the
+stats, inside the stats update and again for the footer, plus the $inc of
+the stats and a separate $set of the balance. "after" is the current
+gamble_helper, which does it all in one conditional find_one_and_update.
+
+It deletes and recreates one test user, so it refuses to run against
+ATLAS_URI; point it at a scratch server.
+
+    python -m benchmarks.gamble --uri mongodb://localhost:27017 --runs 500
+"""
+
+import argparse
+import os
+import statistics
+import time
+from types import SimpleNamespace
+
+from dotenv import load_dotenv
+from pymongo import monitoring
+
+TEST_USER_ID = 1
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def measure(label: str, command, runs: int, counter: CommandCounter):
+    timings = []
+    counter.count = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        command()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    median = statistics.median(timings)
+    commands = counter.count / runs
+    print(
+        f"{label:>6}: median {median:.2f} ms, "
+        f"p95 {timings[int(runs * 0.95) - 1]:.2f} ms, "
+        f"{commands:.1f} Mongo commands per gamble"
+    )
+    return median, commands
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--uri", required=True, help="A scratch MongoDB server")
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--amount", type=int, default=1)
+    args = parser.parse_args()
+    if args.uri == os.getenv("ATLAS_URI"):
+        parser.error("--uri is the production ATLAS_URI; use a scratch server")
+
+    # Every module builds its client from ATLAS_URI on import, so set it and
+    # the listener first; the listener only sees clients created after it
+    os.environ["ATLAS_URI"] = args.uri
+    counter = CommandCounter()
+    monitoring.register(counter)
+
+    from cogs.Games import collection, gamble_helper
+    from utils.ledger import flush_ledger
+    from utils.stats import balance_of_player
+
+    user = SimpleNamespace(id=TEST_USER_ID, mention="<@1>")
+    interaction = SimpleNamespace(user=user)
+    collection.delete_one({"_id": TEST_USER_ID})
+    balance_of_player(user)
+    collection.update_one({"_id": TEST_USER_ID}, {"$set": {"balance": 10**12}})
+
+    search = {"_id": TEST_USER_ID}
+
+    def get_user_data():
+        # The original looked the user up, then read the whole document again
+        collection.find_one(search)
+        return collection.find_one(search)
+
+    def before():
+        balance = get_user_data()["balance"]  # balance_of_player
+        get_user_data()  # gamble_stats
+        get_user_data()  # inside update_user_gamble_stats
+        collection.update_one(
+            search,
+            {
+                "$inc": {
+                    "gambles_won": 1,
+                    "gambles_total_winnings": args.amount,
+                    "gambles_played": 1,
+                }
+            },
+        )
+        collection.update_one(search, {"$set": {"balance": balance + args.amount}})
+        get_user_data()  # gamble_stats again for the footer
+
+    def after():
+        gamble_helper(interaction, args.amount, None)
+
+    try:
+        before_ms, before_commands = measure("before", before, args.runs, counter)
+        after_ms, after_commands = measure("after", after, args.runs, counter)
+        print(
+            f"after is {before_ms / after_ms:.1f}x faster at the median, with "
+            f"{before_commands - after_commands:.1f} fewer Mongo commands per gamble"
+        )
+    finally:
+        flush_ledger()
+        collection.delete_one({"_id": TEST_USER_ID})
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import asyncio
 import os
 from datetime import datetime
 
@@ -6,6 +7,9 @@ from discord.ext import commands
 from dotenv import load_dotenv
 from pyfiglet import figlet_format
 
+from utils.indexes import audit_query_coverage, ensure_indexes
+from utils.stats import migrate_user_documents
+
 # Load environment variables from .env file
 load_dotenv()
 TOKEN = os.getenv("TOKEN")
@@ -35,6 +39,14 @@ class MyBot(commands.Bot):
                 else:
                     print(f"Skipping {cog_name}...")
 
+        # Cogs declare their indexes on import; create them once they're all loaded
+        await asyncio.to_thread(ensure_indexes)
+        await asyncio.to_thread(audit_query_coverage)
+
+        migrated = await asyncio.to_thread(migrate_user_documents)
+        if migrated:
+            print(f"Migrated {migrated} user documents to the current schema")
+
     async def on_ready(self):
         print("------")
         print(f'\n{figlet_format("ButterBot", "standard")}')
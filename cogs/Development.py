@@ -2,6 +2,7 @@ import asyncio
 import os
 import platform
 import random
+import time
 from collections import defaultdict
 from datetime import datetime
 from typing import Literal, Optional
@@ -12,14 +13,16 @@ from discord import app_commands
 from discord.ext import commands, tasks
 from pymongo import MongoClient
 
+from utils.analytics import get_economy_health, refresh_economy_health
 from utils.logging import send_error_to_support_channel
-from utils.stats import get_user_data
+from utils.stats import get_user_data, sync_users
 
 GUILD_ID = 152954629993398272
 MONGO_URL = os.getenv("ATLAS_URI")
 cluster = MongoClient(MONGO_URL)
 db = cluster["Users"]
 collection = db["UserData"]
+duel_records = db["DuelRecords"]
 
 
 class Development(commands.Cog):
@@ -28,6 +31,7 @@ class Development(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
         self.my_background_task.start()
+        self.refresh_health_metrics.start()
 
     # Custom check to allow only the bot owner
     def is_owner_check(interaction: discord.Interaction) -> bool:
@@ -241,25 +245,38 @@ class Development(commands.Cog):
     @app_commands.check(is_owner_check)
     @app_commands.guilds(discord.Object(id=GUILD_ID))
     async def sync_all_users(self, interaction: discord.Interaction):
-        """Loops through all guilds and members to sync their stats."""
+        """Creates or upgrades the stats of every member across all guilds in bulk."""
         await interaction.response.send_message("⏳ Syncing all users' stats...")
 
-        updated = 0
-        failed = 0
+        # Members of several guilds are only synced once
+        user_ids = {
+            member.id
+            for guild in self.bot.guilds
+            for member in guild.members
+            if not member.bot
+        }
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+
+        def report(done: int, total: int):
+            # Called from the worker thread after every chunk
+            rate = done / max(time.perf_counter() - started, 1e-6)
+            asyncio.run_coroutine_threadsafe(
+                interaction.edit_original_response(
+                    content=f"⏳ Syncing all users' stats... {done:,}/{total:,} ({rate:,.0f} users/s)"
+                ),
+                loop,
+            )
 
-        for guild in self.bot.guilds:
-            for member in guild.members:
-                if member.bot:
-                    continue
-                try:
-                    get_user_data(member)  # This handles sync/init logic
-                    updated += 1
-                except Exception as e:
-                    print(f"[❌] Failed to sync {member.display_name}: {e}")
-                    failed += 1
+        counts = await asyncio.to_thread(sync_users, user_ids, progress=report)
+        elapsed = time.perf_counter() - started
 
         await interaction.followup.send(
-            f"✅ Synced stats for **{updated}** users\n❌ Failed for **{failed}** users"
+            f"✅ Synced stats for **{len(user_ids) - counts['failed']}** users "
+            f"in {elapsed:.1f}s ({len(user_ids) / max(elapsed, 1e-6):,.0f} users/s)\n"
+            f"🆕 Created **{counts['created']}**, ⬆️ upgraded **{counts['upgraded']}**, "
+            f"already current **{counts['up_to_date']}**\n"
+            f"❌ Failed for **{counts['failed']}** users"
         )
 
     def get_db_name(self, guild_id):
@@ -318,6 +335,87 @@ class Development(commands.Cog):
     async def before_my_task(self):
         await self.bot.wait_until_ready()
 
+    # Recompute the economy metrics so /economy_health never scans on demand
+    @tasks.loop(hours=1)
+    async def refresh_health_metrics(self):
+        try:
+            await asyncio.to_thread(refresh_economy_health)
+        except Exception as e:
+            print(f"[❌] Failed to refresh economy health: {e}")
+
+    @refresh_health_metrics.before_loop
+    async def before_refresh_health_metrics(self):
+        await self.bot.wait_until_ready()
+
+    def cog_unload(self):
+        self.my_background_task.cancel()
+        self.refresh_health_metrics.cancel()
+
+    @app_commands.command(
+        name="economy_health", description="Money supply and wealth distribution"
+    )
+    @app_commands.check(is_owner_check)
+    @app_commands.guilds(discord.Object(id=GUILD_ID))
+    async def economy_health(self, interaction: discord.Interaction):
+        metrics = await asyncio.to_thread(get_economy_health)
+        if not metrics:
+            await interaction.response.send_message(
+                "Economy metrics haven't been computed yet.", ephemeral=True
+            )
+            return
+
+        supply = metrics["supply"]
+        distribution = metrics["distribution"]
+        embed = discord.Embed(title="📈 Economy Health", color=discord.Color.gold())
+        embed.add_field(name="Users", value=f"{supply['users']:,}", inline=True)
+        embed.add_field(name="Wallets", value=f"${supply['balance']:,.2f}", inline=True)
+        embed.add_field(
+            name="Banks",
+            value=f"${supply['bank']:,.2f} ({supply['banked_users']:,} users)",
+            inline=True,
+        )
+        embed.add_field(
+            name="Money Supply",
+            value=f"${supply['balance'] + supply['bank']:,.2f}",
+            inline=False,
+        )
+        embed.add_field(
+            name="Last 24h",
+            value=(
+                f"Paid out ${metrics['paid_out_24h']:,.2f}\n"
+                f"Taken in ${metrics['taken_in_24h']:,.2f}"
+            ),
+            inline=True,
+        )
+        top_sources = sorted(
+            metrics["payouts"].items(),
+            key=lambda item: item[1]["paid_out"],
+            reverse=True,
+        )[:5]
+        embed.add_field(
+            name="Top Payout Sources",
+            value="\n".join(
+                f"{source}: ${totals['paid_out']:,.2f}"
+                for source, totals in top_sources
+            )
+            or "None",
+            inline=True,
+        )
+        embed.add_field(
+            name="Gini Coefficient", value=f"{distribution['gini']:.3f}", inline=False
+        )
+        embed.add_field(
+            name="Net Worth Percentiles",
+            value="\n".join(
+                f"p{percentile}: ${wealth:,.2f}"
+                for percentile, wealth in distribution["percentiles"].items()
+            ),
+            inline=False,
+        )
+        embed.set_footer(text="Computed")
+        embed.timestamp = metrics["computed_at"]
+        await interaction.response.send_message(embed=embed)
+
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
         """Ensure new member has a stat entry on join."""
@@ -333,16 +431,21 @@ class Development(commands.Cog):
     @app_commands.guilds(discord.Object(id=GUILD_ID))
     @app_commands.check(is_owner_check)
     async def reset_duel_stats(self, interaction: discord.Interaction):
-        result = collection.update_many(
+        result = duel_records.delete_many({})
+        collection.update_many(
             {},
             {
-                "$unset": {"duels_won": "", "duels_lost": "", "duels_tied": ""},
-                "$set": {"duel_stats": {}},
+                "$unset": {
+                    "duels_won": "",
+                    "duels_lost": "",
+                    "duels_tied": "",
+                    "duel_stats": "",
+                }
             },
         )
 
         await interaction.response.send_message(
-            f"🧹 Reset duel stats for `{result.modified_count}` users.", ephemeral=True
+            f"🧹 Deleted `{result.deleted_count}` duel records.", ephemeral=True
         )
 
 
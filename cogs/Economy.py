@@ -2,7 +2,7 @@ import asyncio
 import io
 import os
 import random
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 import discord
@@ -12,30 +12,55 @@ from discord import Interaction, Member, app_commands
 from discord.ext import commands, tasks
 from discord.ui import Button, View
 from dotenv import load_dotenv
-from pymongo import MongoClient
+from pymongo import ASCENDING, DESCENDING, MongoClient, UpdateOne
 import time
 
+from utils.cadence import captcha_threshold, record_click
 from utils.embeds import create_embed
+from utils.expedition import LEVEL_BONUS, LootTier, loot_tier, run_expedition
+from utils.highlow import (
+    HIGHLOW_TIMEOUT,
+    ODDS,
+    HighLowState,
+    checkpoint,
+    play,
+    settle,
+    settle_abandoned,
+    start,
+)
+from utils.history import snapshot_balances
+from utils.horserace import (
+    FRAME_INTERVAL,
+    HORSE_LETTERS,
+    payout_multiplier,
+    pick_frames,
+    render_track,
+    simulate,
+)
+from utils.indexes import uses_index
+from utils.leaderboard import get_leaderboard, global_rank, refresh_leaderboards
+from utils.ledger import compact_ledger, flush_ledger, record_balance_change
 from utils.stats import (
     balance_of_player,
     bank_stats,
     fish_stats,
     get_user_inventory,
     mine_stats,
-    roulette_stats,
     update_balance,
     update_user_bank_stats,
     update_user_duel_stats,
     update_user_fish_stats,
     update_user_heist_stats,
-    update_user_highlow_stats,
     update_user_mine_stats,
-    update_user_roulette_stats,
-    update_user_steal_stats,
+    record_game_result,
+    steal_stats_update,
+    transfer_balance,
     duel_stats,
+    duel_totals,
     apply_shop_item_effect,
-    get_user_data,
+    get_hot_user_data,
 )
+from utils.roulette import RouletteSession
 from utils.shop import SHOP_ITEMS
 
 load_dotenv()
@@ -55,6 +80,11 @@ class Economy(commands.Cog):
         self.active_duels = set()
         self.active_rps_players = set()
         self.add_interest.start()
+        self.flush_ledger_entries.start()
+        self.compact_ledger_entries.start()
+        self.snapshot_balance_history.start()
+        self.refresh_global_leaderboards.start()
+        self.settle_abandoned_highlow.start()
         self.active_mining_sessions = set()
         self.fishing_sessions = set()
 
@@ -83,36 +113,52 @@ class Economy(commands.Cog):
 
         if interaction.user.id == app.owner.id:
             balance += amount
-            collection.update_one({"_id": member.id}, {"$set": {"balance": balance}})
+            collection.update_one({"_id": member.id}, {"$inc": {"balance": amount}})
+            record_balance_change(member.id, amount, "owner_grant")
             await interaction.followup.send(f"{member.mention} now has ${balance:,.2f}")
         else:
-            prev_balance, user_balance = balance_of_player(interaction.user)
-            if amount > user_balance:
+            balances = transfer_balance(interaction.user, member, amount, source="give")
+            if balances is None:
+                prev_balance, user_balance = balance_of_player(interaction.user)
                 await interaction.followup.send(
                     f"{interaction.user.mention} is too broke to give away money - they only have ${user_balance:,.2f}"
                 )
             else:
-                balance += amount
-                collection.update_one(
-                    {"_id": member.id},
-                    {"$set": {"balance": balance}},
-                )
-                user_balance -= amount
-                collection.update_one(
-                    {"_id": interaction.user.id},
-                    {"$set": {"balance": user_balance}},
-                )
+                user_balance, balance = balances
                 await interaction.followup.send(
                     f"{member.mention} now has ${balance:,.2f}"
                 )
 
     @app_commands.command(name="mine", description="Mine ores for money")
-    async def mine(self, interaction: discord.Interaction):
+    @app_commands.describe(
+        expedition="Mine this many times at once and get a single summary"
+    )
+    async def mine(
+        self,
+        interaction: discord.Interaction,
+        expedition: Optional[app_commands.Range[int, 10, 500]] = None,
+    ):
         await interaction.response.defer(thinking=True)
         if interaction.user.id in self.active_mining_sessions:
             await interaction.followup.send("You are already mining!")
             return
 
+        if expedition:
+            ready_at = start_expedition(interaction.user, expedition)
+            if ready_at is not None:
+                await interaction.followup.send(
+                    f"You're still worn out from your last expedition! "
+                    f"Try again <t:{int(ready_at.replace(tzinfo=timezone.utc).timestamp())}:R>."
+                )
+                return
+            self.active_mining_sessions.add(interaction.user.id)
+            try:
+                embed = expedition_summary(interaction.user, "mining", expedition)
+            finally:
+                self.active_mining_sessions.discard(interaction.user.id)
+            await interaction.followup.send(embed=embed)
+            return
+
         (
             result,
             payout,
@@ -159,12 +205,35 @@ class Economy(commands.Cog):
         view.message = response_msg  # Set the message AFTER sending
 
     @app_commands.command(name="fish", description="Catch fish for money")
-    async def fish(self, interaction: discord.Interaction):
+    @app_commands.describe(
+        expedition="Fish this many times at once and get a single summary"
+    )
+    async def fish(
+        self,
+        interaction: discord.Interaction,
+        expedition: Optional[app_commands.Range[int, 10, 500]] = None,
+    ):
         await interaction.response.defer(thinking=True)
         if interaction.user.id in self.fishing_sessions:
             await interaction.followup.send("You are already fishing")
             return
 
+        if expedition:
+            ready_at = start_expedition(interaction.user, expedition)
+            if ready_at is not None:
+                await interaction.followup.send(
+                    f"You're still worn out from your last expedition! "
+                    f"Try again <t:{int(ready_at.replace(tzinfo=timezone.utc).timestamp())}:R>."
+                )
+                return
+            self.fishing_sessions.add(interaction.user.id)
+            try:
+                embed = expedition_summary(interaction.user, "fishing", expedition)
+            finally:
+                self.fishing_sessions.discard(interaction.user.id)
+            await interaction.followup.send(embed=embed)
+            return
+
         (
             result,
             payout,
@@ -220,12 +289,17 @@ class Economy(commands.Cog):
             return
 
         # Get player documents
-        thief_doc = collection.find_one({"_id": interaction.user.id}) or {
+        thief_doc = collection.find_one(
+            {"_id": interaction.user.id},
+            {"balance": 1, "last_steal": 1, "last_stolen": 1},
+        ) or {
             "_id": interaction.user.id,
             "balance": 1000,
             "last_steal": None,
         }
-        target_doc = collection.find_one({"_id": target.id}) or {
+        target_doc = collection.find_one(
+            {"_id": target.id}, {"balance": 1, "last_stolen": 1}
+        ) or {
             "_id": target.id,
             "balance": 0,
         }
@@ -318,67 +392,68 @@ class Economy(commands.Cog):
                 percent *= 0.1
             stolen_amount = int(target_balance * percent)
 
-            target_balance -= stolen_amount
-            thief_balance += stolen_amount
+            balances = transfer_balance(
+                target,
+                interaction.user,
+                stolen_amount,
+                source="steal",
+                sender_update=steal_stats_update(
+                    success=False,
+                    amount=stolen_amount,
+                    got_stolen=True,
+                    update_last_stolen=True,
+                ),
+                receiver_update=steal_stats_update(
+                    success=True,
+                    amount=stolen_amount,
+                    update_last_steal=True,
+                ),
+            )
+            if balances is None:
+                await interaction.followup.send(
+                    f"{target.mention} moved their money before you could grab it. Try again!"
+                )
+                return
 
             msg = random.choice(success_messages).format(
                 amount=stolen_amount, percent=percent * 100, target=target.mention
             )
             await interaction.followup.send(msg)
-
-            update_user_steal_stats(
-                interaction.user,
-                success=True,
-                amount=stolen_amount,
-                balance=thief_balance,
-                update_last_steal=True,
-            )
-
-            update_user_steal_stats(
-                target,
-                success=False,
-                amount=stolen_amount,
-                balance=target_balance,
-                got_stolen=True,
-                update_last_stolen=True,
-            )
         else:
             percent = random.uniform(0.10, 0.30)
             penalty = int(thief_balance * percent)
             actual_penalty = min(penalty, thief_balance)
 
-            thief_balance -= actual_penalty
-            target_balance += actual_penalty
+            # The thief pays the penalty to the target (they gain from the failed steal)
+            balances = transfer_balance(
+                interaction.user,
+                target,
+                actual_penalty,
+                source="steal_penalty",
+                sender_update=steal_stats_update(
+                    success=False,
+                    amount=actual_penalty,
+                    update_last_steal=True,
+                ),
+                receiver_update=steal_stats_update(
+                    success=False,
+                    amount=0,
+                    got_stolen=True,
+                    gained_on_fail=actual_penalty,
+                    update_last_stolen=True,
+                ),
+            )
+            if balances is None:
+                await interaction.followup.send(
+                    "Your balance changed mid-robbery. Try again!", ephemeral=True
+                )
+                return
 
             msg = random.choice(fail_messages).format(
                 penalty=actual_penalty, percent=percent * 100, target=target.mention
             )
             await interaction.followup.send(msg)
 
-            # Calculate the amount the target gains from the failed steal
-            gained_on_fail = actual_penalty
-
-            # Update the thief's stats for the failed steal
-            update_user_steal_stats(
-                interaction.user,
-                success=False,
-                amount=actual_penalty,
-                balance=thief_balance,
-                update_last_steal=True,
-                gained_on_fail=0,
-            )
-
-            # Update the target's stats (they gained from a failed steal)
-            update_user_steal_stats(
-                target,
-                success=False,
-                amount=0,
-                balance=target_balance,
-                got_stolen=True,
-                gained_on_fail=gained_on_fail,
-                update_last_stolen=True,
-            )
-
     @app_commands.command(
         name="daily", description="Claim your daily reward and keep your streak going!"
     )
@@ -389,7 +464,9 @@ class Economy(commands.Cog):
         now = datetime.utcnow()
 
         # Retrieve user from database or initialize if new
-        user = collection.find_one({"_id": user_id})
+        user = collection.find_one(
+            {"_id": user_id}, {"balance": 1, "daily_streak": 1, "last_daily": 1}
+        )
         if not user:
             user = {"_id": user_id, "balance": 0, "daily_streak": 0, "last_daily": None}
             collection.insert_one(user)
@@ -433,6 +510,7 @@ class Economy(commands.Cog):
                 }
             },
         )
+        record_balance_change(user_id, total_reward, "daily")
 
         await interaction.followup.send(
             f"✅ You claimed your daily reward of **${total_reward:,.2f}**!\n"
@@ -573,8 +651,12 @@ class Economy(commands.Cog):
             )
 
         # Fetch user balances (replace with actual DB queries)
-        challenger_data = collection.find_one({"_id": challenger.id}) or {"balance": 0}
-        challenged_data = collection.find_one({"_id": challenged.id}) or {"balance": 0}
+        challenger_data = collection.find_one(
+            {"_id": challenger.id}, {"balance": 1}
+        ) or {"balance": 0}
+        challenged_data = collection.find_one(
+            {"_id": challenged.id}, {"balance": 1}
+        ) or {"balance": 0}
 
         if challenger_data["balance"] < amount:
             return await interaction.response.send_message(
@@ -921,7 +1003,7 @@ class Economy(commands.Cog):
         new_balance, bank_cap, bank_level = update_user_bank_stats(
             interaction.user, amount, bank_cap, bank_level
         )
-        update_balance(interaction.user, balance - amount)
+        update_balance(interaction.user, balance - amount, source="deposit")
         await interaction.followup.send(
             f"Deposited ${amount:,.2f} into the bank. Current Bank Balance: ${new_balance:,.2f}"
         )
@@ -973,7 +1055,7 @@ class Economy(commands.Cog):
         new_balance, bank_cap, bank_level = update_user_bank_stats(
             interaction.user, -amount, bank_cap, bank_level
         )
-        update_balance(interaction.user, balance + amount)
+        update_balance(interaction.user, balance + amount, source="withdraw")
 
         await interaction.followup.send(
             f"Withdrew ${amount:,.2f} from the bank. Current Bank Balance: ${new_balance:,.2f}"
@@ -1032,7 +1114,7 @@ class Economy(commands.Cog):
             return
 
         # Deduct money and apply the effect of the item
-        update_balance(user, balance - cost)
+        update_balance(user, balance - cost, source="shop")
         apply_shop_item_effect(user, item_key)
 
         await interaction.followup.send(
@@ -1067,21 +1149,49 @@ class Economy(commands.Cog):
             )
             return
 
-        user_id = interaction.user.id
-        user_data = collection.find_one({"_id": user_id}) or {"balance": 1000}
-        balance = user_data.get("balance", 0)
-
+        # The only balance read of the session; spins keep it current
+        _, balance = balance_of_player(interaction.user)
         if amount > balance:
             await interaction.response.send_message(
                 "❌ You don't have enough balance!", ephemeral=True
             )
             return
 
-        view = RouletteButtons(interaction.user, amount, balance)
+        view = RouletteButtons(RouletteSession(interaction.user, amount, balance))
         await interaction.response.send_message(
             f"🎯 Choose your color to bet **{amount:,.2f}** coins!", view=view
         )
 
+    @app_commands.command(
+        name="highlow", description="Guess if the next number is higher or lower"
+    )
+    @app_commands.describe(amount="How much to bet")
+    async def highlow(self, interaction: Interaction, amount: int):
+        if amount <= 0:
+            await interaction.response.send_message(
+                "❌ Bet must be more than 0.", ephemeral=True
+            )
+            return
+
+        state = await asyncio.to_thread(start, interaction.user, amount)
+        if state is None:
+            # Either too poor, in a game already, or no account yet
+            _, balance = await asyncio.to_thread(balance_of_player, interaction.user)
+            if amount <= balance:
+                state = await asyncio.to_thread(start, interaction.user, amount)
+        if state is None:
+            await interaction.response.send_message(
+                "❌ You don't have enough balance, or already have a game going!",
+                ephemeral=True,
+            )
+            return
+
+        view = HighLowView(interaction.user, state)
+        await interaction.response.send_message(
+            f"🎯 Betting **${amount:,.2f}** on HighLow!\n{view.prompt()}", view=view
+        )
+        view.message = await interaction.original_response()
+
     @app_commands.command(
         name="rps", description="Play Rock Paper Scissors vs bot or another player"
     )
@@ -1141,51 +1251,98 @@ class Economy(commands.Cog):
 
     @app_commands.command(name="horserace", description="Start a horse race!")
     @app_commands.describe(
-        horses="Number of horses (2-5 recommended)",
+        horses="Number of horses (2-5)",
         length="Track length (default is 10)",
+        bet="How much to bet on your horse",
+        horse="The horse you're betting on",
+    )
+    @app_commands.choices(
+        horse=[
+            app_commands.Choice(name=f"Horse {letter}", value=letter)
+            for letter in HORSE_LETTERS
+        ]
     )
     async def horserace(
-        self, interaction: discord.Interaction, horses: int = 3, length: int = 10
+        self,
+        interaction: discord.Interaction,
+        horses: app_commands.Range[int, 2, 5] = 3,
+        length: app_commands.Range[int, 5, 30] = 10,
+        bet: Optional[app_commands.Range[int, 1]] = None,
+        horse: Optional[str] = None,
     ):
-        if not (2 <= horses <= 5):
+        if (bet is None) != (horse is None):
             await interaction.response.send_message(
-                "Please choose between 2 and 5 horses."
+                "Pick both a bet and a horse to bet on.", ephemeral=True
+            )
+            return
+        if horse is not None and HORSE_LETTERS.index(horse) >= horses:
+            await interaction.response.send_message(
+                f"Horse {horse} isn't in a {horses} horse race.", ephemeral=True
             )
             return
 
         await interaction.response.defer()
-        horse_names = [f"Horse {chr(65+i)}" for i in range(horses)]
-        positions = [0 for _ in range(horses)]
-
-        def build_track():
-            track = "🏁" + ("-" * length) + "\n"
-            for i, pos in enumerate(positions):
-                blocks = "🟩" * pos + "⬜" * (length - pos)
-                track += f"🐴 {chr(65+i)}: {blocks}\n"
-            return track
-
-        message = await interaction.followup.send(
-            f"Race starting...\n\n{build_track()}"
+        if bet is not None:
+            # The stake is taken now, so it can't be moved away mid-race
+            taken = await asyncio.to_thread(take_race_bet, interaction.user, bet)
+            if not taken:
+                # Either too poor or no account yet; reading the balance creates one
+                _, balance = await asyncio.to_thread(
+                    balance_of_player, interaction.user
+                )
+                if bet <= balance:
+                    taken = await asyncio.to_thread(
+                        take_race_bet, interaction.user, bet
+                    )
+            if not taken:
+                await interaction.followup.send(
+                    f"❌ You don't have enough balance to bet ${bet:,.2f}!"
+                )
+                return
+
+        # The race is decided before it's shown; playback only picks a few frames
+        positions, winner = simulate(horses, length)
+        frames = pick_frames(len(positions))
+        bet_text = (
+            f"\n💵 {interaction.user.mention} bet ${bet:,.2f} on Horse {horse}"
+            if bet
+            else ""
         )
 
-        winner = None
-        while not winner:
-            await asyncio.sleep(1)
-            for i in range(horses):
-                positions[i] += random.choice([0, 1])  # slow but steady
-                if positions[i] >= length:
-                    winner = i
-            await message.edit(content=f"{build_track()}")
+        result_text = f"🏆 **Horse {HORSE_LETTERS[winner]} wins!**"
+        try:
+            message = await interaction.followup.send(
+                f"Race starting...{bet_text}\n\n{render_track(positions[0], length)}"
+            )
+
+            # Edits are scheduled against the start time so slow ones don't add up
+            started = time.monotonic()
+            for shown, frame in enumerate(frames[1:-1], 1):
+                await asyncio.sleep(
+                    max(0, started + shown * FRAME_INTERVAL - time.monotonic())
+                )
+                await message.edit(content=render_track(positions[frame], length))
+        finally:
+            # A held stake is settled even if the playback fails
+            if bet is not None:
+                result_text += "\n" + await asyncio.to_thread(
+                    settle_race_bet, interaction.user, bet, horse, horses, winner
+                )
 
+        await asyncio.sleep(
+            max(0, started + (len(frames) - 1) * FRAME_INTERVAL - time.monotonic())
+        )
         await message.edit(
-            content=f"{build_track()}\n🏆 **Horse {chr(65+winner)} wins!**"
+            content=f"{render_track(positions[-1], length)}\n{result_text}"
         )
 
     # Task to add 5% interest to everyone's bank account
     @tasks.loop(hours=6)  # this will run the task every 6 hours
+    @uses_index(collection, [("bank", DESCENDING)], query={"bank": {"$gt": 0}})
     async def add_interest(self):
         print("[Bank Interest] Adding interest to all bank accounts...")
-        users = collection.find({"bank": {"$exists": True, "$ne": 0}})
+        users = collection.find({"bank": {"$gt": 0}}, {"bank": 1})
+        updates = []
         for user in users:
             user_id = user["_id"]
             bank_balance = user["bank"]
@@ -1193,7 +1350,10 @@ class Economy(commands.Cog):
             new_balance = round(bank_balance + interest)
 
             # Update the user's bank balance
-            collection.update_one({"_id": user_id}, {"$set": {"bank": new_balance}})
+            updates.append(UpdateOne({"_id": user_id}, {"$set": {"bank": new_balance}}))
+
+        if updates:
+            collection.bulk_write(updates, ordered=False)
 
     @add_interest.before_loop
     async def before_add_interest(self):
@@ -1201,34 +1361,186 @@ class Economy(commands.Cog):
         print("[Bank Interest] Waiting before first interest application...")
         await asyncio.sleep(21600)  # 6 hours in seconds
 
+    # Write queued ledger entries in batches
+    @tasks.loop(seconds=30)
+    async def flush_ledger_entries(self):
+        # A failed batch stays queued; let the loop retry it rather than die
+        try:
+            await asyncio.to_thread(flush_ledger)
+        except Exception as e:
+            print(f"[Ledger] Failed to flush ledger entries: {e}")
+
+    # Roll old ledger entries into daily snapshots
+    @tasks.loop(hours=24)
+    async def compact_ledger_entries(self):
+        snapshots = await asyncio.to_thread(compact_ledger)
+        print(f"[Ledger] Compacted old entries into {snapshots} daily snapshots")
+
+    @compact_ledger_entries.before_loop
+    async def before_compact_ledger_entries(self):
+        await self.bot.wait_until_ready()
+
+    # Record yesterday's balance and bank for everyone who was active
+    @tasks.loop(hours=24)
+    async def snapshot_balance_history(self):
+        users = await asyncio.to_thread(snapshot_balances)
+        print(f"[History] Snapshotted balances for {users} active users")
+
+    @snapshot_balance_history.before_loop
+    async def before_snapshot_balance_history(self):
+        await self.bot.wait_until_ready()
+
+    # Every process runs this; the lease in utils.leaderboard lets one refresh
+    @tasks.loop(minutes=5)
+    async def refresh_global_leaderboards(self):
+        try:
+            await asyncio.to_thread(refresh_leaderboards)
+        except Exception as e:
+            print(f"[Leaderboard] Failed to refresh global leaderboards: {e}")
+
+    @refresh_global_leaderboards.before_loop
+    async def before_refresh_global_leaderboards(self):
+        await self.bot.wait_until_ready()
+
+    # HighLow views die with their process (restart, crash, another bot
+    # process); cash out games whose view would have timed out by now
+    @tasks.loop(minutes=1)
+    async def settle_abandoned_highlow(self):
+        try:
+            settled = await asyncio.to_thread(settle_abandoned)
+        except Exception as e:
+            print(f"[HighLow] Failed to settle abandoned games: {e}")
+            return
+        if settled:
+            print(f"[HighLow] Cashed out {settled} abandoned games")
+
     def cog_unload(self):
-        """Stop the task when the cog is unloaded."""
+        """Stop the tasks when the cog is unloaded."""
         self.add_interest.cancel()
+        self.flush_ledger_entries.cancel()
+        self.compact_ledger_entries.cancel()
+        self.snapshot_balance_history.cancel()
+        self.refresh_global_leaderboards.cancel()
+        self.settle_abandoned_highlow.cancel()
+        flush_ledger()
 
     @app_commands.command(
         name="leaderboard",
         description="Show the richest members or top miners/fishers of your server",
     )
+    @app_commands.describe(scope="Rank this server only or every user of the bot")
     @app_commands.choices(
+        scope=[
+            app_commands.Choice(name="Server", value="server"),
+            app_commands.Choice(name="Global", value="global"),
+        ],
         type=[
             app_commands.Choice(name="Balance", value="balance"),
             app_commands.Choice(name="Mining", value="mining"),
             app_commands.Choice(name="Fishing", value="fishing"),
             app_commands.Choice(name="Bank", value="bank"),
             app_commands.Choice(name="Duels", value="total_amount_won"),  # 👈 Added
-        ]
+        ],
     )
+    @uses_index(collection, [("_id", ASCENDING)], query={"_id": {"$in": [0]}})
+    @uses_index(collection, [("balance", DESCENDING)])
+    @uses_index(collection, [("bank", DESCENDING)])
+    @uses_index(collection, [("mining_level", DESCENDING)])
+    @uses_index(collection, [("fishing_level", DESCENDING)])
     async def leaderboard(
-        self, interaction: discord.Interaction, type: app_commands.Choice[str]
+        self,
+        interaction: discord.Interaction,
+        type: app_commands.Choice[str],
+        scope: Optional[app_commands.Choice[str]] = None,
     ):
         await interaction.response.defer(thinking=True)
+        title_map = {
+            "balance": "Wealth",
+            "bank": "Bank",
+            "fishing": "Fishing",
+            "mining": "Mining",
+            "duel_wins": "Duel Wins",
+            "total_amount_won": "Net Amount Won",  # Added label for new leaderboard type
+        }
+
+        def build_pages(title: str, ranked: list, footer: str = "") -> list:
+            pages = []
+            page_count = 1
+            count = 0
+
+            embed = discord.Embed(title=title)
+            embed.set_footer(
+                text=f"Page {page_count}{footer}",
+                icon_url=interaction.user.display_avatar,
+            )
+
+            for name, value in ranked:
+                if type.value in ["balance", "bank"]:
+                    field_value = f"${value:,.2f}"
+                elif type.value == "duel_wins":
+                    field_value = f"{value} Wins"
+                elif type.value == "total_amount_won":  # Show the total amount won
+                    field_value = f"${value:,.2f}"
+                else:
+                    field_value = f"Level {value}/99"
+
+                embed.add_field(
+                    name=f"{count + 1}. {name}", value=field_value, inline=False
+                )
+                count += 1
+
+                if count % 10 == 0:
+                    pages.append(embed)
+                    page_count += 1
+                    embed = discord.Embed(title=title)
+                    embed.set_footer(
+                        text=f"Page {page_count}{footer}",
+                        icon_url=interaction.user.display_avatar,
+                    )
+
+            if count % 10 != 0:
+                pages.append(embed)
+
+            return pages
+
+        async def generate_global_pages():
+            # Served from the shared top-N cache; only the caller's rank is live
+            cached = await asyncio.to_thread(get_leaderboard, type.value)
+            rank = await asyncio.to_thread(global_rank, interaction.user.id, type.value)
+            ranked = []
+            for entry in cached["entries"]:
+                user = self.bot.get_user(entry["user_id"])
+                name = user.name if user else f"User {entry['user_id']}"
+                ranked.append((name, entry["value"]))
+
+            age = int((datetime.utcnow() - cached["computed_at"]).total_seconds() // 60)
+            footer = f" • Updated {age}m ago"
+            if rank:
+                footer += f" • Your rank: #{rank:,}"
+            return build_pages(
+                f"Global {title_map[type.value]} Leaderboard", ranked, footer
+            )
 
         async def generate_pages():
             members = interaction.guild.members
             member_ids = [m.id for m in members]
             id_to_name = {m.id: m.nick or m.name for m in members}
 
-            docs = collection.find({"_id": {"$in": member_ids}})
+            if type.value in ("duel_wins", "total_amount_won"):
+                # Duel records live in their own collection, summed per user
+                docs = [
+                    {"_id": uid, **totals}
+                    for uid, totals in duel_totals(member_ids).items()
+                ]
+            else:
+                # Only pull the field this leaderboard ranks on
+                projection = {
+                    "balance": {"balance": 1},
+                    "bank": {"bank": 1},
+                    "mining": {"mining_level": 1},
+                    "fishing": {"fishing_level": 1},
+                }[type.value]
+                docs = collection.find({"_id": {"$in": member_ids}}, projection)
             top_members = {}
 
             for doc in docs:
@@ -1236,12 +1548,7 @@ class Economy(commands.Cog):
                 if type.value == "balance":
                     value = doc.get("balance", 0)
                 elif type.value == "duel_wins":
-                    duel_stats = doc.get("duel_stats", {})
-                    value = sum(
-                        opponent_stats.get("win", 0)
-                        for opponent_stats in duel_stats.values()
-                        if isinstance(opponent_stats, dict)
-                    )
+                    value = doc.get("win", 0)
                     if value == 0:
                         continue
                 elif type.value == "fishing":
@@ -1257,18 +1564,7 @@ class Economy(commands.Cog):
                     if value == 0:
                         continue
                 elif type.value == "total_amount_won":  # Total amount won leaderboard
-                    duel_stats = doc.get("duel_stats", {})
-                    total_won = sum(
-                        opponent_stats.get("amount_won", 0)
-                        for opponent_stats in duel_stats.values()
-                        if isinstance(opponent_stats, dict)
-                    )
-                    total_lost = sum(
-                        opponent_stats.get("amount_lost", 0)
-                        for opponent_stats in duel_stats.values()
-                        if isinstance(opponent_stats, dict)
-                    )
-                    value = total_won - total_lost
+                    value = doc.get("amount_won", 0) - doc.get("amount_lost", 0)
                     if value <= 0:
                         continue
 
@@ -1276,56 +1572,16 @@ class Economy(commands.Cog):
                 if name:
                     top_members[name] = value
 
-            sorted_members = dict(
-                sorted(top_members.items(), key=lambda item: item[1], reverse=True)
+            sorted_members = sorted(
+                top_members.items(), key=lambda item: item[1], reverse=True
             )
-
-            pages = []
-            page_count = 1
-            count = 0
-            title_map = {
-                "balance": "Wealth",
-                "bank": "Bank",
-                "fishing": "Fishing",
-                "mining": "Mining",
-                "duel_wins": "Duel Wins",
-                "total_amount_won": "Net Amount Won",  # Added label for new leaderboard type
-            }
-            title = f"{interaction.guild.name} {title_map[type.value]} Leaderboard"
-
-            embed = discord.Embed(title=title)
-            embed.set_footer(
-                text=f"Page {page_count}", icon_url=interaction.user.display_avatar
+            return build_pages(
+                f"{interaction.guild.name} {title_map[type.value]} Leaderboard",
+                sorted_members,
             )
 
-            for name, value in sorted_members.items():
-                if type.value in ["balance", "bank"]:
-                    field_value = f"${value:,.2f}"
-                elif type.value == "duel_wins":
-                    field_value = f"{value} Wins"
-                elif type.value == "total_amount_won":  # Show the total amount won
-                    field_value = f"${value:,.2f}"
-                else:
-                    field_value = f"Level {value}/99"
-
-                embed.add_field(
-                    name=f"{count + 1}. {name}", value=field_value, inline=False
-                )
-                count += 1
-
-                if count % 10 == 0:
-                    pages.append(embed)
-                    page_count += 1
-                    embed = discord.Embed(title=title)
-                    embed.set_footer(
-                        text=f"Page {page_count}",
-                        icon_url=interaction.user.display_avatar,
-                    )
-
-            if count % 10 != 0:
-                pages.append(embed)
-
-            return pages
+        if scope and scope.value == "global":
+            generate_pages = generate_global_pages
 
         pages = await generate_pages()
         if not pages:  # If no pages were generated, send a message saying so
@@ -1338,6 +1594,11 @@ class Economy(commands.Cog):
         name="stealstatus",
         description="List all users with active steal protection cooldowns.",
     )
+    @uses_index(
+        collection,
+        [("last_stolen", DESCENDING)],
+        query={"last_stolen": {"$gt": datetime(1970, 1, 1)}},
+    )
     async def stealstatus(self, interaction: Interaction):
         await interaction.response.defer(thinking=True)
 
@@ -1348,7 +1609,11 @@ class Economy(commands.Cog):
         member_ids = [m.id for m in members]
         id_to_name = {m.id: m.nick or m.name for m in members}
 
-        cursor = collection.find({"last_stolen": {"$ne": None}})
+        # Only users robbed within the cooldown window can still be protected
+        cursor = collection.find(
+            {"last_stolen": {"$gt": now - timedelta(seconds=cooldown_seconds)}},
+            {"last_stolen": 1},
+        )
         users_on_cooldown = {}
 
         for doc in cursor:
@@ -1469,7 +1734,11 @@ class StealStatusButton(discord.ui.View):
         member_ids = [m.id for m in members]
         id_to_name = {m.id: m.nick or m.name for m in members}
 
-        cursor = collection.find({"last_stolen": {"$ne": None}})
+        # Only users robbed within the cooldown window can still be protected
+        cursor = collection.find(
+            {"last_stolen": {"$gt": now - timedelta(seconds=cooldown_seconds)}},
+            {"last_stolen": 1},
+        )
         users_on_cooldown = {}
 
         for doc in cursor:
@@ -1479,6 +1748,8 @@ class StealStatusButton(discord.ui.View):
             remaining = cooldown_seconds - elapsed.total_seconds()
 
             if remaining > 0:
+                if uid not in id_to_name:
+                    continue  # skip users not in the current guild
                 name = id_to_name.get(uid)
                 users_on_cooldown[name] = remaining
 
@@ -1614,7 +1885,9 @@ class HeistButtonView(discord.ui.View):
 
     def check_balance(self, user: discord.User):
         """Checks if the user has enough balance to participate in the heist."""
-        user_data = collection.find_one({"_id": user.id}) or {"balance": 0}
+        user_data = collection.find_one({"_id": user.id}, {"balance": 1}) or {
+            "balance": 0
+        }
         balance = user_data.get("balance", 0)
 
         settings = self.get_settings()
@@ -1626,7 +1899,9 @@ class HeistButtonView(discord.ui.View):
 
     def get_scaled_amount(self, user: discord.User):
         """Scales the reward/penalty based on the player's balance."""
-        user_data = collection.find_one({"_id": user.id}) or {"balance": 0}
+        user_data = collection.find_one({"_id": user.id}, {"balance": 1}) or {
+            "balance": 0
+        }
         balance = user_data.get("balance", 0)
 
         settings = self.get_settings()
@@ -1695,7 +1970,9 @@ class HeistButtonView(discord.ui.View):
             stolen_total = 0
 
             for user in self.participants:
-                user_data = collection.find_one({"_id": user.id}) or {"balance": 0}
+                user_data = collection.find_one({"_id": user.id}, {"balance": 1}) or {
+                    "balance": 0
+                }
                 balance = user_data.get("balance", 0)
 
                 if user == backstabber:
@@ -1714,9 +1991,9 @@ class HeistButtonView(discord.ui.View):
                     f"🩸 {user.mention} was betrayed and lost **${stolen_amount:,.2f}**!"
                 )
 
-            backstabber_data = collection.find_one({"_id": backstabber.id}) or {
-                "balance": 0
-            }
+            backstabber_data = collection.find_one(
+                {"_id": backstabber.id}, {"balance": 1}
+            ) or {"balance": 0}
             backstabber_balance = backstabber_data.get("balance", 0)
             backstabber_balance += stolen_total
 
@@ -1734,7 +2011,9 @@ class HeistButtonView(discord.ui.View):
                 )[0]
                 scaled_amount = self.get_scaled_amount(user)
 
-                user_data = collection.find_one({"_id": user.id}) or {"balance": 0}
+                user_data = collection.find_one({"_id": user.id}, {"balance": 1}) or {
+                    "balance": 0
+                }
                 balance = user_data.get("balance", 0)
 
                 if result == "win":
@@ -1796,11 +2075,149 @@ class DuelAcceptView(discord.ui.View):
         self.stop()
 
 
+# Loot tables for a 0-101 roll; the single-click and expedition paths share them
+MINING_LOOT = (
+    LootTier("hazard", 4, (0, 0), (50, 100)),
+    LootTier("common block", 19, (50, 100), (0, 0)),
+    LootTier("common ore", 59, (100, 150), (0, 0)),
+    LootTier("uncommon ore", 79, (150, 250), (0, 0)),
+    LootTier("rare ore", 94, (250, 500), (0, 0)),
+    LootTier("epic ore", 100, (500, 750), (0, 0)),
+    LootTier("epic loot", 101, (1500, 2000), (0, 0)),
+)
+FISHING_LOOT = (
+    LootTier("trash", 4, (0, 0), (25, 75)),
+    LootTier("common fish", 24, (25, 100), (0, 0)),
+    LootTier("uncommon fish", 59, (100, 200), (0, 0)),
+    LootTier("rare fish", 89, (200, 400), (0, 0)),
+    LootTier("epic fish", 100, (400, 750), (0, 0)),
+    LootTier("legendary haul", 101, (1500, 2000), (0, 0)),
+)
+# Payout bonus for the best tool of each material in the inventory
+PICKAXE_BONUSES = {
+    "wood": 0.05,
+    "stone": 0.10,
+    "copper": 0.25,
+    "iron": 1,
+    "emerald": 1.5,
+    "gold": 2.5,
+    "ruby": 3.5,
+    "diamond": 5,
+    "amethyst": 7.5,
+    "netherite": 10,
+}
+FISHING_ROD_BONUSES = PICKAXE_BONUSES
+
+
+def best_tool(inventory: list, tool: str, bonuses: dict) -> tuple[str, float]:
+    """Return the material and bonus of the best `tool` in the inventory."""
+    best, highest_bonus = "fist", 0.0
+    for item in inventory:
+        item_name = item["name"].lower()
+        for material, bonus in bonuses.items():
+            if item_name == f"{material} {tool}" and bonus > highest_bonus:
+                best, highest_bonus = material, bonus
+    return best, highest_bonus
+
+
+EXPEDITIONS = {
+    "mining": (MINING_LOOT, "pickaxe", PICKAXE_BONUSES, "⛏️"),
+    "fishing": (FISHING_LOOT, "fishing rod", FISHING_ROD_BONUSES, "🎣"),
+}
+# An expedition locks out further ones for about as long as clicking it out would
+# take. Mining and fishing share the lock, so one can't be run during the other's.
+EXPEDITION_SECONDS_PER_ACTION = 3
+
+
+def start_expedition(user: discord.User, actions: int) -> Optional[datetime]:
+    """Claim the user's expedition cooldown in one write.
+
+    Returns None if it was free and is now held for `actions` actions, or
+    when the current cooldown ends.
+    """
+    now = datetime.utcnow()
+
+    def claim() -> bool:
+        result = collection.update_one(
+            {"_id": user.id, "expedition_ready_at": {"$not": {"$gt": now}}},
+            {
+                "$set": {
+                    "expedition_ready_at": now
+                    + timedelta(seconds=actions * EXPEDITION_SECONDS_PER_ACTION)
+                }
+            },
+        )
+        return bool(result.modified_count)
+
+    if claim():
+        return None
+    # Either on cooldown or no account yet; reading the user creates one
+    ready_at = get_hot_user_data(user, ("expedition_ready_at",)).get(
+        "expedition_ready_at"
+    )
+    if (ready_at is None or ready_at <= now) and claim():
+        return None
+    return ready_at or now
+
+
+def expedition_summary(user: discord.User, skill: str, actions: int) -> discord.Embed:
+    """Resolve an expedition, store it with one write and describe it in an embed."""
+    loot, tool, bonuses, icon = EXPEDITIONS[skill]
+    user_data = get_hot_user_data(user, ("inventory",))
+    tool_type, tool_bonus = best_tool(user_data.get("inventory", []), tool, bonuses)
+    level_before = user_data.get(f"{skill}_level", 1)
+
+    result = run_expedition(loot, actions, user_data.get(f"{skill}_xp", 0), tool_bonus)
+    if skill == "mining":
+        new_level, xp, xp_needed, reward_message = update_user_mine_stats(
+            user, result["xp_gain"], result["balance_change"], user_data
+        )
+    else:
+        new_level, xp, xp_needed, reward_message = update_user_fish_stats(
+            user, result["xp_gain"], result["balance_change"]
+        )
+
+    net = result["balance_change"]
+    best_tier, best_amount = result["best"]
+    finds = "\n".join(
+        f"{name.title()}: {count}" for name, count in result["tiers"].items() if count
+    )
+    level = f"{level_before} → {new_level}" if new_level != level_before else new_level
+    return create_embed(
+        title=f"{icon} {skill.title()} Expedition",
+        description=(
+            f"{user.mention} went {skill} **{actions}** times.\n"
+            f"💰 New Balance: ${user_data.get('balance', 0) + net:,.2f}\n"
+            f"{reward_message}"
+        ),
+        color=discord.Color.green() if net >= 0 else discord.Color.red(),
+        fields=[
+            ("Earned", f"${result['earned']:,.2f}", True),
+            ("Lost", f"${result['lost']:,.2f}", True),
+            ("Net", f"${net:,.2f}", True),
+            ("Level Bonus", f"${result['level_bonus']:,.2f}", True),
+            (
+                f"{tool.title()} Bonus ({tool_type.title()})",
+                f"${result['tool_bonus']:,.2f}",
+                True,
+            ),
+            ("Best Find", f"{best_tier.title()} (${best_amount:,.2f})", True),
+            ("Finds", finds, False),
+            (
+                "Progress",
+                f"**Level:** {level}\n**XP:** {xp} (+{result['xp_gain']})\n"
+                f"**XP Needed for Next Level:** {xp_needed}",
+                False,
+            ),
+        ],
+    )
+
+
 async def run_mining_logic(user: discord.User, user_data: dict = None) -> tuple:
 
     # Only fetch user_data if not passed in
     if user_data is None:
-        user_data = get_user_data(user)  # ONE database call if needed
+        user_data = get_hot_user_data(user, ("inventory",))
 
     common_blocks = [
         "dirt",
@@ -1867,84 +2284,34 @@ async def run_mining_logic(user: discord.User, user_data: dict = None) -> tuple:
     current_level = stats["mining_level"]
     current_xp = stats["mining_xp"]
     choice = random.randint(0, 101)
-    mining_result = ""
-    payout = 0
-    loss = 0
+    tier = loot_tier(MINING_LOOT, choice)
+    payout = random.randint(*tier.payout) if tier.payout[1] else 0
+    loss = random.randint(*tier.loss) if tier.loss[1] else 0
 
-    if choice < 5:
+    if tier.name == "epic loot":
+        mining_result = f"epic loot: {random.choice(epic_ores)}, {random.choice(rare_ores)}, {random.choice(uncommon_ores)}, {random.choice(common_ores)}, and {random.choice(common_blocks)}"
+    else:
         mining_result = random.choice(
-            [
-                "a creeper ambush 💥",
-                "a lava block under your feet 😱",
-                "an empty cave...",
-                "a trap chest full of TNT 🎁💣",
-                "nothing but disappointment...",
-            ]
+            {
+                "hazard": [
+                    "a creeper ambush 💥",
+                    "a lava block under your feet 😱",
+                    "an empty cave...",
+                    "a trap chest full of TNT 🎁💣",
+                    "nothing but disappointment...",
+                ],
+                "common block": common_blocks,
+                "common ore": common_ores,
+                "uncommon ore": uncommon_ores,
+                "rare ore": rare_ores,
+                "epic ore": epic_ores,
+            }[tier.name]
         )
-        loss = random.randint(50, 100)
-        payout = 0
-    elif choice < 20:
-        payout = random.randint(50, 100)
-        mining_result = random.choice(common_blocks)
-    elif choice < 60:
-        payout = random.randint(100, 150)
-        mining_result = random.choice(common_ores)
-    elif choice < 80:
-        payout = random.randint(150, 250)
-        mining_result = random.choice(uncommon_ores)
-    elif choice < 95:
-        payout = random.randint(250, 500)
-        mining_result = random.choice(rare_ores)
-    elif choice <= 100:
-        payout = random.randint(500, 750)
-        mining_result = random.choice(epic_ores)
-    elif choice == 101:
-        payout = random.randint(1500, 2000)
-        mining_result = f"epic loot: {random.choice(epic_ores)}, {random.choice(rare_ores)}, {random.choice(uncommon_ores)}, {random.choice(common_ores)}, and {random.choice(common_blocks)}"
-
-    pickaxe_types = [
-        "wood",
-        "stone",
-        "copper",
-        "iron",
-        "emerald",
-        "gold",
-        "ruby",
-        "diamond",
-        "amethyst",
-        "netherite",
-    ]
-    PICKAXE_BONUSES = {
-        "wood": 0.05,
-        "stone": 0.10,
-        "copper": 0.25,
-        "iron": 1,
-        "emerald": 1.5,
-        "gold": 2.5,
-        "ruby": 3.5,
-        "diamond": 5,
-        "amethyst": 7.5,
-        "netherite": 10,
-    }
 
-    best_pickaxe = "fist"
-    highest_bonus = 0.0
-
-    for item in inventory:
-        pickaxe_name = item["name"].lower()
-        for ptype in pickaxe_types:
-            if pickaxe_name == f"{ptype} pickaxe":
-                bonus = PICKAXE_BONUSES.get(ptype, 0)
-                if bonus > highest_bonus:
-                    highest_bonus = bonus
-                    best_pickaxe = ptype
-
-    pickaxe = best_pickaxe
-    pickaxe_bonus_percentage = highest_bonus
+    pickaxe, pickaxe_bonus_percentage = best_tool(inventory, "pickaxe", PICKAXE_BONUSES)
 
     xp_gain = random.randint(5, 10)
-    bonus_percentage = 0.02
-    level_bonus = int(payout * bonus_percentage * current_level)
+    level_bonus = int(payout * LEVEL_BONUS * current_level)
     pickaxe_bonus = int(payout * pickaxe_bonus_percentage)
     total_payout = payout + level_bonus + pickaxe_bonus
 
@@ -1984,7 +2351,7 @@ class MineAgainView(discord.ui.View):
         super().__init__(timeout=300)
         self.user = user
         self.click_count = 0
-        self.user_data = get_user_data(user)  # Cached once
+        self.user_data = get_hot_user_data(user, ("inventory",))  # Cached once
         self.buffered_updates = {"xp_gain": 0, "balance_change": 0}
         self._flush_task = asyncio.create_task(self.background_flusher())
         self.mining_sessions = mining_sessions
@@ -2053,8 +2420,9 @@ class MineAgainView(discord.ui.View):
             return
         await interaction.response.defer()
         self.click_count += 1
+        record_click(self.user.id)
 
-        if self.click_count >= self.click_threshold:
+        if self.click_count >= captcha_threshold(self.user.id, self.click_threshold):
             self.captcha = True
             button.disabled = True
             self.correct_color = random.choice(["Red", "Green", "Blue"])
@@ -2181,7 +2549,7 @@ async def run_fishing_logic(
 ) -> tuple[str, int, int, int, int, int, int, int]:
     # Only fetch user_data if not passed in
     if user_data is None:
-        user_data = get_user_data(user)  # ONE database call if needed
+        user_data = get_hot_user_data(user, ("inventory",))
 
     common_fish = [
         "cod",
@@ -2238,76 +2606,33 @@ async def run_fishing_logic(
     current_xp = user_data["fishing_xp"]
 
     choice = random.randint(0, 101)
-    fishing_result = ""
-    payout = 0
-    loss = 0
+    tier = loot_tier(FISHING_LOOT, choice)
+    payout = random.randint(*tier.payout) if tier.payout[1] else 0
+    loss = random.randint(*tier.loss) if tier.loss[1] else 0
 
     # Chance-based fishing outcomes
-    if choice < 5:
-        fishing_result = random.choice(trash)
-        loss = random.randint(25, 75)
-    elif choice < 25:
-        payout = random.randint(25, 100)
-        fishing_result = random.choice(common_fish)
-    elif choice < 60:
-        payout = random.randint(100, 200)
-        fishing_result = random.choice(uncommon_fish)
-    elif choice < 90:
-        payout = random.randint(200, 400)
-        fishing_result = random.choice(rare_fish)
-    elif choice <= 100:
-        payout = random.randint(400, 750)
-        fishing_result = random.choice(epic_fish)
-    elif choice == 101:
-        payout = random.randint(1500, 2000)
+    if tier.name == "legendary haul":
         fishing_result = f"legendary haul: {random.choice(epic_fish)}, {random.choice(rare_fish)}, {random.choice(uncommon_fish)}, and {random.choice(common_fish)}"
+    else:
+        fishing_result = random.choice(
+            {
+                "trash": trash,
+                "common fish": common_fish,
+                "uncommon fish": uncommon_fish,
+                "rare fish": rare_fish,
+                "epic fish": epic_fish,
+            }[tier.name]
+        )
 
     # Fishing Rod Bonuses
     inventory = user_data["inventory"]
-    fishing_rod_types = [
-        "wood",
-        "stone",
-        "copper",
-        "iron",
-        "emerald",
-        "gold",
-        "ruby",
-        "diamond",
-        "amethyst",
-        "netherite",
-    ]
-    FISHING_ROD_BONUSES = {
-        "wood": 0.05,
-        "stone": 0.10,
-        "copper": 0.25,
-        "iron": 1,
-        "emerald": 1.5,
-        "gold": 2.5,
-        "ruby": 3.5,
-        "diamond": 5,
-        "amethyst": 7.5,
-        "netherite": 10,
-    }
-
-    best_rod = "fist"
-    highest_bonus = 0.0
-
-    for item in inventory:
-        item_name = item["name"].lower()  # Assuming 'name' key exists in item
-        for rod_type in fishing_rod_types:
-            if item_name == f"{rod_type} fishing rod":
-                bonus = FISHING_ROD_BONUSES.get(rod_type, 0)
-                if bonus > highest_bonus:
-                    highest_bonus = bonus
-                    best_rod = rod_type  # Update to the highest bonus rod
-
-    fishing_rod = best_rod
-    fishing_rod_bonus_percentage = highest_bonus
+    fishing_rod, fishing_rod_bonus_percentage = best_tool(
+        inventory, "fishing rod", FISHING_ROD_BONUSES
+    )
 
     # Calculate XP and bonuses
     xp_gain = random.randint(5, 10)
-    bonus_percentage = 0.02
-    level_bonus = int(payout * bonus_percentage * current_level)
+    level_bonus = int(payout * LEVEL_BONUS * current_level)
     fishing_rod_bonus = int(payout * fishing_rod_bonus_percentage)
     total_payout = payout + level_bonus + fishing_rod_bonus
 
@@ -2341,7 +2666,7 @@ class FishAgainView(discord.ui.View):
         super().__init__(timeout=300)
         self.user = user
         self.click_count = 0
-        self.user_data = get_user_data(user)  # Cached once
+        self.user_data = get_hot_user_data(user, ("inventory",))  # Cached once
         self.buffered_updates = {"xp_gain": 0, "balance_change": 0}
         self._flush_task = asyncio.create_task(self.background_flusher())
         self.fishing_sessions = fishing_sessions
@@ -2405,8 +2730,9 @@ class FishAgainView(discord.ui.View):
             return
         await interaction.response.defer()
         self.click_count += 1
+        record_click(self.user.id)
 
-        if self.click_count >= self.click_threshold:
+        if self.click_count >= captcha_threshold(self.user.id, self.click_threshold):
             button.disabled = True
             self.captcha = True
             self.correct_color = random.choice(["Red", "Green", "Blue"])
@@ -2524,17 +2850,52 @@ class FishAgainView(discord.ui.View):
             )
 
 
+def take_race_bet(user: discord.User, bet: int) -> bool:
+    """Hold a horse race stake for the length of the race, if the user covers it."""
+    result = collection.update_one(
+        {"_id": user.id, "balance": {"$gte": bet}}, {"$inc": {"balance": -bet}}
+    )
+    if not result.modified_count:
+        return False
+    record_balance_change(user.id, -bet, "horserace")
+    return True
+
+
+def settle_race_bet(
+    user: discord.User, bet: int, horse: str, horses: int, winner: int
+) -> str:
+    """Record a held horse race bet, paying out the stake and winnings on a win."""
+    if HORSE_LETTERS[winner] == horse:
+        payout = int(bet * payout_multiplier(horses))
+        result, amount = "win", payout - bet
+    else:
+        payout = 0
+        result, amount = "lose", bet
+
+    updated = record_game_result(
+        user,
+        "horserace",
+        result,
+        amount,
+        return_fields=("balance",),
+        balance_change=payout,
+    )
+    if payout:
+        record_balance_change(user.id, payout, "horserace")
+    if result == "win":
+        return f"💰 {user.mention} won ${amount:,.2f}! New balance: ${updated['balance']:,.2f}"
+    return (
+        f"💸 {user.mention} lost ${bet:,.2f}. New balance: ${updated['balance']:,.2f}"
+    )
+
+
 class HighLowView(View):
-    def __init__(self, user: discord.User, wager: int, start_number: int):
-        super().__init__(timeout=60)
+    def __init__(self, user: discord.User, state: HighLowState):
+        super().__init__(timeout=HIGHLOW_TIMEOUT.total_seconds())
         self.user = user
-        self.wager = wager
-        self.current_number = start_number
-        self.multiplier = 1.0
-        self.round = 1
-        self.is_active = True
-        self.cashout_enabled = False  # Disable Cash Out on the first round
-        self.win = ""
+        # Mirrors the checkpoint on the user document; see utils.highlow
+        self.state = state
+        self.message = None
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
         if interaction.user.id != self.user.id:
@@ -2544,59 +2905,53 @@ class HighLowView(View):
             return False
         return True
 
-    def get_win_chance(self, guess: str) -> float:
-        if guess == "higher":
-            return (100 - self.current_number) / 99
-        else:
-            return (self.current_number - 1) / 99
-
-    def get_multiplier(self, win_chance: float) -> float:
-        house_edge = 0.95  # 5% house edge
-        return round((1 / win_chance) * house_edge, 2)
-
-    def generate_next_number(self) -> int:
-        return random.randint(1, 100)
-
-    async def handle_guess(self, interaction: discord.Interaction, guess: str):
-        if not self.is_active:
-            return
-
-        next_number = self.generate_next_number()
-        correct = (guess == "higher" and next_number > self.current_number) or (
-            guess == "lower" and next_number < self.current_number
+    def prompt(self) -> str:
+        number = self.state.number
+        higher, lower = ODDS["higher"][number], ODDS["lower"][number]
+        return (
+            f"🎲 The number is **{number}** (1–100)\n"
+            f"⬆️ Higher: {higher[0]:.0%} chance, x{higher[1]:.2f}\n"
+            f"⬇️ Lower: {lower[0]:.0%} chance, x{lower[1]:.2f}"
         )
 
-        win_chance = self.get_win_chance(guess)
-        current_mult = self.get_multiplier(win_chance)
-        self.cashout_enabled = True  # Enable Cash Out after the first guess
-        self.children[2].disabled = False  # The 'Cash Out' button is at index 2
-
-        if correct:
-            self.multiplier *= current_mult
-            self.current_number = next_number
-            self.round += 1
+    async def handle_guess(self, interaction: discord.Interaction, guess: str):
+        previous = self.state
+        state, correct, next_number = play(previous, guess)
 
-            await interaction.response.edit_message(
-                content=(  # Update message with new information
-                    f"✅ You guessed **{guess}** and the next number was **{next_number}**.\n"
-                    f"🎯 Current multiplier: **x{self.multiplier:.2f}**\n"
-                    f"🎲 New number is **{self.current_number}** (1–100)\n"
-                    f"Do you want to continue or cash out?"
-                ),
-                view=self,  # The updated view with enabled cashout button
-            )
-            self.win = "win"
-        else:
-            self.is_active = False
+        if not correct:
             self.stop()
+            if await asyncio.to_thread(settle, self.user, previous, True) is None:
+                await interaction.response.edit_message(
+                    content="This game was already settled.", view=None
+                )
+                return
             await interaction.response.edit_message(
                 content=(
                     f"❌ The next number was **{next_number}**. You guessed **{guess}** and lost.\n"
-                    f"You lost your **${self.wager:,.2f}** bet."
+                    f"You lost your **${previous.wager:,.2f}** bet."
                 ),
                 view=None,  # Disable all buttons after losing
             )
-            self.win = "lose"
+            return
+
+        if not await asyncio.to_thread(checkpoint, self.user, previous, state):
+            self.stop()
+            await interaction.response.edit_message(
+                content="This game was already settled.", view=None
+            )
+            return
+
+        self.state = state
+        self.cashout.disabled = False  # Cash Out opens after the first right guess
+        await interaction.response.edit_message(
+            content=(
+                f"✅ You guessed **{guess}** and the next number was **{next_number}**.\n"
+                f"🎯 Current multiplier: **x{state.multiplier:.2f}**\n"
+                f"{self.prompt()}\n"
+                f"Do you want to continue or cash out?"
+            ),
+            view=self,
+        )
 
     @discord.ui.button(label="Higher", style=discord.ButtonStyle.success)
     async def higher(self, interaction: discord.Interaction, button: Button):
@@ -2610,94 +2965,74 @@ class HighLowView(View):
         label="Cash Out 💰", style=discord.ButtonStyle.primary, disabled=True
     )
     async def cashout(self, interaction: discord.Interaction, button: Button):
-        if not self.cashout_enabled:
-            return
-
-        # Disable Cash Out button after use
-        self.is_active = False
         self.stop()
-
-        # Retrieve the player's previous balance and calculate the winnings
-        prev_balance, balance = balance_of_player(self.user)
-        winnings = int(self.wager * self.multiplier)
-
-        # Update the player's balance with the winnings
-        update_balance(self.user, balance + winnings)
-        update_user_highlow_stats(self.user, self.win, winnings, self.multiplier)
+        payout = await asyncio.to_thread(settle, self.user, self.state)
+        if payout is None:
+            await interaction.response.edit_message(
+                content="This game was already settled.", view=None
+            )
+            return
 
         await interaction.response.edit_message(
             content=(
-                f"💰 You cashed out with a multiplier of **x{self.multiplier:.2f}**!\n"
-                f"You won **${winnings:,.2f}** from your original bet of **${self.wager:,.2f}**."
+                f"💰 You cashed out with a multiplier of **x{self.state.multiplier:.2f}**!\n"
+                f"You won **${payout:,.2f}** from your original bet of **${self.state.wager:,.2f}**."
+            ),
+            view=None,
+        )
+
+    async def on_timeout(self):
+        # Walking away cashes out rather than forfeiting the wager
+        payout = await asyncio.to_thread(settle, self.user, self.state)
+        if payout is None or self.message is None:
+            return
+        await self.message.edit(
+            content=(
+                f"⌛ Timed out and cashed out at **x{self.state.multiplier:.2f}** "
+                f"for **${payout:,.2f}**."
             ),
             view=None,
         )
 
 
 class RouletteButtons(discord.ui.View):
-    def __init__(self, user: discord.User, amount: int, balance: int):
+    """Color buttons stay live after a spin, so playing again is one click."""
+
+    def __init__(self, session: RouletteSession):
         super().__init__(timeout=300)
-        self.user = user
-        self.amount = amount
-        self.balance = balance
+        self.session = session
 
-    async def handle_spin(self, interaction: Interaction, chosen_color: str):
-        if interaction.user.id != self.user.id:
+    async def interaction_check(self, interaction: Interaction) -> bool:
+        if interaction.user.id != self.session.user.id:
             await interaction.response.send_message(
                 "❌ This isn't your game!", ephemeral=True
             )
-            return
+            return False
+        return True
 
-        # Initial response with "Spinning..." message
-        embed = discord.Embed(
-            title="🎰 Spinning...",
-            description="The wheel is spinning!",
-            color=discord.Color.gold(),
-        )
-        embed.set_footer(text="Hold tight!")
-        await interaction.response.edit_message(embed=embed)
-        prev_balance = self.balance
-        # Simulate the spinning wheel effect with a delay
-        colors = ["red", "black", "green"]
-        # for _ in range(5):  # Spin animation loop
-        #     print("test")
-        #     spin_result = random.choice(colors)
-        #     color_map = {
-        #         "red": discord.Color.red(),
-        #         "black": discord.Color.dark_gray(),
-        #         "green": discord.Color.green(),
-        #     }
-        #     embed.description = f"🎰 Spinning... {spin_result.upper()}!"
-        #     embed.color = color_map[spin_result]
-        #     await interaction.edit_original_response(embed=embed)
-        #     # await interaction.response.edit_message(embed=embed)
-        #     await asyncio.sleep(1)  # Change the spin every 100ms
-
-        # Final result
-        roll = random.choices(
-            population=["red", "black", "green"], weights=[18, 18, 2], k=1
-        )[0]
-
-        win = roll == chosen_color
-        payout = 0
+    async def handle_spin(self, interaction: Interaction, chosen_color: str):
+        outcome = self.session.play(chosen_color)
+        if outcome is None:
+            self.stop()
+            await interaction.response.edit_message(
+                content=(
+                    f"❌ You don't have enough balance to play again.\n"
+                    f"Required: {self.session.amount:,.2f}, Your Balance: {self.session.balance:,.2f}"
+                ),
+                embed=None,
+                view=None,
+            )
+            return
 
-        if win:
-            if chosen_color in ["red", "black"]:
-                payout = self.amount * 2
-            else:
-                payout = self.amount * 14
-            self.balance += payout - self.amount
-            result = f"🎉 It landed on **{roll.upper()}**! You won **{payout-self.amount:,.2f}** coins!"
-            update_user_roulette_stats(self.user, "win", payout - self.amount)
+        roll, change, counters = outcome
+        # From the write itself, in case the balance moved between spins
+        prev_balance = self.session.balance - change
+        if change > 0:
+            result = (
+                f"🎉 It landed on **{roll.upper()}**! You won **{change:,.2f}** coins!"
+            )
         else:
-            self.balance -= self.amount
-            result = f"💀 It landed on **{roll.upper()}**. You lost **{self.amount:,.2f}** coins."
-            update_user_roulette_stats(self.user, "lose", self.amount)
-
-        # Update database
-        collection.update_one(
-            {"_id": self.user.id}, {"$set": {"balance": self.balance}}, upsert=True
-        )
+            result = f"💀 It landed on **{roll.upper()}**. You lost **{-change:,.2f}** coins."
 
         color_map = {
             "red": discord.Color.red(),
@@ -2709,31 +3044,21 @@ class RouletteButtons(discord.ui.View):
         )
 
         embed.add_field(name="Prev Balance", value=f"${prev_balance:,.2f}", inline=True)
-        embed.add_field(name="New Balance", value=f"${self.balance:,.2f}", inline=True)
-        result_value = (
-            f"+${abs(self.balance - prev_balance):,.2f}"
-            if self.balance >= prev_balance
-            else f"-${abs(self.balance - prev_balance):,.2f}"
+        embed.add_field(
+            name="New Balance", value=f"${self.session.balance:,.2f}", inline=True
         )
+        result_value = f"+${change:,.2f}" if change >= 0 else f"-${-change:,.2f}"
         roulette_won, roulette_lost, roulette_played, total_winnings, total_losses = (
-            roulette_stats(self.user).values()
+            counters.values()
         )
 
         embed.add_field(name="Result", value=f"{result_value}", inline=True)
         embed.set_footer(
             text=f"{roulette_won} roulette won, {roulette_lost} roulette lost, {roulette_played} roulette played"
+            f" - pick a color to play again"
         )
 
-        for child in self.children:
-            child.disabled = True
-
-        # Add "Play Again" button
-        play_again_button = PlayAgainButton(self.user, self.amount, self.balance)
-        self.add_item(play_again_button)
-
-        # Final edit of the message with result and view
-        await interaction.edit_original_response(embed=embed, view=self)
-        # await interaction.response.edit_message(embed=embed, view=self)
+        await interaction.response.edit_message(content=None, embed=embed, view=self)
 
     @discord.ui.button(label="🟥 Red", style=discord.ButtonStyle.danger)
     async def red_button(self, interaction: Interaction, button: discord.ui.Button):
@@ -2748,38 +3073,6 @@ class RouletteButtons(discord.ui.View):
         await self.handle_spin(interaction, "green")
 
 
-class PlayAgainButton(discord.ui.Button):
-    def __init__(self, user: discord.User, amount: int, balance: int):
-        super().__init__(label="Play Again", style=discord.ButtonStyle.green)
-        self.user = user
-        self.amount = amount
-        self.balance = balance
-
-    async def callback(self, interaction: Interaction):
-        if interaction.user.id != self.user.id:
-            await interaction.response.send_message(
-                "❌ This isn't your game!", ephemeral=True
-            )
-            return
-
-        # Check if user has enough balance to play again
-        _, current_balance = balance_of_player(interaction.user)
-        if current_balance < self.amount:
-            await interaction.response.send_message(
-                f"❌ You don't have enough balance to play again.\nRequired: {self.amount:,.2f}, Your Balance: {current_balance:,.2f}",
-                ephemeral=True,
-            )
-            return
-
-        # Restart the game
-        view = RouletteButtons(self.user, self.amount, current_balance)
-        await interaction.response.edit_message(
-            content=f"🎯 Choose your color to bet **{self.amount:,.2f}** coins!",
-            view=view,
-        )
-        self.view.stop()
-
-
 class RPSView(discord.ui.View):
     def __init__(self, challenger, opponent, amount, is_bot):
         super().__init__(timeout=300)
@@ -2811,10 +3104,10 @@ class RPSView(discord.ui.View):
 
             prev, current = balance_of_player(player)
             if result == "win":
-                update_balance(player, current + self.amount)
+                update_balance(player, current + self.amount, source="rps")
                 desc += f"You **won** 💸 {self.amount} coins!"
             elif result == "lose":
-                update_balance(player, current - self.amount)
+                update_balance(player, current - self.amount, source="rps")
                 desc += f"You **lost** 🥲 {self.amount} coins!"
             else:
                 desc += "It's a **tie**! Bet refunded."
@@ -2837,14 +3130,14 @@ class RPSView(discord.ui.View):
             if result == "tie":
                 embed.description = "It's a **tie**! No coins exchanged."
             elif result == "p1":
-                update_balance(self.challenger, c_bal + self.amount)
-                update_balance(self.opponent, o_bal - self.amount)
+                update_balance(self.challenger, c_bal + self.amount, source="rps")
+                update_balance(self.opponent, o_bal - self.amount, source="rps")
                 embed.description = (
                     f"{self.challenger.mention} wins 💰 {self.amount} coins!"
                 )
             else:
-                update_balance(self.challenger, c_bal - self.amount)
-                update_balance(self.opponent, o_bal + self.amount)
+                update_balance(self.challenger, c_bal - self.amount, source="rps")
+                update_balance(self.opponent, o_bal + self.amount, source="rps")
                 embed.description = (
                     f"{self.opponent.mention} wins 💰 {self.amount} coins!"
                 )
@@ -1,28 +1,32 @@
+import asyncio
 import os
 import random
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Literal, Optional
 
+import aiohttp
 import discord
-import requests
-from bs4 import BeautifulSoup
+import numpy as np
 from discord import app_commands
 from discord.app_commands import Choice
 from discord.ext import commands
-from discord.ui import Button, View
 from dotenv import load_dotenv
-from pymongo import MongoClient
-
+from pymongo import ASCENDING, MongoClient, ReturnDocument
+
+from utils.blackjack import Hand, Shoe, play_dealer, settle
+from utils.indexes import uses_index
+from utils.ledger import record_balance_change
+from utils.sessions import SessionStore
+from utils.slots import OUTCOMES, payouts, render_board, spin
+from utils.steam import SteamError, fetch_app
 from utils.stats import (
     balance_of_player,
-    blackjack_stats,
-    gamble_stats,
-    slots_stats,
-    update_user_blackjack_stats,
-    update_user_gamble_stats,
-    update_user_slots_stats,
-    wordle_stats,
+    game_counters,
+    record_game_batch,
+    record_game_result,
 )
+from utils.wordle import CORRECT, PRESENT, is_word, random_word, score_guess
 
 load_dotenv()
 GAMES = os.getenv("GAMES")
@@ -30,6 +34,12 @@ MONGO_URL = os.getenv("ATLAS_URI")
 cluster = MongoClient(MONGO_URL)
 db = cluster["Users"]
 collection = db["UserData"]
+wordle_sessions = db["WordleSessions"]
+
+# Channels with a blackjack shoe kept; older ones get a fresh shoe next time
+MAX_SHOES = 1000
+# Wordle games are dropped after this long without a guess
+WORDLE_TIMEOUT = timedelta(minutes=10)
 
 
 class Games(commands.Cog):
@@ -37,17 +47,31 @@ class Games(commands.Cog):
 
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
-        self.games = {}  # Dictionary to track the games for each user
+        # Wordle game per user, persisted so games survive a reload or restart
+        self.games = SessionStore(
+            WORDLE_TIMEOUT, max_sessions=10000, collection=wordle_sessions
+        )
+        # Blackjack shoe for each channel, least recently used dropped first
+        self.shoes: OrderedDict[int, Shoe] = OrderedDict()
+
+    @uses_index(wordle_sessions, [("expires_at", ASCENDING)], expireAfterSeconds=0)
+    async def cog_load(self):
+        restored = self.games.restore(WordleGame.from_document)
+        # The guess button has a fixed custom_id, so old game messages keep working
+        self.bot.add_view(WordleView(self.games))
+        if restored:
+            print(f"Restored {restored} Wordle games")
+
+    def channel_shoe(self, channel_id: int) -> Shoe:
+        """Return the channel's shoe, only building (and shuffling) one if it has none."""
+        shoe = self.shoes.pop(channel_id, None) or Shoe()
+        self.shoes[channel_id] = shoe
+        if len(self.shoes) > MAX_SHOES:
+            self.shoes.popitem(last=False)
+        return shoe
 
     def cleanup_old_games(self):
-        now = datetime.utcnow()
-        expired_users = [
-            user_id
-            for user_id, game in self.games.items()
-            if now - game.created_at > timedelta(minutes=10)
-        ]
-        for user_id in expired_users:
-            del self.games[user_id]
+        for user_id, game in self.games.expire():
             print(f"Removed stale Wordle game for user {user_id}")
 
     @app_commands.command(name="wordle", description="Start a Wordle-like game")
@@ -56,22 +80,13 @@ class Games(commands.Cog):
         user_id = interaction.user.id
 
         # Check if the user is already in a game
-        if user_id in self.games:
-            original_message_link = (
-                f"https://discord.com/channels/{self.games[user_id].message.guild.id}/"
-                f"{self.games[user_id].message.channel.id}/{self.games[user_id].message.id}"
-            )
+        game = self.games.get(user_id)
+        if game:
             await interaction.response.send_message(
-                f"You are already in an active Wordle game! [View your current game]({original_message_link})"
+                f"You are already in an active Wordle game! [View your current game]({game.jump_url})"
             )
             return
 
-        # Start a new game for the user
-        self.games[user_id] = WordleGame()
-        button = Button(label="Make a Guess", style=discord.ButtonStyle.primary)
-        view = View(timeout=None)
-        view.add_item(button)
-
         # Send the welcome message with the button
         await interaction.response.send_message(
             "Welcome to Wordle! The game has started. Try to guess the 5-letter word.\n"
@@ -79,31 +94,13 @@ class Games(commands.Cog):
             "**Bold Letter** means the letter is correct and in the correct position.\n"
             "__Underlined__ means the letter is correct but in the wrong position.\n"
             "~~Letters~~ means the letter is incorrect.\n",
-            view=view,
+            view=WordleView(self.games),
         )
 
-        message = await interaction.original_response()
-        self.games[user_id].message = message
-
-        # Assign the button's callback function to open the modal
-        async def on_button_click(interaction: discord.Interaction):
-            if interaction.user.id != user_id:
-                await interaction.response.send_message(
-                    "Not your game. Type `/wordle` to start a new game.", ephemeral=True
-                )
-            if user_id not in self.games:
-                await interaction.response.send_message(
-                    "You don't have an active game. Type `/wordle` to start a new game."
-                )
-                return
-
-            # Create and send the modal
-            modal = GuessModal(
-                user_id=user_id, game=self.games[user_id], games=self.games
-            )
-            await interaction.response.send_modal(modal)
-
-        button.callback = on_button_click
+        # Start a new game for the user, tied to the message with its button
+        game = WordleGame()
+        game.bind(await interaction.original_response())
+        self.games.add(user_id, game)
 
     @app_commands.command(
         name="games", description="Provide the google sheet links to games"
@@ -138,83 +135,57 @@ class Games(commands.Cog):
         notes: Optional[str] = "No Notes",
     ):
         """Easy embed for games download"""
+        await interaction.response.defer(thinking=True)
         try:
-            # bs4 to parse through steam link for data
-            url = steam_link
-            response = requests.get(url, timeout=100)
-            soup = BeautifulSoup(response.text, features="html.parser")
-            genres = ""
-            for index, genre in enumerate(soup.find_all(class_="app_tag")):
-                if index >= 5:
-                    break
-                if genre.contents[0].strip() == "+":
-                    continue
-                genres += f"`{genre.contents[0].strip()}` "
-
-            title = soup.select_one('div[class="apphub_AppName"]').contents[0]
-            description = soup.find("meta", property="og:description")["content"]
-            image = soup.find("meta", property="og:image")["content"]
-            if soup.select_one('div[class="discount_original_price"]'):
-                original_price = soup.select_one(
-                    'div[class="discount_original_price"]'
-                ).contents[0]
-                discounted_price = soup.select_one(
-                    'div[class="discount_final_price"]'
-                ).contents[0]
-                price = f"~~{original_price}~~\n{discounted_price}"
-            else:
-                if soup.select_one('div[class="game_purchase_price price"]'):
-                    price = soup.select_one(
-                        'div[class="game_purchase_price price"]'
-                    ).contents[0]
-                else:
-                    price = "N/A"
-            reviews = soup.find("meta", itemprop="reviewCount")["content"]
-            reviews_description = soup.find("span", itemprop="description").contents[0]
-            app_id = soup.find("meta", property="og:url")["content"].split("/")[4]
-            build_link = f"https://steamdb.info/app/{app_id}/patchnotes/"
-            embed = discord.Embed(
-                title=f"{add} - {title}",
-                color=0x336EFF,
-                url=steam_link,
-                description=f"[Build {build}]({build_link})" if build else "",
-            )
-            embed.add_field(
-                name="Direct Download Link",
-                value=f"[Click Here]({download_link})",
-                inline=False,
-            )
-            embed.add_field(
-                name="Full Games List", value=f"[Click Here]({GAMES})", inline=False
-            )
-            embed.add_field(
-                name="Steam Link", value=f"[Click Here]({steam_link})", inline=False
-            )
-            request_link = "https://forms.gle/d1K2NBLfJBqoSsv59"
-            embed.add_field(
-                name="Have a request?",
-                value=f"[Click Here]({request_link})",
-                inline=False,
-            )
-            embed.add_field(
-                name="Description", value=f"```{description}```", inline=False
-            )
-            embed.add_field(name="Notes", value=f"```{notes}```", inline=False)
-            embed.add_field(name="Price", value=f"{price}", inline=True)
-            embed.add_field(
-                name="Reviews", value=f"{reviews_description} ({reviews})", inline=True
-            )
-            embed.add_field(name="App Id", value=f"{app_id}", inline=True)
-            embed.add_field(name="Genres", value=f"{genres}", inline=False)
-            embed.set_image(url=image)
-            embed.timestamp = datetime.now()
-            embed.set_footer(
-                text=f"{interaction.user}", icon_url=interaction.user.avatar
-            )
-        except Exception as e:
+            app = await fetch_app(steam_link)
+        except (SteamError, aiohttp.ClientError, asyncio.TimeoutError) as e:
             print(e)
+            await interaction.followup.send(
+                f"Couldn't load the Steam page: {e}", ephemeral=True
+            )
             return
-        await interaction.response.send_message(embed=embed)
+
+        genres = "".join(f"`{tag}` " for tag in app.tags)
+        build_link = f"https://steamdb.info/app/{app.app_id}/patchnotes/"
+        embed = discord.Embed(
+            title=f"{add} - {app.title}",
+            color=0x336EFF,
+            url=steam_link,
+            description=f"[Build {build}]({build_link})" if build else "",
+        )
+        embed.add_field(
+            name="Direct Download Link",
+            value=f"[Click Here]({download_link})",
+            inline=False,
+        )
+        embed.add_field(
+            name="Full Games List", value=f"[Click Here]({GAMES})", inline=False
+        )
+        embed.add_field(
+            name="Steam Link", value=f"[Click Here]({steam_link})", inline=False
+        )
+        request_link = "https://forms.gle/d1K2NBLfJBqoSsv59"
+        embed.add_field(
+            name="Have a request?",
+            value=f"[Click Here]({request_link})",
+            inline=False,
+        )
+        embed.add_field(
+            name="Description", value=f"```{app.description}```", inline=False
+        )
+        embed.add_field(name="Notes", value=f"```{notes}```", inline=False)
+        embed.add_field(name="Price", value=f"{app.price}", inline=True)
+        embed.add_field(
+            name="Reviews",
+            value=f"{app.reviews} ({app.review_count:,})",
+            inline=True,
+        )
+        embed.add_field(name="App Id", value=f"{app.app_id}", inline=True)
+        embed.add_field(name="Genres", value=f"{genres}", inline=False)
+        embed.set_image(url=app.image)
+        embed.timestamp = datetime.now()
+        embed.set_footer(text=f"{interaction.user}", icon_url=interaction.user.avatar)
+        await interaction.followup.send(embed=embed)
 
     @app_commands.command(
         name="gamble", description="Chance to win or lose money - Default $100"
@@ -262,93 +233,62 @@ class Games(commands.Cog):
         collection.update_one(
             {"_id": interaction.user.id}, {"$set": {"balance": balance}}
         )
+        record_balance_change(interaction.user.id, -amount, "blackjack")
 
-        # 4) Build initial deal embed
-        embed = discord.Embed(title="Blackjack", description=f"${amount:,.2f} bet")
-
-        # Dealer: one face‑up, one covered
-        card1 = random_card()
-        dealer_cards = [[card1[1], "⬛"], card1[0]]
-        dealer_total = dealer_cards[1]
-        if card1[1] == "🇦":
-            dealer_label = f"{dealer_total}/{dealer_total+10}"
-        else:
-            dealer_label = str(dealer_total)
-        embed.add_field(
-            name=f"Dealer's Hand — {dealer_label}",
-            value=f"{dealer_cards[0][0]} {dealer_cards[0][1]}",
-            inline=False,
-        )
+        # 4) Deal from this channel's shoe: dealer shows one card, player gets two
+        shoe = self.channel_shoe(interaction.channel_id)
+        shoe.start_round()
+        dealer = Hand(shoe.deal())
+        player = Hand(shoe.deal(), shoe.deal())
 
-        # Player: two cards
-        card1, card2 = random_card(), random_card()
-        player_cards = [[card1[1], card2[1]], card1[0] + card2[0]]
-        p_total = player_cards[1]
-        if "🇦" in player_cards[0]:
-            player_label = f"{p_total}/{p_total+10}"
-        else:
-            player_label = str(p_total)
-        embed.add_field(
-            name=f"Player's Hand — {player_label}",
-            value=f"{player_cards[0][0]} {player_cards[0][1]}",
-            inline=False,
-        )
+        embed = discord.Embed(title="Blackjack", description=f"${amount:,.2f} bet")
+        render_hands(embed, dealer, player, hole=True)
 
         # 5) Natural Blackjack?
-        is_natural = ("🇦" in player_cards[0]) and any(
-            card in ["🔟", "🇯", "🇶", "🇰"] for card in player_cards[0]
-        )
-        if is_natural:
+        if player.natural:
             # payout = 1.5 × stake
             payout = int(amount * 1.5)
 
             # record win (played + won + total_winnings)
-            update_user_blackjack_stats(interaction.user, "win", payout)
+            updated = record_game_result(
+                interaction.user,
+                "blackjack",
+                "win",
+                payout,
+                return_fields=("games.blackjack",),
+            )
 
             # credit stake + winnings back to balance
             balance += amount + payout
             collection.update_one(
                 {"_id": interaction.user.id}, {"$set": {"balance": balance}}
             )
+            record_balance_change(interaction.user.id, amount + payout, "blackjack")
 
             # finish embed
-            embed.add_field(
-                name="Result", value="Natural Blackjack – You win!", inline=False
-            )
-            embed.add_field(
-                name="Prev Balance", value=f"${prev_balance:,.2f}", inline=True
-            )
-            embed.add_field(name="New Balance", value=f"${balance:,.2f}", inline=True)
-            embed.add_field(
-                name="Change", value=f"+${(balance - prev_balance):,.2f}", inline=True
+            add_blackjack_result(
+                embed, "Natural Blackjack – You win!", prev_balance, balance, updated
             )
-            (
-                blackjacks_won,
-                blackjacks_lost,
-                blackjacks_played,
-                total_winnings,
-                total_losses,
-            ) = blackjack_stats(interaction.user)
-            tied = blackjacks_played - blackjacks_won - blackjacks_lost
-            embed.set_footer(
-                text=f"{blackjacks_won} blackjacks won, {blackjacks_lost} lost, {tied} tied, {blackjacks_played} played"
-            )
-
             await interaction.followup.send(embed=embed)
             return
 
         # 6) Otherwise, hand off to your view for Hit/Stay/Double‑Down
-        view = BlackjackButton(dealer_cards, player_cards, embed, interaction, amount)
+        view = BlackjackButton(dealer, player, embed, interaction, shoe, amount)
         await interaction.followup.send(embed=embed, view=view)
 
     @app_commands.command(name="slots", description="Spins a slot machine")
+    @app_commands.describe(
+        amount="Amount to bet on each spin - Default $100",
+        spins="Spin this many times at once and get a single summary",
+    )
     async def slot(
         self,
         interaction: discord.Interaction,
         amount: Optional[app_commands.Range[int, 1, None]] = 100,
+        spins: Optional[app_commands.Range[int, 1, 100]] = 1,
     ):
-        view = SlotsButton(interaction, amount)
-        content, embed = slots_helper(interaction, amount)
+        view = SlotsButton(interaction, amount, spins)
+        content, embed = slots_helper(interaction, amount, spins)
         await interaction.response.send_message(content=content, embed=embed, view=view)
 
 
@@ -392,15 +332,17 @@ class GamblingButton(discord.ui.View):
 class BlackjackButton(discord.ui.View):
     def __init__(
         self,
-        dealer_cards: list,
-        player_cards: list,
+        dealer: Hand,
+        player: Hand,
         embed: discord.Embed,
         interaction: discord.Interaction,
+        shoe: Shoe,
         amount: app_commands.Range[int, 1, None] = 100,
     ):
         super().__init__(timeout=300)
-        self.dealer_cards = dealer_cards
-        self.player_cards = player_cards
+        self.shoe = shoe
+        self.dealer = dealer
+        self.player = player
         self.embed = embed
         self.interaction = interaction
         self.amount = amount
@@ -417,244 +359,164 @@ class BlackjackButton(discord.ui.View):
             return False
         return True
 
+    def end_game(self):
+        self.hit.disabled = True
+        self.stay.disabled = True
+        self.double_down.disabled = True
+
     @discord.ui.button(label="Hit", style=discord.ButtonStyle.green)
     async def hit(self, interaction: discord.Interaction, button: discord.ui.Button):
-        # 1) Load balances, then “refund” the original bet in‐memory
-        prev_balance, balance = balance_of_player(interaction.user)
-        # prev_balance += self.amount
-        # balance += self.amount
-
-        # 2) Deal one more card
-        new_card = random_card()
-        self.player_cards[0].append(new_card[1])
-        self.player_cards[1] += new_card[0]
-
-        # 3) Update the “Player’s Hand” field in the embed
-        total = self.player_cards[1]
-        if "🇦" in self.player_cards[0] and total <= 11:
-            disp = f"{total}/{total + 10}"
-        else:
-            disp = str(total)
-
-        self.embed.set_field_at(
-            index=1,
-            name=f"Player's Hand — {disp}",
-            value=f"{self.embed.fields[1].value} {self.player_cards[0][-1]}",
-            inline=False,
-        )
-
-        # 4) Check for bust
-        if total > 21:
-            prev_balance += self.amount
-            # balance += self.amount
-            # record the loss (2× the original bet is already in self.amount)
-            update_user_blackjack_stats(interaction.user, "lose", self.amount)
-
-            # persist the new balance
-            collection.update_one(
-                {"_id": interaction.user.id}, {"$set": {"balance": balance}}
-            )
-
-            # disable all action buttons
-            self.hit.disabled = True
-            self.stay.disabled = True
-            self.double_down.disabled = True
-
-            # build the “bust” fields
-            self.embed.add_field(name="Result", value="Lose (bust)", inline=False)
-            self.embed.add_field(
-                name="Prev Balance", value=f"${prev_balance:,.2f}", inline=True
-            )
-            self.embed.add_field(
-                name="New Balance", value=f"${balance:,.2f}", inline=True
-            )
-
-            diff = balance - prev_balance
-            sign = "+" if diff >= 0 else "-"
-            self.embed.add_field(
-                name="Change", value=f"{sign}${abs(diff):,.2f}", inline=True
-            )
-            (
-                blackjacks_won,
-                blackjacks_lost,
-                blackjacks_played,
-                total_winnings,
-                total_losses,
-            ) = blackjack_stats(interaction.user)
-            tied = blackjacks_played - blackjacks_won - blackjacks_lost
-            self.embed.set_footer(
-                text=f"{blackjacks_won} blackjacks won, {blackjacks_lost} lost, {tied} tied, {blackjacks_played} played"
-            )
+        self.player.add(self.shoe.deal())
 
+        # Still in the game: just re-render with the buttons enabled
+        if not self.player.busted:
+            render_hands(self.embed, self.dealer, self.player, hole=True)
             await interaction.response.edit_message(embed=self.embed, view=self)
             return
 
-        # 5) If not busted yet, just re-render the updated embed with buttons still enabled
+        # Bust: the stake was taken when the game started, so only record it
+        prev_balance, balance = balance_of_player(interaction.user)
+        prev_balance += self.amount
+        updated = record_game_result(
+            interaction.user,
+            "blackjack",
+            "lose",
+            self.amount,
+            return_fields=("games.blackjack",),
+        )
+
+        self.end_game()
+        render_hands(self.embed, self.dealer, self.player, hole=True)
+        add_blackjack_result(self.embed, "Lose (bust)", prev_balance, balance, updated)
         await interaction.response.edit_message(embed=self.embed, view=self)
 
     @discord.ui.button(label="Stay", style=discord.ButtonStyle.red)
     async def stay(self, interaction: discord.Interaction, button: discord.ui.Button):
-        # await interaction.response.defer(thinking=True, ephemeral=True)
         await self.result(interaction, button)
 
     @discord.ui.button(label="Double Down", style=discord.ButtonStyle.blurple)
     async def double_down(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ):
-        # 1) refund the original bet in‑memory
-        prev_balance, balance = balance_of_player(interaction.user)
-        prev_balance += self.amount
-        balance += self.amount
-
-        # 2) disable further buttons
-        self.hit.disabled = True
-        self.stay.disabled = True
-        self.double_down.disabled = True
-
-        # 3) deal exactly one more card
-        new_card = random_card()
-        self.player_cards[0].append(new_card[1])
-        self.player_cards[1] += new_card[0]
-
-        # 4) update the embed’s Player‐Hand field
-        player_total = self.player_cards[1]
-        if "🇦" in self.player_cards[0] and player_total <= 11:
-            display_total = f"{player_total}/{player_total + 10}"
-        else:
-            display_total = str(player_total)
-
-        self.embed.set_field_at(
-            index=1,
-            name=f"Player's Hand — {display_total}",
-            value=f"{self.embed.fields[1].value} {self.player_cards[0][-1]}",
-            inline=False,
+        # Take the second stake now, so result() settles the full doubled bet.
+        # The button was enabled from an old balance, so only take it if covered.
+        updated = collection.find_one_and_update(
+            {"_id": interaction.user.id, "balance": {"$gte": self.amount}},
+            {"$inc": {"balance": -self.amount}},
+            projection={"balance": 1},
+            return_document=ReturnDocument.AFTER,
         )
-
-        # 5) double the stake and subtract that from balance
+        if updated is None:
+            await interaction.response.send_message(
+                "You don't have enough balance to double down.", ephemeral=True
+            )
+            return
+        prev_balance = balance = updated["balance"] + self.amount
+        record_balance_change(interaction.user.id, -self.amount, "blackjack")
         self.amount *= 2
-        balance -= self.amount
 
-        # 6) if bust, update stats + balance immediately
-        if player_total > 21:
-            # record a loss of 2× the original bet
-            update_user_blackjack_stats(interaction.user, "lose", self.amount)
+        # Exactly one more card
+        self.player.add(self.shoe.deal())
 
-            # persist the new balance
-            collection.update_one(
-                {"_id": interaction.user.id}, {"$set": {"balance": balance}}
-            )
+        if not self.player.busted:
+            await self.result(interaction, button)
+            return
 
-            # build your lose embed
-            self.embed.add_field(name="Result", value="Lose (bust)", inline=False)
-            self.embed.add_field(
-                name="Prev Balance", value=f"${prev_balance:,.2f}", inline=True
-            )
-            self.embed.add_field(
-                name="New Balance", value=f"${balance:,.2f}", inline=True
-            )
-            diff = balance - prev_balance
-            sign = "+" if diff >= 0 else "-"
-            self.embed.add_field(
-                name="Change", value=f"{sign}${abs(diff):,.2f}", inline=True
-            )
-            (
-                blackjacks_won,
-                blackjacks_lost,
-                blackjacks_played,
-                total_winnings,
-                total_losses,
-            ) = blackjack_stats(interaction.user)
-            tied = blackjacks_played - blackjacks_won - blackjacks_lost
-            self.embed.set_footer(
-                text=f"{blackjacks_won} blackjacks won, {blackjacks_lost} lost, {tied} tied, {blackjacks_played} played"
-            )
+        updated = record_game_result(
+            interaction.user,
+            "blackjack",
+            "lose",
+            self.amount,
+            return_fields=("games.blackjack",),
+        )
 
-            await interaction.response.edit_message(embed=self.embed, view=self)
-        else:
-            # 7) otherwise run your full dealer‐and‐settlement logic
-            #    (this will itself call update_user_blackjack_stats & set balance)
-            await self.result(interaction, button)
+        self.end_game()
+        render_hands(self.embed, self.dealer, self.player, hole=True)
+        add_blackjack_result(
+            self.embed,
+            "Lose (bust)",
+            prev_balance + self.amount // 2,
+            balance - self.amount // 2,
+            updated,
+        )
+        await interaction.response.edit_message(embed=self.embed, view=self)
 
     async def result(self, interaction: discord.Interaction, button: discord.ui.Button):
         prev_balance, balance = balance_of_player(interaction.user)
+        stored_balance = balance
+        # Both numbers are shown as if the stake had never left the balance
         prev_balance += self.amount
         balance += self.amount
-        (
-            blackjacks_won,
-            blackjacks_lost,
-            blackjacks_played,
-            total_winnings,
-            total_losses,
-        ) = blackjack_stats(interaction.user)
 
-        self.hit.disabled = True
-        self.stay.disabled = True
-        self.double_down.disabled = True
+        self.end_game()
+        play_dealer(self.dealer, self.shoe)
+        outcome = settle(self.player, self.dealer)
 
-        # Dealer's Turn
-        while self.dealer_cards[1] <= 16:
-            new_card = random_card()
-            self.dealer_cards[0].append(new_card[1])
-            self.dealer_cards[1] += new_card[0]
-
-            if "🇦" in self.dealer_cards[0] and 17 <= self.dealer_cards[1] + 10 <= 21:
-                self.embed.set_field_at(
-                    index=0,
-                    name=f"Dealer's Hand - {self.dealer_cards[1]}/{self.dealer_cards[1]+10}",
-                    value=f'{self.embed.fields[0].value.replace("⬛", "")} {self.dealer_cards[0][-1]}',
-                    inline=False,
-                )
-                break
-            self.embed.set_field_at(
-                index=0,
-                name=f"Dealer's Hand - {self.dealer_cards[1]}",
-                value=f'{self.embed.fields[0].value.replace("⬛", "")} {self.dealer_cards[0][-1]}',
-                inline=False,
-            )
-
-        def best_value(cards, total):
-            return total + 10 if "🇦" in cards and total + 10 <= 21 else total
-
-        dealer_value = best_value(self.dealer_cards[0], self.dealer_cards[1])
-        player_value = best_value(self.player_cards[0], self.player_cards[1])
-
-        # Determine outcome
-        if dealer_value > 21 or player_value > dealer_value:
-            outcome = "Win"
+        if outcome == "win":
             balance += self.amount
-            blackjacks_won += 1
-        elif player_value < dealer_value:
-            outcome = "Lose"
+        elif outcome == "lose":
             balance -= self.amount
-            blackjacks_lost += 1
-        else:
-            outcome = "Tie"
 
-        update_user_blackjack_stats(interaction.user, outcome.lower(), self.amount)
+        updated = record_game_result(
+            interaction.user,
+            "blackjack",
+            outcome,
+            self.amount,
+            return_fields=("games.blackjack",),
+        )
         collection.update_one(
             {"_id": interaction.user.id}, {"$set": {"balance": balance}}
         )
-
-        # Result embed
-        self.embed.add_field(name="Result", value=outcome, inline=False)
-        self.embed.add_field(
-            name="Prev Balance", value=f"${prev_balance:,.2f}", inline=True
+        record_balance_change(
+            interaction.user.id, balance - stored_balance, "blackjack"
         )
-        self.embed.add_field(name="New Balance", value=f"${balance:,.2f}", inline=True)
 
-        diff = balance - prev_balance
-        sign = "+" if diff >= 0 else "-"
-        self.embed.add_field(
-            name="Change", value=f"{sign}${abs(diff):,.2f}", inline=True
+        render_hands(self.embed, self.dealer, self.player)
+        add_blackjack_result(
+            self.embed, outcome.title(), prev_balance, balance, updated
         )
+        await interaction.response.edit_message(embed=self.embed, view=self)
 
-        # Footer
-        tied = blackjacks_played - blackjacks_won - blackjacks_lost
-        self.embed.set_footer(
-            text=f"{blackjacks_won} blackjacks won, {blackjacks_lost} lost, {tied} tied, {blackjacks_played} played"
-        )
 
-        await interaction.response.edit_message(embed=self.embed, view=self)
+def render_hands(embed: discord.Embed, dealer: Hand, player: Hand, hole: bool = False):
+    """Draw both hands into the first two embed fields, adding them on the deal."""
+    fields = [
+        (f"Dealer's Hand — {dealer.label()}", dealer.render(hole)),
+        (f"Player's Hand — {player.label()}", player.render()),
+    ]
+    for index, (name, value) in enumerate(fields):
+        if index < len(embed.fields):
+            embed.set_field_at(index, name=name, value=value, inline=False)
+        else:
+            embed.add_field(name=name, value=value, inline=False)
+
+
+def add_blackjack_result(
+    embed: discord.Embed,
+    result: str,
+    prev_balance: int,
+    balance: int,
+    updated: dict,
+):
+    embed.add_field(name="Result", value=result, inline=False)
+    embed.add_field(name="Prev Balance", value=f"${prev_balance:,.2f}", inline=True)
+    embed.add_field(name="New Balance", value=f"${balance:,.2f}", inline=True)
+
+    diff = balance - prev_balance
+    sign = "+" if diff >= 0 else "-"
+    embed.add_field(name="Change", value=f"{sign}${abs(diff):,.2f}", inline=True)
+
+    (
+        blackjacks_won,
+        blackjacks_lost,
+        blackjacks_played,
+        total_winnings,
+        total_losses,
+    ) = game_counters(updated, "blackjack").values()
+    tied = blackjacks_played - blackjacks_won - blackjacks_lost
+    embed.set_footer(
+        text=f"{blackjacks_won} blackjacks won, {blackjacks_lost} lost, {tied} tied, {blackjacks_played} played"
+    )
 
 
 class SlotsButton(discord.ui.View):
@@ -662,9 +524,11 @@ class SlotsButton(discord.ui.View):
         self,
         interaction: discord.Interaction,
         amount: Optional[app_commands.Range[int, 1, None]],
+        spins: int = 1,
     ):
         super().__init__(timeout=300)
         self.amount = amount
+        self.spins = spins
         self.interaction = interaction
 
     # this function must return a boolean, or to the very least a truthy/falsey value.
@@ -681,7 +545,7 @@ class SlotsButton(discord.ui.View):
     async def spin_again(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ):
-        content, embed = slots_helper(interaction, self.amount)
+        content, embed = slots_helper(interaction, self.amount, self.spins)
         await interaction.response.edit_message(content=content, embed=embed, view=self)
 
 
@@ -689,20 +553,13 @@ def gamble_helper(interaction: discord.Interaction, amount: Optional[int], actio
     if amount is None and not action:
         return discord.Embed(title="Missing amount or action")
 
-    prev_balance, balance = balance_of_player(interaction.user)
-    gambles_won, gambles_lost, gambles_played, *_ = gamble_stats(interaction.user)
-
     if action:
+        # Going all in needs the balance first; a fixed bet does not
+        _, balance = balance_of_player(interaction.user)
         if balance == 0:
             return discord.Embed(title="You have no money to gamble!")
         amount = balance
 
-    if amount > balance:
-        embed = discord.Embed(title="Not enough balance")
-        embed.add_field(name="Needed Balance", value=f"${amount:,.2f}", inline=True)
-        embed.add_field(name="Balance", value=f"${balance:,.2f}", inline=True)
-        return embed
-
     def roll():
         return random.randint(1, 99)
 
@@ -710,19 +567,46 @@ def gamble_helper(interaction: discord.Interaction, amount: Optional[int], actio
 
     if bot_number < member_number:
         result, win_text = "win", f"{interaction.user.mention} rolled higher"
-        balance += amount
+        change = amount
     elif bot_number > member_number:
         result, win_text = "lose", "Dealer rolled higher"
-        balance -= amount
+        change = -amount
     else:
         result, win_text = "tie", "No Winners"
+        change = 0
+
+    # Stats and balance in one write, applied only if the bet is still covered
+    def settle():
+        return record_game_result(
+            interaction.user,
+            "gamble",
+            result,
+            amount,
+            return_fields=("games.gamble", "balance"),
+            balance_change=change,
+            min_balance=amount,
+        )
+
+    updated = settle()
+    if updated is None:
+        # Either too poor or no account yet; reading the balance creates one
+        _, balance = balance_of_player(interaction.user)
+        if amount <= balance:
+            updated = settle()
+    if updated is None:
+        embed = discord.Embed(title="Not enough balance")
+        embed.add_field(name="Needed Balance", value=f"${amount:,.2f}", inline=True)
+        embed.add_field(name="Balance", value=f"${balance:,.2f}", inline=True)
+        return embed
 
-    update_user_gamble_stats(interaction.user, result, amount)
-    collection.update_one({"_id": interaction.user.id}, {"$set": {"balance": balance}})
-    gambles_won, gambles_lost, gambles_played, *_ = gamble_stats(interaction.user)
+    record_balance_change(interaction.user.id, change, "gamble")
+    balance = updated["balance"]
+    prev_balance = balance - change
+    gambles_won, gambles_lost, gambles_played, *_ = game_counters(
+        updated, "gamble"
+    ).values()
 
-    new_balance = balance - prev_balance
-    sign = "+" if new_balance >= 0 else "-"
+    sign = "+" if change >= 0 else "-"
 
     embed = discord.Embed(title="Gambling Details", description=f"${amount:,.2f} bet")
     embed.add_field(name="Dealer rolled a", value=bot_number, inline=False)
@@ -732,123 +616,85 @@ def gamble_helper(interaction: discord.Interaction, amount: Optional[int], actio
     embed.add_field(name="Result", value=win_text, inline=False)
     embed.add_field(name="Previous Balance", value=f"${prev_balance:,.2f}", inline=True)
     embed.add_field(name="New Balance", value=f"${balance:,.2f}", inline=True)
-    embed.add_field(name="Result", value=f"{sign}${abs(new_balance):,.2f}", inline=True)
+    embed.add_field(name="Result", value=f"{sign}${abs(change):,.2f}", inline=True)
     embed.set_footer(
         text=f"{gambles_won} gambles won, {gambles_lost} lost, {gambles_played - gambles_won - gambles_lost} tied, {gambles_played} played"
     )
     return embed
 
 
-def random_card(num_decks=6):
-    # Define the card values and their probabilities for Blackjack
-    values = ["🇦", "2️⃣", "3️⃣", "4️⃣", "5️⃣", "6️⃣", "7️⃣", "8️⃣", "9️⃣", "🔟", "🇯", "🇶", "🇰"]
-
-    # Create a deck with the appropriate distribution of cards
-    # For each deck, there are 4 Aces, 16 cards with value 10 (10, Jack, Queen, King), and 36 other cards (2-9)
-    deck = (
-        ["🇦"] * 4  # 4 Aces
-        + ["2️⃣", "3️⃣", "4️⃣", "5️⃣", "6️⃣", "7️⃣", "8️⃣", "9️⃣"] * 4  # 2-9, 4 of each
-        + ["🔟", "🇯", "🇶", "🇰"] * 4
-    ) * num_decks  # 10, Jack, Queen, King (16 cards of value 10)
-
-    # Shuffle the deck
-    random.shuffle(deck)
-
-    # Draw a card from the shuffled deck
-    drawn_card = deck.pop()
-
-    # Assign numeric value based on card
-    if drawn_card == "🇦":  # Ace
-        card_key = 1  # This can be modified to return 1 or 11 based on game context
-    elif drawn_card in ["🔟", "🇯", "🇶", "🇰"]:  # 10, Jack, Queen, King
-        card_key = 10
-    else:
-        card_key = int(drawn_card[0])  # Number cards (2-9)
-
-    return [card_key, drawn_card]
-
-
 def slots_helper(
-    interaction: discord.Interaction, amount: Optional[app_commands.Range[int, 1, None]]
+    interaction: discord.Interaction,
+    amount: Optional[app_commands.Range[int, 1, None]],
+    spins: int = 1,
 ):
-    # 1) Fetch previous balance
-    prev_balance, balance = balance_of_player(interaction.user)
+    # 1) Spin every board at once and price each outcome
+    boards, outcome = spin(spins)
+    payout = payouts(outcome, amount)
+    won = payout > 0
+    payout_amount = int(payout.sum())
+
+    # 2) Stats and balance in one write, applied only if every spin's stake
+    # is still covered
+    def settle():
+        return record_game_batch(
+            interaction.user,
+            "slots",
+            won=int(won.sum()),
+            lost=int((~won).sum()),
+            played=spins,
+            total_winnings=int(payout[won].sum()),
+            total_losses=int(-payout[~won].sum()),
+            balance_change=payout_amount,
+            return_fields=("games.slots", "balance"),
+            min_balance=amount * spins,
+        )
 
-    # 2) Check stake validity
-    if amount > balance:
+    updated = settle()
+    if updated is None:
+        # Either too poor or no account yet; reading the balance creates one
+        _, balance = balance_of_player(interaction.user)
+        if amount * spins <= balance:
+            updated = settle()
+    if updated is None:
         embed = discord.Embed(title="Not enough balance")
-        embed.add_field(name="Needed", value=f"${amount:,.2f}", inline=True)
+        embed.add_field(name="Needed", value=f"${amount * spins:,.2f}", inline=True)
         embed.add_field(name="Current Balance", value=f"${balance:,.2f}", inline=True)
         return "", embed
 
-    # 3) Spin the board
-    emojis = "🍎🍊🍐🍋🍉🍇🍓🍒"
-    board = [random.choice(emojis) for _ in range(9)]
-    board_display = "\n".join(" ".join(board[i : i + 3]) for i in range(0, 9, 3))
-
-    embed = discord.Embed(title="Slots", description=f"${amount} bet")
-
-    # 4) Determine payout
-    winning_lines = [
-        (0, 1, 2),
-        (3, 4, 5),
-        (6, 7, 8),  # horizontals
-        (0, 4, 8),
-        (2, 4, 6),  # diagonals
-        (0, 3, 6),
-        (1, 4, 7),
-        (2, 5, 8),  # verticals
-    ]
+    record_balance_change(interaction.user.id, payout_amount, "slots")
+    balance = updated["balance"]
+    prev_balance = balance - payout_amount
+    slots_won, slots_lost, slots_played, total_winnings, total_losses = game_counters(
+        updated, "slots"
+    ).values()
+
+    # 3) Show the single board, or the best one of a batch
+    best = int(np.argmax(payout))
+    board_display = render_board(boards[best])
+    if spins == 1:
+        embed = discord.Embed(title="Slots", description=f"${amount} bet")
+        desc = OUTCOMES[outcome[0]][1]
+    else:
+        embed = discord.Embed(
+            title="Slots", description=f"{spins} spins at ${amount} each"
+        )
+        wins = [
+            f"{name}: {count}"
+            for (_, name), count in zip(
+                OUTCOMES, np.bincount(outcome, minlength=len(OUTCOMES))
+            )
+            if count
+        ]
+        embed.add_field(name="Spins", value="\n".join(wins), inline=False)
+        embed.add_field(
+            name="Best Spin",
+            value=f"{OUTCOMES[outcome[best]][1]} "
+            f"({'+' if payout[best] >= 0 else '-'}${abs(payout[best]):,.2f})",
+            inline=False,
+        )
+        desc = f"{int(won.sum())}/{spins} won"
 
-    payout_amount = 0
-    desc = ""
-    # 4a) 3-in-line
-    for a, b, c in winning_lines:
-        if board[a] == board[b] == board[c]:
-            payout_amount = amount * 2
-            # embed.add_field(
-            #     name="Result",
-            #     value=f"3 in a line — You win ${payout_amount:,.2f}\nCurrent Balance: ${balance:,.2f}",
-            #     inline=False,
-            # )
-            desc = "3 in a line"
-            break
-
-    # 4b) special fruits, if no line win
-    if payout_amount == 0:
-        counts = {
-            "🍒": board.count("🍒"),
-            "🍐": board.count("🍐"),
-            "🍉": board.count("🍉"),
-        }
-        max_count = max(counts.values())
-
-        if max_count == 3:
-            payout_amount = amount * 1
-            desc = "3 special fruits"
-        elif max_count == 4:
-            payout_amount = amount * 5
-            desc = "4 special fruits"
-        elif max_count == 9:
-            payout_amount = amount * 999
-            desc = "MAX WIN BABY"
-        elif max_count >= 5:
-            payout_amount = amount * 35
-            desc = "5+ special fruits"
-        else:
-            payout_amount = -amount
-            desc = "No matches"
-
-    # 5) Apply payout to balance
-    balance += payout_amount
-
-    # 6) Update stats and balance in DB
-    result_str = "win" if payout_amount > 0 else "lose"
-    update_user_slots_stats(interaction.user, result_str, abs(payout_amount))
-    collection.update_one({"_id": interaction.user.id}, {"$set": {"balance": balance}})
-    slots_won, slots_lost, slots_played, total_winnings, total_losses = slots_stats(
-        interaction.user
-    )
     embed.add_field(name="Previous Balance", value=f"${prev_balance:,.2f}", inline=True)
     embed.add_field(name="Current Balance", value=f"${balance:,.2f}", inline=True)
 
@@ -870,50 +716,65 @@ def slots_helper(
 
 class WordleGame:
     def __init__(self):
-        # Word list for the game, can be extended with more words
-        self.words = self.get_five_letter_words()
-        self.target_word = random.choice(self.words)
+        self.target_word = random_word()
         self.attempts = 0
         self.max_attempts = 6
+        self.current_guess = None
+        self.previous_attempts = []
         self.message = None
-        print(self.target_word)
+        self.guild_id = self.channel_id = self.message_id = None
 
-    def get_five_letter_words(self):
-        response = requests.get("https://api.datamuse.com/words?sp=?????")
-        words = [word["word"] for word in response.json()]
-        return words
+    def bind(self, message: discord.Message):
+        """Attach the game to the message that carries its guess button."""
+        self.message = message
+        self.guild_id = message.guild.id if message.guild else None
+        self.channel_id = message.channel.id
+        self.message_id = message.id
 
-    def check_guess(self, guess):
-        feedback = [""] * len(guess)  # Feedback array for each letter
-        target_word_marked = [False] * len(
-            self.target_word
-        )  # Tracks matched letters in target word
-
-        # Step 1: First pass for exact matches (Green)
-        for i in range(len(guess)):
-            if guess[i] == self.target_word[i]:
-                feedback[i] = (
-                    f"**{guess[i]}**"  # Green: Correct letter, correct position
-                )
-                target_word_marked[i] = True  # Mark this position as used
-
-        # Step 2: Second pass for correct letters in wrong positions (Yellow)
-        for i in range(len(guess)):
-            if feedback[i]:  # Skip already marked letters
-                continue
-            if guess[i] in self.target_word:
-                # Check if there's an unmatched instance of this letter in target_word
-                for j in range(len(self.target_word)):
-                    if guess[i] == self.target_word[j] and not target_word_marked[j]:
-                        feedback[i] = (
-                            f"__{guess[i]}__"  # Yellow: Correct letter, wrong position
-                        )
-                        target_word_marked[j] = True  # Mark this position as used
-                        break
-            # If no match, mark it as incorrect (gray)
-            if not feedback[i]:
-                feedback[i] = f"~~{guess[i]}~~"
+    @property
+    def jump_url(self):
+        return (
+            f"https://discord.com/channels/{self.guild_id or '@me'}/"
+            f"{self.channel_id}/{self.message_id}"
+        )
 
+    def to_document(self) -> dict:
+        return {
+            "target_word": self.target_word,
+            "attempts": self.attempts,
+            "current_guess": self.current_guess,
+            "previous_attempts": self.previous_attempts,
+            "guild_id": self.guild_id,
+            "channel_id": self.channel_id,
+            "message_id": self.message_id,
+        }
+
+    @classmethod
+    def from_document(cls, doc: dict):
+        game = cls.__new__(cls)
+        game.target_word = doc["target_word"]
+        game.attempts = doc["attempts"]
+        game.max_attempts = 6
+        game.current_guess = doc["current_guess"]
+        game.previous_attempts = [
+            tuple(attempt) for attempt in doc["previous_attempts"]
+        ]
+        # The message itself is bound again on the next button click
+        game.message = None
+        game.guild_id = doc["guild_id"]
+        game.channel_id = doc["channel_id"]
+        game.message_id = doc["message_id"]
+        return game
+
+    def check_guess(self, guess):
+        feedback = []
+        for letter, mark in zip(guess, score_guess(guess, self.target_word)):
+            if mark == CORRECT:
+                feedback.append(f"**{letter}**")  # Correct letter, correct position
+            elif mark == PRESENT:
+                feedback.append(f"__{letter}__")  # Correct letter, wrong position
+            else:
+                feedback.append(f"~~{letter}~~")
         return " ".join(feedback)  # Return feedback as a string
 
     def is_game_over(self):
@@ -922,6 +783,37 @@ class WordleGame:
         )
 
 
+class WordleView(discord.ui.View):
+    """The "Make a Guess" button, registered once so it outlives any one cog instance."""
+
+    def __init__(self, games: SessionStore):
+        super().__init__(timeout=None)
+        self.games = games
+
+    @discord.ui.button(
+        label="Make a Guess",
+        style=discord.ButtonStyle.primary,
+        custom_id="wordle:guess",
+    )
+    async def guess(self, interaction: discord.Interaction, button: discord.ui.Button):
+        game = self.games.get(interaction.user.id)
+        if game is None:
+            await interaction.response.send_message(
+                "You don't have an active game. Type `/wordle` to start a new game.",
+                ephemeral=True,
+            )
+            return
+        if game.message_id != interaction.message.id:
+            await interaction.response.send_message(
+                "Not your game. Type `/wordle` to start a new game.", ephemeral=True
+            )
+            return
+
+        game.bind(interaction.message)
+        modal = GuessModal(user_id=interaction.user.id, game=game, games=self.games)
+        await interaction.response.send_modal(modal)
+
+
 class GuessModal(discord.ui.Modal, title="Guess"):
     def __init__(self, user_id, game, games):
         super().__init__(custom_id="guess_modal")
@@ -940,43 +832,37 @@ class GuessModal(discord.ui.Modal, title="Guess"):
         await interaction.response.defer()
         guess = self.feedback.value.lower()
 
-        # Validate guess
+        # Validate guess; an invalid one does not use up an attempt
         if len(guess) != 5 or not guess.isalpha():
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 "Please enter a valid 5-letter word.", ephemeral=True
             )
             return
+        if not is_word(guess):
+            await interaction.followup.send(
+                f"**{guess}** is not in the word list.", ephemeral=True
+            )
+            return
 
         feedback = self.game.check_guess(guess)
         self.game.attempts += 1
         self.game.current_guess = guess
-
-        # Track previous attempts
-        if not hasattr(self.game, "previous_attempts"):
-            self.game.previous_attempts = []
         self.game.previous_attempts.append((guess, feedback))
 
-        # Retrieve and update stats
-        wordles_won, wordles_lost, wordles_played = wordle_stats(interaction.user)
         if (
             guess == self.game.target_word
             or self.game.attempts >= self.game.max_attempts
         ):
             game_over = guess == self.game.target_word
-            wordles_won += int(game_over)
-            wordles_lost += int(not game_over)
-            wordles_played += 1
-
-            collection.update_one(
-                {"_id": interaction.user.id},
-                {
-                    "$set": {
-                        "wordles_won": wordles_won,
-                        "wordles_lost": wordles_lost,
-                        "wordles_played": wordles_played,
-                    }
-                },
+            updated = record_game_result(
+                interaction.user,
+                "wordle",
+                "win" if game_over else "lose",
+                return_fields=("games.wordle",),
             )
+            wordles_won, wordles_lost, wordles_played = game_counters(
+                updated, "wordle"
+            ).values()
 
             # Construct game-over message
             result_msg = (
@@ -993,7 +879,8 @@ class GuessModal(discord.ui.Modal, title="Guess"):
                 wordles_played,
             )
         else:
-            # Continue the game
+            # Continue the game; each guess also extends its expiry
+            self.games.touch(self.user_id)
             await self.update_game_feedback(interaction, feedback)
 
     async def update_game_feedback(self, interaction, feedback):
@@ -1018,7 +905,7 @@ class GuessModal(discord.ui.Modal, title="Guess"):
             text=f"{wordles_won} wordles won, {wordles_lost} wordles lost, {wordles_played} wordles played"
         )
         await self.game.message.edit(content=result_msg, embed=embed, view=None)
-        del self.games[self.user_id]
+        self.games.pop(self.user_id)
 
     def build_embed(self, feedback, description):
         embed = discord.Embed(
@@ -1,5 +1,7 @@
+import asyncio
+import io
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional
 
 import discord
@@ -7,9 +9,12 @@ from discord import ButtonStyle, app_commands
 from discord.ext import commands
 from discord.ui import Button, View
 from dotenv import load_dotenv
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from pymongo import MongoClient
 
 from utils.embeds import create_embed
+from utils.history import balance_series
 from utils.stats import all_stats, balance_of_player, get_user_inventory
 
 load_dotenv()
@@ -138,6 +143,40 @@ class Profile(commands.Cog):
         await interaction.response.defer()
         await interaction.followup.send(f"💳 {member.mention} has ${balance:,.2f}")
 
+    @app_commands.command(
+        name="networth", description="Shows a chart of a user's balance and bank"
+    )
+    @app_commands.describe(days="How many days of history to show")
+    async def networth(
+        self,
+        interaction: discord.Interaction,
+        member: Optional[discord.Member] = None,
+        days: app_commands.Range[int, 7, 365] = 30,
+    ):
+        member = member or interaction.user
+        await interaction.response.defer()
+
+        since = datetime.utcnow() - timedelta(days=days)
+        points = await asyncio.to_thread(balance_series, member.id, since)
+        if not points:
+            await interaction.followup.send(
+                f"No balance history for {member.mention} yet. Check back tomorrow!"
+            )
+            return
+
+        chart = await asyncio.to_thread(networth_chart, member.name, points)
+        embed = discord.Embed(
+            title=f"{member.name}'s Net Worth", color=discord.Color.green()
+        )
+        latest = points[-1]
+        embed.add_field(name="Balance", value=f"${latest['balance']:,.2f}", inline=True)
+        embed.add_field(name="Bank", value=f"${latest['bank']:,.2f}", inline=True)
+        embed.set_image(url="attachment://networth.png")
+        embed.set_footer(text=f"Last {days} days")
+        await interaction.followup.send(
+            embed=embed, file=discord.File(chart, filename="networth.png")
+        )
+
     @app_commands.command(
         name="game_stats", description="Shows full game and heist stats of a user"
     )
@@ -180,6 +219,33 @@ async def setup(bot: commands.Bot) -> None:
     print("Profile is Loaded")
 
 
+def networth_chart(name: str, points: list[dict]) -> io.BytesIO:
+    """Render balance, bank and their total as a step chart PNG."""
+    days = [point["day"] for point in points]
+    balances = [point["balance"] for point in points]
+    banks = [point["bank"] for point in points]
+    totals = [balance + bank for balance, bank in zip(balances, banks)]
+
+    # Not pyplot: its global figure manager isn't safe off the main thread
+    fig = Figure(figsize=(8, 4))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    # Values hold until the next snapshot, so draw steps rather than slopes
+    ax.step(days, totals, where="post", label="Net worth", linewidth=2)
+    ax.step(days, balances, where="post", label="Balance", alpha=0.7)
+    ax.step(days, banks, where="post", label="Bank", alpha=0.7)
+    ax.set_title(f"{name}'s net worth")
+    ax.yaxis.set_major_formatter(lambda value, _: f"${value:,.0f}")
+    ax.legend()
+    fig.autofmt_xdate()
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    buffer.seek(0)
+    return buffer
+
+
 async def all_stats_embed(member: discord.Member) -> discord.Embed:
     stats = all_stats(member)
 
@@ -76,7 +76,9 @@ class Dungeon(commands.Cog):
     @app_commands.describe(floor="Choose the dungeon floor you want to challenge")
     async def dungeon(self, interaction: discord.Interaction, floor: int):
         user = interaction.user
-        user_data = get_user_data(user)
+        user_data = get_user_data(
+            user, ("balance", "player_level", "player_hp", "player_xp")
+        )
 
         if floor < 1:
             await interaction.response.send_message(
@@ -157,18 +159,17 @@ class Dungeon(commands.Cog):
                 update_user_player_stats(user=user, hp_change=-damage)
 
         # Deduct gold and update XP via the stat update function
-        update_data = get_user_data(user)
+        update_data = get_user_data(user, ("balance",))
         update_data["balance"] -= cost
-        update_balance(user, update_data["balance"])
+        update_balance(user, update_data["balance"], source="dungeon")
 
         # Apply XP change and auto level-up
-        update_user_player_stats(
+        updated_data = update_user_player_stats(
             user=user,
             xp_change=(xp_gain if win else -xp_loss),
+            return_fields=("player_level",),
         )
 
-        # Reload user data to show updated level
-        updated_data = get_user_data(user)
         if updated_data["player_level"] > user_data["player_level"]:
             result_embed.add_field(
                 name="Level Up!",
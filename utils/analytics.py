@@ -0,0 +1,174 @@
+import os
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+from utils.leaderboard import acquire_lease
+from utils.ledger import flush_ledger, ledger
+
+load_dotenv()
+MONGO_URL = os.getenv("ATLAS_URI")
+cluster = MongoClient(MONGO_URL)
+db = cluster["Users"]
+collection = db["UserData"]
+# Latest computed metrics, shared by every bot process
+health = db["EconomyHealth"]
+
+PERCENTILES = (10, 25, 50, 75, 90, 99)
+# Matches the hourly refresh task
+REFRESH_INTERVAL = timedelta(hours=1)
+
+
+def _money_supply() -> dict:
+    totals = next(
+        collection.aggregate(
+            [
+                {
+                    "$group": {
+                        "_id": None,
+                        "users": {"$sum": 1},
+                        "balance": {"$sum": "$balance"},
+                        "bank": {"$sum": "$bank"},
+                        "banked_users": {
+                            "$sum": {"$cond": [{"$gt": ["$bank", 0]}, 1, 0]}
+                        },
+                    }
+                }
+            ]
+        ),
+        None,
+    )
+    if not totals:
+        return {"users": 0, "balance": 0, "bank": 0, "banked_users": 0}
+    totals.pop("_id")
+    return totals
+
+
+def _percentile_rank(percentile: int) -> dict:
+    # max(1, round(users * percentile / 100)), evaluated per document
+    return {"$max": [1, {"$round": [{"$multiply": ["$users", percentile / 100]}, 0]}]}
+
+
+def _wealth_distribution() -> dict:
+    """Gini coefficient and percentiles of balance + bank, computed server side.
+
+    Users are ranked by wealth with $setWindowFields, which also counts
+    them, so the percentile ranks always match the ranking even if users
+    join mid-refresh. The Gini numerator is sum(rank * wealth).
+    """
+    result = next(
+        collection.aggregate(
+            [
+                {
+                    "$project": {
+                        "wealth": {
+                            "$add": [
+                                {"$ifNull": ["$balance", 0]},
+                                {"$ifNull": ["$bank", 0]},
+                            ]
+                        }
+                    }
+                },
+                {
+                    "$setWindowFields": {
+                        "sortBy": {"wealth": 1},
+                        "output": {
+                            "rank": {"$documentNumber": {}},
+                            "users": {
+                                "$count": {},
+                                "window": {"documents": ["unbounded", "unbounded"]},
+                            },
+                        },
+                    }
+                },
+                {
+                    "$group": {
+                        "_id": None,
+                        "users": {"$max": "$users"},
+                        "total_wealth": {"$sum": "$wealth"},
+                        "weighted": {"$sum": {"$multiply": ["$rank", "$wealth"]}},
+                        # $max skips the nulls of every other document
+                        **{
+                            f"p{percentile}": {
+                                "$max": {
+                                    "$cond": [
+                                        {
+                                            "$eq": [
+                                                "$rank",
+                                                _percentile_rank(percentile),
+                                            ]
+                                        },
+                                        "$wealth",
+                                        None,
+                                    ]
+                                }
+                            }
+                            for percentile in PERCENTILES
+                        },
+                    }
+                },
+            ],
+            allowDiskUse=True,
+        ),
+        None,
+    )
+    if not result or result["total_wealth"] <= 0:
+        return {"gini": 0.0, "percentiles": {str(p): 0 for p in PERCENTILES}}
+
+    users, total_wealth = result["users"], result["total_wealth"]
+    gini = (2 * result["weighted"]) / (users * total_wealth) - (users + 1) / users
+    percentiles = {str(p): result[f"p{p}"] or 0 for p in PERCENTILES}
+    return {"gini": round(gini, 4), "percentiles": percentiles}
+
+
+def _daily_payouts(since: datetime) -> dict:
+    """Money created and destroyed per ledger source since the given time."""
+    sources = {}
+    for row in ledger.aggregate(
+        [
+            {"$match": {"at": {"$gte": since}}},
+            {
+                "$group": {
+                    "_id": "$source",
+                    "paid_out": {"$sum": {"$max": ["$delta", 0]}},
+                    "taken_in": {"$sum": {"$min": ["$delta", 0]}},
+                }
+            },
+        ]
+    ):
+        sources[row["_id"]] = {
+            "paid_out": row["paid_out"],
+            "taken_in": -row["taken_in"],
+        }
+    return sources
+
+
+def refresh_economy_health(force: bool = False) -> dict:
+    """Recompute every metric and store it as the cached snapshot.
+
+    Like the global leaderboards, only the process holding the lease does
+    the work; the others return None.
+    """
+    now = datetime.utcnow()
+    if not force and not acquire_lease(health, now, "lease", REFRESH_INTERVAL):
+        return None
+    flush_ledger()
+    supply = _money_supply()
+    payouts = _daily_payouts(now - timedelta(days=1))
+
+    metrics = {
+        "computed_at": now,
+        "supply": supply,
+        "distribution": _wealth_distribution(),
+        "payouts": payouts,
+        "paid_out_24h": sum(source["paid_out"] for source in payouts.values()),
+        "taken_in_24h": sum(source["taken_in"] for source in payouts.values()),
+    }
+    health.replace_one({"_id": "latest"}, metrics, upsert=True)
+    return metrics
+
+
+def get_economy_health() -> dict:
+    """Return the cached metrics, or None if they were never computed."""
+    return health.find_one({"_id": "latest"})
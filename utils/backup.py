@@ -0,0 +1,229 @@
+"""Streaming export/import of the Mongo collections and the SQLite stores.
+
+Data is written as gzip-compressed NDJSON (MongoDB extended JSON, so dates
+and 64-bit ids survive) in parts of CHUNK_SIZE records. Only one chunk is
+held in memory at a time. A manifest.json next to the parts records what
+is finished, so an interrupted export or import resumes where it stopped.
+
+    python -m utils.backup export backups/prod
+    python -m utils.backup import backups/prod --uri mongodb://localhost:27017
+"""
+
+import argparse
+import gzip
+import logging
+import os
+import sqlite3
+
+from bson import json_util
+from dotenv import load_dotenv
+from pymongo import ASCENDING, MongoClient
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+# Records per part file, and per insert_many/executemany on import
+CHUNK_SIZE = 5000
+COLLECTIONS = ("UserData", "DuelRecords")
+SQLITE_FOLDER = "database"
+DUPLICATE_KEY = 11000
+
+
+def _load_manifest(folder: str) -> dict:
+    path = os.path.join(folder, "manifest.json")
+    if not os.path.exists(path):
+        return {"collections": {}, "sqlite": {}, "imported": []}
+    with open(path) as f:
+        return json_util.loads(f.read())
+
+
+def _save_manifest(folder: str, manifest: dict):
+    # Write then rename, so a crash never leaves a half-written manifest
+    path = os.path.join(folder, "manifest.json")
+    with open(path + ".tmp", "w") as f:
+        f.write(json_util.dumps(manifest, indent=2))
+    os.replace(path + ".tmp", path)
+
+
+def _write_part(path: str, records: list):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with gzip.open(path + ".tmp", "wt", encoding="utf-8") as f:
+        for record in records:
+            f.write(json_util.dumps(record))
+            f.write("\n")
+    os.replace(path + ".tmp", path)
+
+
+def _read_part(path: str):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            yield json_util.loads(line)
+
+
+def _chunks(records, size: int = CHUNK_SIZE):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def export_collection(db, name: str, folder: str, manifest: dict) -> int:
+    """Stream a collection to parts in _id order, resuming after the last part."""
+    state = manifest["collections"].setdefault(name, {"parts": [], "last_id": None})
+    # Recorded up front so even an empty collection makes it into the manifest
+    _save_manifest(folder, manifest)
+    query = {"_id": {"$gt": state["last_id"]}} if state["last_id"] is not None else {}
+    cursor = db[name].find(query, batch_size=CHUNK_SIZE).sort("_id", ASCENDING)
+
+    exported = 0
+    for chunk in _chunks(cursor):
+        part = os.path.join("mongo", name, f"part-{len(state['parts']):05d}.ndjson.gz")
+        _write_part(os.path.join(folder, part), chunk)
+        state["parts"].append(part)
+        state["last_id"] = chunk[-1]["_id"]
+        _save_manifest(folder, manifest)
+        exported += len(chunk)
+    return exported
+
+
+def export_sqlite(path: str, folder: str, manifest: dict) -> int:
+    """Stream every table of a SQLite database to parts in rowid order."""
+    key = os.path.relpath(path, SQLITE_FOLDER)
+    database = manifest["sqlite"].setdefault(key, {"tables": {}})
+
+    exported = 0
+    with sqlite3.connect(path) as conn:
+        conn.row_factory = sqlite3.Row
+        tables = conn.execute(
+            "SELECT name, sql FROM sqlite_master "
+            "WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        ).fetchall()
+        for table in tables:
+            state = database["tables"].setdefault(
+                table["name"], {"schema": table["sql"], "parts": [], "last_rowid": 0}
+            )
+            # Saved before any rows, so empty tables still get their schema restored
+            _save_manifest(folder, manifest)
+            rows = conn.execute(
+                f'SELECT rowid AS "__rowid__", * FROM "{table["name"]}" '
+                "WHERE rowid > ? ORDER BY rowid",
+                (state["last_rowid"],),
+            )
+            for chunk in _chunks(dict(row) for row in rows):
+                part = os.path.join(
+                    "sqlite",
+                    key,
+                    table["name"],
+                    f"part-{len(state['parts']):05d}.ndjson.gz",
+                )
+                _write_part(os.path.join(folder, part), chunk)
+                state["parts"].append(part)
+                state["last_rowid"] = chunk[-1]["__rowid__"]
+                _save_manifest(folder, manifest)
+                exported += len(chunk)
+    return exported
+
+
+def export_all(folder: str, uri: str, db_name: str = "Users"):
+    os.makedirs(folder, exist_ok=True)
+    manifest = _load_manifest(folder)
+    db = MongoClient(uri)[db_name]
+
+    for name in COLLECTIONS:
+        count = export_collection(db, name, folder, manifest)
+        logger.info(f"Exported {count} documents from {name}")
+
+    for root, _, files in os.walk(SQLITE_FOLDER):
+        for filename in sorted(files):
+            if filename.endswith(".db"):
+                path = os.path.join(root, filename)
+                count = export_sqlite(path, folder, manifest)
+                logger.info(f"Exported {count} rows from {path}")
+
+    _save_manifest(folder, manifest)
+
+
+def _insert_chunk(collection, chunk: list):
+    """insert_many that tolerates documents already loaded by an earlier attempt."""
+    try:
+        collection.insert_many(chunk, ordered=False)
+    except BulkWriteError as e:
+        if any(error["code"] != DUPLICATE_KEY for error in e.details["writeErrors"]):
+            raise
+
+
+def import_all(folder: str, uri: str, db_name: str = "Users", sqlite_folder=None):
+    """Load an export into a Mongo database and SQLite folder, part by part."""
+    manifest = _load_manifest(folder)
+    imported = set(manifest["imported"])
+    db = MongoClient(uri)[db_name]
+    sqlite_folder = sqlite_folder or SQLITE_FOLDER
+
+    def done(part: str):
+        manifest["imported"].append(part)
+        _save_manifest(folder, manifest)
+
+    for name, state in manifest["collections"].items():
+        for part in state["parts"]:
+            if part in imported:
+                continue
+            for chunk in _chunks(_read_part(os.path.join(folder, part))):
+                _insert_chunk(db[name], chunk)
+            done(part)
+        logger.info(f"Imported {name}")
+
+    for key, database in manifest["sqlite"].items():
+        path = os.path.join(sqlite_folder, key)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with sqlite3.connect(path) as conn:
+            for table, state in database["tables"].items():
+                conn.execute(
+                    state["schema"].replace(
+                        "CREATE TABLE", "CREATE TABLE IF NOT EXISTS", 1
+                    )
+                )
+                for part in state["parts"]:
+                    if part in imported:
+                        continue
+                    for chunk in _chunks(_read_part(os.path.join(folder, part))):
+                        columns = [
+                            column for column in chunk[0] if column != "__rowid__"
+                        ]
+                        conn.executemany(
+                            f'INSERT OR IGNORE INTO "{table}" (rowid, '
+                            + ", ".join(f'"{column}"' for column in columns)
+                            + ") VALUES (?"
+                            + ", ?" * len(columns)
+                            + ")",
+                            (
+                                [row["__rowid__"], *(row[c] for c in columns)]
+                                for row in chunk
+                            ),
+                        )
+                    conn.commit()
+                    done(part)
+        logger.info(f"Imported {path}")
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("action", choices=("export", "import"))
+    parser.add_argument("folder", help="Backup folder (created on export)")
+    parser.add_argument("--uri", default=os.getenv("ATLAS_URI"))
+    parser.add_argument("--db", default="Users", help="Mongo database name")
+    parser.add_argument(
+        "--sqlite-folder", help="Where to restore the SQLite stores on import"
+    )
+    args = parser.parse_args()
+
+    if args.action == "export":
+        export_all(args.folder, args.uri, args.db)
+    else:
+        import_all(args.folder, args.uri, args.db, args.sqlite_folder)
@@ -0,0 +1,128 @@
+import random
+
+# Card ranks are ints: 1 is the ace, 11-13 are jack, queen and king
+RANKS = range(1, 14)
+CARD_EMOJIS = (
+    None,
+    "🇦",
+    "2️⃣",
+    "3️⃣",
+    "4️⃣",
+    "5️⃣",
+    "6️⃣",
+    "7️⃣",
+    "8️⃣",
+    "9️⃣",
+    "🔟",
+    "🇯",
+    "🇶",
+    "🇰",
+)
+
+
+def card_value(rank: int) -> int:
+    """Hard value of a card: aces count 1, faces count 10."""
+    return min(rank, 10)
+
+
+class Shoe:
+    """A multi-deck shoe that is shuffled once and dealt from in order.
+
+    Like a real table, a cut card sits at `penetration` of the way through;
+    once it has been reached the shoe is reshuffled before the next round,
+    never in the middle of one.
+    """
+
+    __slots__ = ("cards", "position", "cut")
+
+    def __init__(self, num_decks: int = 6, penetration: float = 0.75):
+        self.cards = list(RANKS) * 4 * num_decks
+        self.cut = int(len(self.cards) * penetration)
+        self.shuffle()
+
+    def shuffle(self):
+        random.shuffle(self.cards)
+        self.position = 0
+
+    def start_round(self):
+        """Reshuffle if the cut card came out during the previous round."""
+        if self.position >= self.cut:
+            self.shuffle()
+
+    def deal(self) -> int:
+        # Several hands can share a table's shoe; never run off the end
+        if self.position == len(self.cards):
+            self.shuffle()
+        card = self.cards[self.position]
+        self.position += 1
+        return card
+
+
+class Hand:
+    """A blackjack hand as card ranks, with its hard total kept up to date.
+
+    The hard total counts every ace as 1; the hand is soft when one ace can
+    count as 11 without busting.
+    """
+
+    __slots__ = ("cards", "hard", "aces")
+
+    def __init__(self, *cards: int):
+        self.cards = []
+        self.hard = 0
+        self.aces = 0
+        for card in cards:
+            self.add(card)
+
+    def add(self, card: int):
+        self.cards.append(card)
+        self.hard += card_value(card)
+        self.aces += card == 1
+
+    @property
+    def soft(self) -> bool:
+        return self.aces > 0 and self.hard <= 11
+
+    @property
+    def total(self) -> int:
+        return self.hard + 10 if self.soft else self.hard
+
+    @property
+    def busted(self) -> bool:
+        return self.hard > 21
+
+    @property
+    def natural(self) -> bool:
+        return len(self.cards) == 2 and self.total == 21
+
+    def label(self) -> str:
+        return f"{self.hard}/{self.hard + 10}" if self.soft else str(self.hard)
+
+    def render(self, hole: bool = False) -> str:
+        cards = " ".join(CARD_EMOJIS[card] for card in self.cards)
+        return f"{cards} ⬛" if hole else cards
+
+
+# DEALER_HITS[soft][hard]: the dealer draws below 17 and stands on every 17,
+# soft or hard. Hard totals past 21 are busts and never looked up.
+DEALER_HITS = tuple(
+    tuple(hard + 10 * soft < 17 for hard in range(22)) for soft in (False, True)
+)
+
+
+def play_dealer(dealer: Hand, shoe: Shoe) -> Hand:
+    """Draw for the dealer until the table says stand."""
+    while not dealer.busted and DEALER_HITS[dealer.soft][dealer.hard]:
+        dealer.add(shoe.deal())
+    return dealer
+
+
+def settle(player: Hand, dealer: Hand) -> str:
+    """Outcome for the player once both hands are final: win, lose or tie."""
+    if player.busted:
+        return "lose"
+    if dealer.busted or player.total > dealer.total:
+        return "win"
+    if player.total < dealer.total:
+        return "lose"
+    return "tie"
@@ -0,0 +1,91 @@
+import time
+from collections import OrderedDict
+
+# Intervals kept per user; the statistics always cover the last WINDOW clicks
+WINDOW = 24
+# Clicks needed before a user is judged either way
+MIN_SAMPLES = 12
+# Coefficient of variation (stdev / mean) of the intervals. Humans clicking as
+# fast as they can still vary by 20%+; scripts with a fixed sleep sit near 0.
+FLAGGED_CV = 0.06
+CLEAN_CV = 0.2
+# Gaps longer than this are breaks, not part of the clicking rhythm
+MAX_INTERVAL = 30.0
+# Least recently active users are dropped beyond this many
+MAX_TRACKED_USERS = 5000
+
+
+class ClickCadence:
+    """Ring buffer of one user's inter-click intervals with running sums."""
+
+    __slots__ = ("intervals", "index", "count", "total", "total_sq", "last_click")
+
+    def __init__(self):
+        self.intervals = [0.0] * WINDOW
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.last_click = None
+
+    def click(self, now: float):
+        if self.last_click is not None:
+            interval = now - self.last_click
+            if interval <= MAX_INTERVAL:
+                self._push(interval)
+        self.last_click = now
+
+    def _push(self, interval: float):
+        old = self.intervals[self.index]
+        if self.count == WINDOW:
+            self.total -= old
+            self.total_sq -= old * old
+        else:
+            self.count += 1
+        self.intervals[self.index] = interval
+        self.total += interval
+        self.total_sq += interval * interval
+        self.index = (self.index + 1) % WINDOW
+
+        if self.index == 0:
+            # Recompute once per lap so float error can't build up
+            self.total = sum(self.intervals)
+            self.total_sq = sum(value * value for value in self.intervals)
+
+    def variation(self):
+        """Coefficient of variation of the buffered intervals, or None if too few."""
+        if self.count < MIN_SAMPLES or self.total <= 0:
+            return None
+        mean = self.total / self.count
+        variance = max(self.total_sq / self.count - mean * mean, 0.0)
+        return variance**0.5 / mean
+
+
+_users: OrderedDict[int, ClickCadence] = OrderedDict()
+
+
+def record_click(user_id: int) -> ClickCadence:
+    """Record a grinder button click for the user and return their tracker."""
+    cadence = _users.pop(user_id, None) or ClickCadence()
+    cadence.click(time.monotonic())
+    _users[user_id] = cadence
+    if len(_users) > MAX_TRACKED_USERS:
+        _users.popitem(last=False)
+    return cadence
+
+
+def captcha_threshold(user_id: int, base: int, flagged: int = 10) -> int:
+    """Clicks allowed before the next captcha, adjusted for the user's rhythm.
+
+    Near-constant cadence drops the threshold to `flagged`; clearly human
+    variation doubles it. Users without enough clicks keep the base value.
+    """
+    cadence = _users.get(user_id)
+    variation = cadence.variation() if cadence else None
+    if variation is None:
+        return base
+    if variation < FLAGGED_CV:
+        return min(base, flagged)
+    if variation > CLEAN_CV:
+        return base * 2
+    return base
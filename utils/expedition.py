@@ -0,0 +1,69 @@
+from collections import namedtuple
+
+import numpy as np
+
+from utils.stats import SKILL_MAX_LEVEL, skill_xp_thresholds
+
+# One row of a loot table: rolls up to max_roll (0-101) land in this tier.
+# payout and loss are inclusive (low, high) ranges; (0, 0) means none.
+LootTier = namedtuple("LootTier", "name max_roll payout loss")
+
+# Same per-action rules as a single /mine or /fish click
+LEVEL_BONUS = 0.02
+XP_GAIN = (5, 10)
+
+_thresholds = np.array(skill_xp_thresholds())
+
+
+def loot_tier(tiers: tuple, roll: int) -> LootTier:
+    """Return the tier a 0-101 roll lands in."""
+    for tier in tiers:
+        if roll <= tier.max_roll:
+            return tier
+    return tiers[-1]
+
+
+def run_expedition(
+    tiers: tuple, actions: int, total_xp: int, tool_bonus: float, rng=None
+) -> dict:
+    """Resolve many mining/fishing actions at once without touching the database.
+
+    Rolls, payouts and XP are sampled as arrays. Each action's level bonus
+    uses the level reached by the XP of the actions before it, so level-ups
+    apply in order exactly as if the actions were clicked one by one.
+    """
+    rng = rng or np.random.default_rng()
+
+    rolls = rng.integers(0, 102, actions)
+    tier_index = np.searchsorted([tier.max_roll for tier in tiers], rolls)
+    payout_low, payout_high, loss_low, loss_high = (
+        np.array(bounds)[tier_index]
+        for bounds in zip(*((*tier.payout, *tier.loss) for tier in tiers))
+    )
+    payouts = rng.integers(payout_low, payout_high + 1)
+    losses = rng.integers(loss_low, loss_high + 1)
+    xp_gains = rng.integers(XP_GAIN[0], XP_GAIN[1] + 1, actions)
+
+    xp_before = total_xp + np.cumsum(xp_gains) - xp_gains
+    levels = np.minimum(
+        1 + np.searchsorted(_thresholds, xp_before, side="right"), SKILL_MAX_LEVEL
+    )
+
+    level_bonuses = (payouts * LEVEL_BONUS * levels).astype(np.int64)
+    tool_bonuses = (payouts * tool_bonus).astype(np.int64)
+    won = payouts > 0
+    balance_changes = np.where(won, payouts + level_bonuses + tool_bonuses, -losses)
+
+    best = int(np.argmax(balance_changes))
+    counts = np.bincount(tier_index, minlength=len(tiers))
+    return {
+        "actions": actions,
+        "xp_gain": int(xp_gains.sum()),
+        "balance_change": int(balance_changes.sum()),
+        "earned": int(balance_changes[won].sum()),
+        "lost": int(losses[~won].sum()),
+        "level_bonus": int(level_bonuses[won].sum()),
+        "tool_bonus": int(tool_bonuses[won].sum()),
+        "tiers": {tier.name: int(count) for tier, count in zip(tiers, counts)},
+        "best": (tiers[tier_index[best]].name, int(balance_changes[best])),
+    }
@@ -0,0 +1,183 @@
+import os
+import random
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import discord
+from dotenv import load_dotenv
+from pymongo import ASCENDING, MongoClient
+
+from utils.indexes import uses_index
+from utils.ledger import record_balance_change
+from utils.stats import record_game_result
+
+load_dotenv()
+MONGO_URL = os.getenv("ATLAS_URI")
+cluster = MongoClient(MONGO_URL)
+db = cluster["Users"]
+collection = db["UserData"]
+
+LOWEST, HIGHEST = 1, 100
+HOUSE_EDGE = 0.95  # 5% house edge
+GUESSES = ("higher", "lower")
+# A game in progress is kept on the user document as this list, with the
+# time it was last saved
+CHECKPOINT_FIELD = "highlow"
+CHECKPOINT_TIME_FIELD = "highlow_at"
+# A game's view times out this long after its last guess, and cashes out
+HIGHLOW_TIMEOUT = timedelta(seconds=60)
+# Checkpoints untouched for longer than this lost their view and are settled
+ABANDONED_AFTER = HIGHLOW_TIMEOUT * 2
+
+
+def _odds(guess: str, number: int) -> tuple[float, float]:
+    winning = HIGHEST - number if guess == "higher" else number - LOWEST
+    if not winning:
+        return 0.0, 0.0
+    chance = winning / (HIGHEST - LOWEST)
+    return chance, round(HOUSE_EDGE / chance, 2)
+
+
+# ODDS[guess][number] is the (win chance, multiplier) of guessing from number
+ODDS = {
+    guess: tuple(_odds(guess, number) for number in range(HIGHEST + 1))
+    for guess in GUESSES
+}
+
+# wager, the number showing, the multiplier so far and the round
+HighLowState = namedtuple("HighLowState", "wager number multiplier round")
+
+
+def new_game(wager: int) -> HighLowState:
+    return HighLowState(wager, random.randint(LOWEST, HIGHEST), 1.0, 1)
+
+
+def play(state: HighLowState, guess: str, next_number: int = None):
+    """Play one guess. Returns (next state, correct, next number)."""
+    if next_number is None:
+        next_number = random.randint(LOWEST, HIGHEST)
+    if guess == "higher":
+        correct = next_number > state.number
+    else:
+        correct = next_number < state.number
+    if not correct:
+        return state, False, next_number
+
+    _, multiplier = ODDS[guess][state.number]
+    return (
+        state._replace(
+            number=next_number,
+            multiplier=state.multiplier * multiplier,
+            round=state.round + 1,
+        ),
+        True,
+        next_number,
+    )
+
+
+def winnings(state: HighLowState) -> int:
+    return int(state.wager * state.multiplier)
+
+
+def start(user: discord.User, wager: int) -> HighLowState:
+    """Take the wager and checkpoint a new game in one write.
+
+    Returns None if the user can't cover the wager or already has a game going.
+    """
+    state = new_game(wager)
+    result = collection.update_one(
+        {
+            "_id": user.id,
+            "balance": {"$gte": wager},
+            CHECKPOINT_FIELD: {"$exists": False},
+        },
+        {
+            "$inc": {"balance": -wager},
+            "$set": {
+                CHECKPOINT_FIELD: list(state),
+                CHECKPOINT_TIME_FIELD: datetime.utcnow(),
+            },
+        },
+    )
+    if not result.modified_count:
+        return None
+    record_balance_change(user.id, -wager, "highlow")
+    return state
+
+
+def checkpoint(user: discord.User, previous: HighLowState, state: HighLowState) -> bool:
+    """Save a game's new state, unless it was settled or moved on since `previous`."""
+    result = collection.update_one(
+        {"_id": user.id, CHECKPOINT_FIELD: list(previous)},
+        {
+            "$set": {
+                CHECKPOINT_FIELD: list(state),
+                CHECKPOINT_TIME_FIELD: datetime.utcnow(),
+            }
+        },
+    )
+    return bool(result.modified_count)
+
+
+def settle(user: discord.User, state: HighLowState, lost: bool = False):
+    """Finish a game, paying out its winnings unless it was lost.
+
+    The payout, the game stats and clearing the checkpoint are one write
+    that only applies while the checkpoint still matches `state`, so a game
+    is settled exactly once however cashout, loss and timeout race. Returns
+    the amount paid out, or None if the game was already settled.
+    """
+    if lost:
+        result, amount, payout = "lose", state.wager, 0
+    elif state.round == 1:
+        # Nothing guessed yet, so the wager just comes back
+        result, amount, payout = "tie", 0, state.wager
+    else:
+        result, amount = "win", winnings(state)
+        payout = amount
+
+    maxima = {"biggest_multiplier": state.multiplier} if result == "win" else {}
+    updated = record_game_result(
+        user,
+        "highlow",
+        result,
+        amount,
+        return_fields=("balance",),
+        balance_change=payout,
+        query={CHECKPOINT_FIELD: list(state)},
+        extra_update={"$unset": {CHECKPOINT_FIELD: "", CHECKPOINT_TIME_FIELD: ""}},
+        **maxima,
+    )
+    if updated is None:
+        return None
+    if payout:
+        record_balance_change(user.id, payout, "highlow")
+    return payout
+
+
+@uses_index(
+    collection,
+    [(CHECKPOINT_FIELD, ASCENDING)],
+    query={CHECKPOINT_FIELD: {"$exists": True}},
+    sparse=True,
+)
+def settle_abandoned() -> int:
+    """Cash out every game whose checkpoint outlived its view's timeout.
+
+    Those views died with their process (a restart or crash), so nothing
+    else will settle them. Live games keep their checkpoint fresh and are
+    left alone, whichever process or cog load runs this.
+    """
+    cutoff = datetime.utcnow() - ABANDONED_AFTER
+    settled = 0
+    for doc in collection.find(
+        {
+            CHECKPOINT_FIELD: {"$exists": True},
+            CHECKPOINT_TIME_FIELD: {"$not": {"$gte": cutoff}},
+        },
+        {CHECKPOINT_FIELD: 1},
+    ):
+        user = discord.Object(id=doc["_id"])
+        if settle(user, HighLowState(*doc[CHECKPOINT_FIELD])) is not None:
+            settled += 1
+    return settled
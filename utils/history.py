@@ -0,0 +1,87 @@
+import os
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+from pymongo import ASCENDING, MongoClient, UpdateOne
+
+from utils.indexes import uses_index
+from utils.ledger import flush_ledger, ledger
+
+load_dotenv()
+MONGO_URL = os.getenv("ATLAS_URI")
+cluster = MongoClient(MONGO_URL)
+db = cluster["Users"]
+collection = db["UserData"]
+# One document per user per month: {user_id, month, points: [{day, balance, bank}]}
+history = db["BalanceHistory"]
+
+# Users whose balances are read per $in query when snapshotting
+SNAPSHOT_CHUNK_SIZE = 1000
+
+
+def _start_of_month(moment: datetime) -> datetime:
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+@uses_index(
+    ledger,
+    [("at", ASCENDING)],
+    query={"at": {"$gte": datetime(1970, 1, 1), "$lt": datetime(1970, 1, 2)}},
+)
+@uses_index(history, [("user_id", ASCENDING), ("month", ASCENDING)], unique=True)
+def snapshot_balances(day: datetime = None) -> int:
+    """Store balance and bank for every user active on the given day.
+
+    Defaults to yesterday. A user is active if the ledger has a balance change
+    for them that day, so idle accounts cost nothing. Re-running for the same
+    day replaces that day's points. Returns the number of users snapshotted.
+    """
+    if day is None:
+        day = datetime.utcnow() - timedelta(days=1)
+    day = day.replace(hour=0, minute=0, second=0, microsecond=0)
+    month = _start_of_month(day)
+
+    # Entries still in the buffer count as activity too
+    flush_ledger()
+    user_ids = ledger.distinct(
+        "user_id", {"at": {"$gte": day, "$lt": day + timedelta(days=1)}}
+    )
+
+    for start in range(0, len(user_ids), SNAPSHOT_CHUNK_SIZE):
+        chunk = user_ids[start : start + SNAPSHOT_CHUNK_SIZE]
+        ops = []
+        for user in collection.find({"_id": {"$in": chunk}}, {"balance": 1, "bank": 1}):
+            bucket = {"user_id": user["_id"], "month": month}
+            point = {
+                "day": day,
+                "balance": user.get("balance", 0),
+                "bank": user.get("bank", 0),
+            }
+            ops.append(UpdateOne(bucket, {"$pull": {"points": {"day": day}}}))
+            ops.append(UpdateOne(bucket, {"$push": {"points": point}}, upsert=True))
+        if ops:
+            history.bulk_write(ops, ordered=True)
+
+    return len(user_ids)
+
+
+@uses_index(
+    history,
+    [("user_id", ASCENDING), ("month", ASCENDING)],
+    query={"user_id": 0, "month": {"$gte": datetime(1970, 1, 1)}},
+    sort=[("month", ASCENDING)],
+    unique=True,
+)
+def balance_series(user_id: int, since: datetime) -> list[dict]:
+    """Return a user's daily {day, balance, bank} points since the given date.
+
+    One range query over the monthly buckets. Days without activity have no
+    point; the last known values still apply to them.
+    """
+    points = []
+    for bucket in history.find(
+        {"user_id": user_id, "month": {"$gte": _start_of_month(since)}},
+        {"points": 1},
+    ).sort("month", ASCENDING):
+        points.extend(point for point in bucket["points"] if point["day"] >= since)
+    return sorted(points, key=lambda point: point["day"])
@@ -0,0 +1,79 @@
+import logging
+
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# (collection name, index name) -> (collection, IndexModel, functions using it)
+_INDEXES: dict[tuple, tuple] = {}
+# (collection name, function) -> (collection, filter, sort) sample query pattern
+_QUERIES: dict[tuple, tuple] = {}
+
+
+def uses_index(
+    collection, keys: list, query: dict = None, sort: list = None, **options
+):
+    """Declare the index a function's query needs, right next to that function.
+
+    The index is created at startup by ensure_indexes. If a sample query is
+    given, audit_query_coverage explains it to check the index is actually
+    used. Returns the function unchanged, so it goes below any
+    app_commands/tasks decorators. Re-declaring (e.g. on a cog reload) is a no-op.
+    """
+
+    def decorator(func):
+        used_by = func.__qualname__
+        if keys != [("_id", 1)]:
+            model = IndexModel(keys, **options)
+            key = (collection.full_name, model.document["name"])
+            _INDEXES.setdefault(key, (collection, model, set()))[2].add(used_by)
+        if query is not None:
+            _QUERIES[(collection.full_name, used_by)] = (collection, query, sort)
+        return func
+
+    return decorator
+
+
+def ensure_indexes():
+    """Create every declared index. Existing identical indexes are left alone."""
+    for (full_name, name), (collection, model, used_by) in _INDEXES.items():
+        try:
+            collection.create_indexes([model])
+        except OperationFailure as e:
+            logger.error(
+                f"Could not create index {name} on {full_name} "
+                f"(used by {', '.join(sorted(used_by))}): {e}"
+            )
+
+
+def _collection_scans(plan: dict) -> bool:
+    if plan.get("stage") == "COLLSCAN":
+        return True
+    children = plan.get("inputStages", [])
+    if "inputStage" in plan:
+        children = children + [plan["inputStage"]]
+    if "queryPlan" in plan:
+        children = children + [plan["queryPlan"]]
+    return any(_collection_scans(child) for child in children)
+
+
+def audit_query_coverage() -> list[str]:
+    """Explain every declared query pattern and report the ones doing a COLLSCAN."""
+    uncovered = []
+    for (full_name, used_by), (collection, query, sort) in _QUERIES.items():
+        cursor = collection.find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        try:
+            winning_plan = cursor.explain()["queryPlanner"]["winningPlan"]
+        except (PyMongoError, KeyError) as e:
+            # A diagnostic, so it should never stop the bot from starting
+            logger.error(f"Could not explain {used_by}'s query on {full_name}: {e}")
+            continue
+        if _collection_scans(winning_plan):
+            uncovered.append(used_by)
+            logger.warning(
+                f"{used_by} queries {full_name} without index coverage: {query}"
+            )
+    return uncovered
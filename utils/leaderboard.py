@@ -0,0 +1,164 @@
+import os
+import socket
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+from pymongo import DESCENDING, MongoClient
+from pymongo.errors import DuplicateKeyError
+
+from utils.indexes import uses_index
+
+load_dotenv()
+MONGO_URL = os.getenv("ATLAS_URI")
+cluster = MongoClient(MONGO_URL)
+db = cluster["Users"]
+collection = db["UserData"]
+duel_records = db["DuelRecords"]
+# One cached top-N document per board, plus the "lease" document that decides
+# which process recomputes them
+leaderboards = db["Leaderboards"]
+
+TOP_N = 100
+REFRESH_INTERVAL = timedelta(minutes=5)
+# Identifies this process when taking the refresh lease
+LEASE_OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+# Board -> the UserData field it ranks on
+BOARD_FIELDS = {
+    "balance": "balance",
+    "bank": "bank",
+    "mining": "mining_level",
+    "fishing": "fishing_level",
+}
+DUEL_BOARD = "total_amount_won"
+
+
+def acquire_lease(
+    leases, now: datetime, name: str = "lease", interval: timedelta = REFRESH_INTERVAL
+) -> bool:
+    """Take the named lease unless another process holds an unexpired one.
+
+    Used for periodic work that every process schedules but only one should do.
+    """
+    try:
+        leases.update_one(
+            {"_id": name, "until": {"$lte": now}},
+            {"$set": {"owner": LEASE_OWNER, "until": now + interval}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # The lease exists and has not expired, so the upsert collided with it
+        return False
+    return True
+
+
+@uses_index(
+    collection,
+    [("balance", DESCENDING)],
+    query={"balance": {"$gt": 0}},
+    sort=[("balance", DESCENDING)],
+)
+@uses_index(
+    collection,
+    [("bank", DESCENDING)],
+    query={"bank": {"$gt": 0}},
+    sort=[("bank", DESCENDING)],
+)
+@uses_index(
+    collection,
+    [("mining_level", DESCENDING)],
+    query={"mining_level": {"$gt": 0}},
+    sort=[("mining_level", DESCENDING)],
+)
+@uses_index(
+    collection,
+    [("fishing_level", DESCENDING)],
+    query={"fishing_level": {"$gt": 0}},
+    sort=[("fishing_level", DESCENDING)],
+)
+def _top_users(field: str) -> list[dict]:
+    return [
+        {"user_id": doc["_id"], "value": doc[field]}
+        for doc in collection.find({field: {"$gt": 0}}, {field: 1})
+        .sort(field, DESCENDING)
+        .limit(TOP_N)
+    ]
+
+
+def _top_duelists() -> list[dict]:
+    # Net winnings are a sum over each user's pairwise records, so this
+    # board has no index to sort on; it is only ever computed here
+    return [
+        {"user_id": doc["_id"], "value": doc["value"]}
+        for doc in duel_records.aggregate(
+            [
+                {
+                    "$group": {
+                        "_id": "$user_id",
+                        "value": {
+                            "$sum": {
+                                "$subtract": [
+                                    {"$ifNull": ["$amount_won", 0]},
+                                    {"$ifNull": ["$amount_lost", 0]},
+                                ]
+                            }
+                        },
+                    }
+                },
+                {"$match": {"value": {"$gt": 0}}},
+                {"$sort": {"value": -1}},
+                {"$limit": TOP_N},
+            ]
+        )
+    ]
+
+
+def refresh_leaderboards(force: bool = False) -> bool:
+    """Recompute every cached global board if this process wins the lease.
+
+    Every process calls this on the same interval; only the first one to
+    find the lease expired does the work. Returns whether it refreshed.
+    """
+    now = datetime.utcnow()
+    if not force and not acquire_lease(leaderboards, now):
+        return False
+
+    boards = {board: _top_users(field) for board, field in BOARD_FIELDS.items()}
+    boards[DUEL_BOARD] = _top_duelists()
+    for board, entries in boards.items():
+        leaderboards.replace_one(
+            {"_id": board},
+            {"computed_at": now, "entries": entries},
+            upsert=True,
+        )
+    return True
+
+
+def get_leaderboard(board: str) -> dict:
+    """Return the cached {computed_at, entries} for a board, computing it if missing."""
+    cached = leaderboards.find_one({"_id": board})
+    if cached is None:
+        refresh_leaderboards(force=True)
+        cached = leaderboards.find_one({"_id": board})
+    return cached
+
+
+def global_rank(user_id: int, board: str):
+    """Return the user's 1-based global rank on a board, or None if unranked.
+
+    Indexed boards count the users strictly ahead of this one, which is an
+    index-only range count. The duel board only ranks its cached top N.
+    """
+    if board not in BOARD_FIELDS:
+        entries = leaderboards.find_one({"_id": board}, {"entries": 1}) or {}
+        for position, entry in enumerate(entries.get("entries", []), start=1):
+            if entry["user_id"] == user_id:
+                return position
+        return None
+
+    field = BOARD_FIELDS[board]
+    user = collection.find_one({"_id": user_id}, {field: 1})
+    value = (user or {}).get(field, 0)
+    if value <= 0:
+        return None
+    return collection.count_documents({field: {"$gt": value}}) + 1
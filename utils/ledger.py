@@ -0,0 +1,159 @@
+import os
+import threading
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+from pymongo import ASCENDING, MongoClient, UpdateOne
+
+from utils.indexes import uses_index
+
+load_dotenv()
+MONGO_URL = os.getenv("ATLAS_URI")
+cluster = MongoClient(MONGO_URL)
+db = cluster["Users"]
+ledger = db["Ledger"]
+snapshots = db["LedgerSnapshots"]
+
+# Raw entries older than this are rolled up into daily snapshots
+SNAPSHOT_AFTER_DAYS = 30
+
+_pending: list[dict] = []
+_pending_lock = threading.Lock()
+
+
+def record_balance_change(user_id: int, delta: int, source: str):
+    """Queue a ledger entry for a balance change.
+
+    Nothing is written here, since this runs in the middle of commands; the
+    Economy cog's flush_ledger_entries task writes the queue every 30 seconds.
+    """
+    if not delta:
+        return
+
+    entry = {
+        "user_id": user_id,
+        "delta": delta,
+        "source": source,
+        "at": datetime.utcnow(),
+    }
+    with _pending_lock:
+        _pending.append(entry)
+
+
+def flush_ledger() -> int:
+    """Write all queued entries with one insert_many. Returns the number written."""
+    global _pending
+
+    with _pending_lock:
+        batch, _pending = _pending, []
+
+    if not batch:
+        return 0
+
+    try:
+        ledger.insert_many(batch, ordered=False)
+    except Exception:
+        # Put the entries back so the next flush retries them
+        with _pending_lock:
+            _pending[:0] = batch
+        raise
+    return len(batch)
+
+
+def _start_of_day(moment: datetime) -> datetime:
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+@uses_index(ledger, [("at", ASCENDING)], query={"at": {"$lt": datetime(1970, 1, 1)}})
+@uses_index(snapshots, [("user_id", ASCENDING), ("day", ASCENDING)], unique=True)
+def compact_ledger(older_than_days: int = SNAPSHOT_AFTER_DAYS) -> int:
+    """Roll ledger entries older than the cutoff into daily per-user snapshots.
+
+    The cutoff is a midnight boundary, so every day is compacted in a single
+    run and its snapshot can be written with $set. Re-running after a crash
+    recomputes the same totals instead of double counting.
+    Returns the number of snapshots written.
+    """
+    cutoff = _start_of_day(datetime.utcnow() - timedelta(days=older_than_days))
+
+    pipeline = [
+        {"$match": {"at": {"$lt": cutoff}}},
+        {
+            "$group": {
+                "_id": {
+                    "user_id": "$user_id",
+                    "day": {
+                        "$dateFromParts": {
+                            "year": {"$year": "$at"},
+                            "month": {"$month": "$at"},
+                            "day": {"$dayOfMonth": "$at"},
+                        }
+                    },
+                    "source": "$source",
+                },
+                "delta": {"$sum": "$delta"},
+                "entries": {"$sum": 1},
+            }
+        },
+    ]
+
+    days = {}
+    for row in ledger.aggregate(pipeline, allowDiskUse=True):
+        key = (row["_id"]["user_id"], row["_id"]["day"])
+        day = days.setdefault(key, {"delta": 0, "entries": 0, "sources": {}})
+        day["delta"] += row["delta"]
+        day["entries"] += row["entries"]
+        day["sources"][row["_id"]["source"]] = row["delta"]
+
+    if not days:
+        return 0
+
+    snapshots.bulk_write(
+        [
+            UpdateOne(
+                {"user_id": user_id, "day": day},
+                {"$set": totals},
+                upsert=True,
+            )
+            for (user_id, day), totals in days.items()
+        ],
+        ordered=False,
+    )
+    ledger.delete_many({"at": {"$lt": cutoff}})
+    return len(days)
+
+
+@uses_index(
+    ledger,
+    [("user_id", ASCENDING), ("at", ASCENDING)],
+    query={"user_id": 0, "at": {"$gte": datetime(1970, 1, 1)}},
+)
+@uses_index(
+    snapshots,
+    [("user_id", ASCENDING), ("day", ASCENDING)],
+    query={"user_id": 0, "day": {"$gte": datetime(1970, 1, 1)}},
+    unique=True,
+)
+def balance_history(user_id: int, since: datetime) -> list[dict]:
+    """Return a user's net balance change per day since the given date.
+
+    Compacted days come from the snapshots and recent days from the raw
+    ledger; both are range scans on (user_id, day/at).
+    """
+    since = _start_of_day(since)
+    history = {
+        doc["day"]: doc["delta"]
+        for doc in snapshots.find(
+            {"user_id": user_id, "day": {"$gte": since}},
+            {"day": 1, "delta": 1},
+        )
+    }
+
+    for entry in ledger.find(
+        {"user_id": user_id, "at": {"$gte": since}},
+        {"delta": 1, "at": 1},
+    ):
+        day = _start_of_day(entry["at"])
+        history[day] = history.get(day, 0) + entry["delta"]
+
+    return [{"day": day, "delta": history[day]} for day in sorted(history)]
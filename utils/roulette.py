@@ -0,0 +1,60 @@
+import random
+
+import discord
+
+from utils.ledger import record_balance_change
+from utils.stats import balance_of_player, game_counters, record_game_result
+
+COLORS = ("red", "black", "green")
+WEIGHTS = (18, 18, 2)
+# What a winning bet returns, stake included
+PAYOUTS = {"red": 2, "black": 2, "green": 14}
+
+
+def spin() -> str:
+    return random.choices(COLORS, weights=WEIGHTS)[0]
+
+
+class RouletteSession:
+    """One player's run of spins at a fixed bet.
+
+    balance is a write-through cache: each spin is a single conditional
+    write that moves the balance and the stats together and returns both,
+    so replays never read the balance separately. It's only read again if
+    a spin is refused, in case the cached value had drifted.
+    """
+
+    __slots__ = ("user", "amount", "balance")
+
+    def __init__(self, user: discord.User, amount: int, balance: int):
+        self.user = user
+        self.amount = amount
+        self.balance = balance
+
+    def play(self, color: str):
+        """Spin for `color`. Returns (roll, balance change, roulette counters),
+        or None if the bet isn't covered any more."""
+        roll = spin()
+        if roll == color:
+            result, amount = "win", self.amount * (PAYOUTS[color] - 1)
+            change = amount
+        else:
+            result, amount = "lose", self.amount
+            change = -amount
+
+        updated = record_game_result(
+            self.user,
+            "roulette",
+            result,
+            amount,
+            return_fields=("balance", "games.roulette"),
+            balance_change=change,
+            min_balance=self.amount,
+        )
+        if updated is None:
+            _, self.balance = balance_of_player(self.user)
+            return None
+
+        self.balance = updated["balance"]
+        record_balance_change(self.user.id, change, "roulette")
+        return roll, change, game_counters(updated, "roulette")
@@ -0,0 +1,94 @@
+import heapq
+from datetime import datetime, timedelta
+
+
+class SessionStore:
+    """In-memory game sessions keyed by user, each expiring a fixed time after use.
+
+    Expiry times sit in a min-heap next to the dict, so expire() only pops
+    the sessions that are actually due (O(log n) each) instead of scanning
+    every session. Touching a session pushes a new heap entry and leaves the
+    old one behind; stale entries are skipped when they reach the top.
+
+    With a collection, every session is also written there as
+    {_id, expires_at, state}, so restore() can bring back in-flight games
+    after a cog reload or restart.
+    """
+
+    def __init__(self, ttl: timedelta, max_sessions: int = 10000, collection=None):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.collection = collection
+        self._sessions = {}  # key -> (expires_at, session)
+        self._heap = []  # (expires_at, key), possibly stale
+
+    def __contains__(self, key) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, key):
+        entry = self._sessions.get(key)
+        if entry is None or entry[0] <= datetime.utcnow():
+            return None
+        return entry[1]
+
+    def add(self, key, session, expires_at: datetime = None):
+        """Store a session (replacing any other for the key) and persist it."""
+        expires_at = expires_at or datetime.utcnow() + self.ttl
+        self._sessions[key] = (expires_at, session)
+        heapq.heappush(self._heap, (expires_at, key))
+        while len(self._sessions) > self.max_sessions:
+            self._pop_earliest()
+        self._save(key)
+
+    def touch(self, key):
+        """Push a session's expiry back by the TTL and persist its current state."""
+        entry = self._sessions.get(key)
+        if entry is not None:
+            self.add(key, entry[1])
+
+    def pop(self, key):
+        entry = self._sessions.pop(key, None)
+        if self.collection is not None:
+            self.collection.delete_one({"_id": key})
+        return entry[1] if entry else None
+
+    def expire(self, now: datetime = None) -> list:
+        """Remove and return (key, session) for every session past its expiry."""
+        now = now or datetime.utcnow()
+        expired = []
+        while self._heap and self._heap[0][0] <= now:
+            expired.append(self._pop_earliest())
+        return [entry for entry in expired if entry is not None]
+
+    def _pop_earliest(self):
+        expires_at, key = heapq.heappop(self._heap)
+        entry = self._sessions.get(key)
+        if entry is None or entry[0] != expires_at:
+            return None  # Popped, or touched since this heap entry was pushed
+        self.pop(key)
+        return key, entry[1]
+
+    def _save(self, key):
+        if self.collection is None:
+            return
+        expires_at, session = self._sessions[key]
+        self.collection.replace_one(
+            {"_id": key},
+            {"expires_at": expires_at, "state": session.to_document()},
+            upsert=True,
+        )
+
+    def restore(self, from_document) -> int:
+        """Load unexpired persisted sessions, rebuilding each with from_document."""
+        if self.collection is None:
+            return 0
+        restored = 0
+        for doc in self.collection.find({"expires_at": {"$gt": datetime.utcnow()}}):
+            expires_at, session = doc["expires_at"], from_document(doc["state"])
+            self._sessions[doc["_id"]] = (expires_at, session)
+            heapq.heappush(self._heap, (expires_at, doc["_id"]))
+            restored += 1
+        return restored
@@ -0,0 +1,69 @@
+import numpy as np
+
+SYMBOLS = "🍎🍊🍐🍋🍉🍇🍓🍒"
+# 🍐, 🍉 and 🍒 pay on their own when enough of them land anywhere
+SPECIAL = np.array([SYMBOLS.index(fruit) for fruit in "🍐🍉🍒"])
+
+# Board cells are numbered 0-8 left to right, top to bottom; a cell set is a 9-bit mask
+LINES = (
+    (0, 1, 2),
+    (3, 4, 5),
+    (6, 7, 8),  # horizontals
+    (0, 4, 8),
+    (2, 4, 6),  # diagonals
+    (0, 3, 6),
+    (1, 4, 7),
+    (2, 5, 8),  # verticals
+)
+LINE_MASKS = tuple(sum(1 << cell for cell in line) for line in LINES)
+# Indexed by the mask of cells holding one symbol
+COMPLETES_LINE = np.array(
+    [any(mask & line == line for line in LINE_MASKS) for mask in range(512)]
+)
+POPCOUNT = np.array([bin(mask).count("1") for mask in range(512)])
+CELL_BITS = 1 << np.arange(9)
+
+# (multiplier, description) by outcome; a line beats special fruit counts
+LINE_WIN = (2, "3 in a line")
+SPECIAL_WINS = {
+    3: (1, "3 special fruits"),
+    4: (5, "4 special fruits"),
+    5: (35, "5+ special fruits"),
+    9: (999, "MAX WIN BABY"),
+}
+NO_MATCH = (-1, "No matches")
+OUTCOMES = (LINE_WIN, *SPECIAL_WINS.values(), NO_MATCH)
+
+
+def spin(spins: int, rng=None) -> tuple[np.ndarray, np.ndarray]:
+    """Spin `spins` boards at once.
+
+    Returns the boards as an (spins, 9) array of symbol indexes and each
+    board's index into OUTCOMES.
+    """
+    rng = rng or np.random.default_rng()
+    boards = rng.integers(0, len(SYMBOLS), (spins, 9))
+
+    # masks[i, s] is the set of cells on board i holding symbol s
+    masks = (boards[:, None, :] == np.arange(len(SYMBOLS))[:, None]) @ CELL_BITS
+    line = COMPLETES_LINE[masks].any(axis=1)
+    special = POPCOUNT[masks[:, SPECIAL]].max(axis=1)
+
+    outcome = np.select(
+        [line, special == 9, special >= 5, special == 4, special == 3],
+        [0, 4, 3, 2, 1],
+        default=len(OUTCOMES) - 1,
+    )
+    return boards, outcome
+
+
+def payouts(outcome: np.ndarray, amount: int) -> np.ndarray:
+    multipliers = np.array([multiplier for multiplier, _ in OUTCOMES])
+    return multipliers[outcome] * amount
+
+
+def render_board(board) -> str:
+    return "\n".join(
+        " ".join(SYMBOLS[symbol] for symbol in board[row : row + 3])
+        for row in range(0, 9, 3)
+    )
@@ -1,39 +1,41 @@
+import copy
+import logging
 import os
 from datetime import datetime
 
 import discord
 from dotenv import load_dotenv
-from pymongo import MongoClient
+from pymongo import ASCENDING, MongoClient, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+
+from utils.indexes import uses_index
+from utils.ledger import record_balance_change
+
+logger = logging.getLogger(__name__)
 
 load_dotenv()
 MONGO_URL = os.getenv("ATLAS_URI")
 cluster = MongoClient(MONGO_URL)
 db = cluster["Users"]
 collection = db["UserData"]
+transfers = db["Transfers"]
+# One document per (user_id, opponent_id) pair with that user's side of the record
+duel_records = db["DuelRecords"]
+
+# Set to False the first time the server rejects a transaction (standalone mongod)
+_transactions_supported = True
 
 
+# Bump this and add a step to _MIGRATIONS whenever the user document changes
+SCHEMA_VERSION = 3
+
 # Default values for new user documents
 DEFAULT_USER_DATA = {
     "_id": None,  # This will be set to the user's ID when updating
+    "schema_version": SCHEMA_VERSION,
     "balance": 1000,
-    "gambles_won": 0,
-    "gambles_lost": 0,
-    "gambles_played": 0,
-    "gambles_total_winnings": 0,
-    "gambles_total_losses": 0,
-    "blackjacks_won": 0,
-    "blackjacks_lost": 0,
-    "blackjacks_played": 0,
-    "blackjacks_total_winnings": 0,
-    "blackjacks_total_losses": 0,
-    "slots_won": 0,
-    "slots_lost": 0,
-    "slots_played": 0,
-    "slots_total_winnings": 0,
-    "slots_total_losses": 0,
-    "wordles_won": 0,
-    "wordles_lost": 0,
-    "wordles_played": 0,
+    # Per-game counters: games.<name>.{won, lost, played, total_winnings, total_losses}
+    "games": {},
     "daily_streak": 0,
     "last_daily": 0,
     "last_heist": 0,
@@ -46,8 +48,6 @@ DEFAULT_USER_DATA = {
     "total_loot_lost": 0,
     "backstabs": 0,
     "times_betrayed": 0,
-    # Duel Stats:
-    "duel_stats": {},
     # Steal Stats
     "steals_attempted": 0,  # Total number of steal attempts by the user
     "steals_successful": 0,  # Total number of successful steals by the user
@@ -71,19 +71,6 @@ DEFAULT_USER_DATA = {
     "bank": 0,  # Bank balance
     "bank_cap": 1000000,  # Bank cap
     "bank_level": 1,  # Bank level
-    # highlow game
-    "highlow_won": 0,
-    "highlow_lost": 0,
-    "highlow_played": 0,
-    "highlow_total_winnings": 0,
-    "highlow_total_losses": 0,
-    "highlow_biggest_multiplier": 0,
-    # roulette game
-    "roulette_won": 0,
-    "roulette_lost": 0,
-    "roulette_played": 0,
-    "roulette_total_winnings": 0,
-    "roulette_total_losses": 0,
     # player stats
     "player_hp": 100,
     "player_attack": 5,
@@ -95,83 +82,134 @@ DEFAULT_USER_DATA = {
 }
 
 
-def get_user_data(member: discord.Member):
-    """Retrieve or initialize a user's data from the database."""
+# Counters kept under games.<name> for each game
+GAME_COUNTERS = ("won", "lost", "played", "total_winnings", "total_losses")
+# Fields stored as running maximums rather than counters
+GAME_MAXIMUMS = ("biggest_multiplier",)
+GAME_STAT_FIELDS = {
+    "gamble": GAME_COUNTERS,
+    "blackjack": GAME_COUNTERS,
+    "slots": GAME_COUNTERS,
+    "wordle": ("won", "lost", "played"),
+    "highlow": GAME_COUNTERS + GAME_MAXIMUMS,
+    "roulette": GAME_COUNTERS,
+    "horserace": GAME_COUNTERS,
+}
+# Flat field prefixes used before the counters moved under games.<name>
+LEGACY_GAME_PREFIXES = {
+    "gamble": "gambles",
+    "blackjack": "blackjacks",
+    "slots": "slots",
+    "wordle": "wordles",
+    "highlow": "highlow",
+    "roulette": "roulette",
+}
+
+# Fields touched by almost every economy command. Hot paths fetch only these
+# (plus what they need) so the large, rarely read statistics stay on the server.
+HOT_FIELDS = (
+    "balance",
+    "bank",
+    "bank_cap",
+    "bank_level",
+    "daily_streak",
+    "last_daily",
+    "last_heist",
+    "last_steal",
+    "last_stolen",
+    "mining_level",
+    "mining_xp",
+    "next_level_xp",
+    "fishing_level",
+    "fishing_xp",
+    "fishing_next_level_xp",
+    "player_level",
+)
+
+
+def get_user_data(member: discord.Member, fields: tuple = None):
+    """Retrieve or initialize a user's data from the database.
+
+    If fields is given only those keys are fetched. Documents older than
+    SCHEMA_VERSION are upgraded on the spot, so every default field exists.
+    """
     search = {"_id": member.id}
-    # Set missing keys using $set to fill in any missing fields with DEFAULT_USER_DATA values
-    user_data = collection.find_one(search)
+    projection = dict.fromkeys(fields + ("schema_version",), 1) if fields else None
+    user_data = collection.find_one(search, projection)
     if user_data:
-        # Find missing fields and set them to default values
-        missing_fields = {
-            key: value
-            for key, value in DEFAULT_USER_DATA.items()
-            if key not in user_data
-        }
-        if missing_fields:
-            collection.update_one(search, {"$set": missing_fields})
+        if user_data.get("schema_version", 0) < SCHEMA_VERSION:
+            # Not reached by the startup migration yet (or inserted elsewhere)
+            _upgrade_user(user_data["_id"])
+            user_data = collection.find_one(search, projection)
     else:
-        # Insert new document with all default values
-        user_data = DEFAULT_USER_DATA.copy()
+        # Insert new document with all default values; deep, since callers
+        # mutate the inventory list and games dict of what's returned
+        user_data = copy.deepcopy(DEFAULT_USER_DATA)
         user_data["_id"] = member.id
         collection.insert_one(user_data)
-    return collection.find_one(search)
+        if fields:
+            user_data = {
+                key: user_data[key] for key in ("_id", *fields) if key in user_data
+            }
+    return user_data
+
+
+def get_hot_user_data(member: discord.Member, extra_fields: tuple = ()):
+    """Retrieve only the frequently used fields (balances, cooldowns, levels)."""
+    return get_user_data(member, HOT_FIELDS + tuple(extra_fields))
 
 
 def balance_of_player(member: discord.Member):
     """Retrieve the user's balance, initializing it if they don't have an account."""
-    user_data = get_user_data(member)
+    user_data = get_user_data(member, ("balance",))
     return user_data["balance"], user_data["balance"]
 
 
+def game_counters(user_data: dict, game: str) -> dict:
+    """Pull one game's counters out of a user document, defaulting missing ones to 0."""
+    stats = (user_data or {}).get("games", {}).get(game, {})
+    return {field: stats.get(field, 0) for field in GAME_STAT_FIELDS[game]}
+
+
+def game_stats(member: discord.Member, game: str) -> dict:
+    """Retrieve one game's counters for the user, defaulting missing ones to 0."""
+    return game_counters(get_user_data(member, (f"games.{game}",)), game)
+
+
 def gamble_stats(member: discord.Member):
     """Retrieve gamble stats for the user, initializing fields if they don't exist."""
-    user_data = get_user_data(member)
-    return (
-        user_data["gambles_won"],
-        user_data["gambles_lost"],
-        user_data["gambles_played"],
-        user_data["gambles_total_winnings"],
-        user_data["gambles_total_losses"],
-    )
+    return tuple(game_stats(member, "gamble").values())
 
 
 def blackjack_stats(member: discord.Member):
     """Retrieve blackjack stats for the user, initializing fields if they don't exist."""
-    user_data = get_user_data(member)
-    return (
-        user_data["blackjacks_won"],
-        user_data["blackjacks_lost"],
-        user_data["blackjacks_played"],
-        user_data["blackjacks_total_winnings"],
-        user_data["blackjacks_total_losses"],
-    )
+    return tuple(game_stats(member, "blackjack").values())
 
 
 def slots_stats(member: discord.Member):
     """Retrieve slots stats for the user, initializing fields if they don't exist."""
-    user_data = get_user_data(member)
-    return (
-        user_data["slots_won"],
-        user_data["slots_lost"],
-        user_data["slots_played"],
-        user_data["slots_total_winnings"],
-        user_data["slots_total_losses"],
-    )
+    return tuple(game_stats(member, "slots").values())
 
 
 def wordle_stats(member: discord.Member):
     """Retreive wordle stats for the user, initializing fields if they don't exist."""
-    user_data = get_user_data(member)
-    return (
-        user_data["wordles_won"],
-        user_data["wordles_lost"],
-        user_data["wordles_played"],
-    )
+    return tuple(game_stats(member, "wordle").values())
 
 
 def heist_stats(member: discord.Member):
     """Retrieve heist stats for the user, initializing fields if they don't exist."""
-    user_data = get_user_data(member)
+    user_data = get_user_data(
+        member,
+        (
+            "heists_joined",
+            "heists_won",
+            "heists_lost",
+            "total_loot_gained",
+            "total_loot_lost",
+            "backstabs",
+            "times_betrayed",
+        ),
+    )
 
     return {
         "heists_joined": user_data.get("heists_joined", 0),
@@ -186,7 +224,7 @@ def heist_stats(member: discord.Member):
 
 def mine_stats(member: discord.Member):
     """Retrieve mining stats for the user, initializing fields if they don't exist."""
-    user_data = get_user_data(member)
+    user_data = get_hot_user_data(member)
 
     return {
         "mining_level": user_data.get("mining_level", 1),
@@ -197,7 +235,7 @@ def mine_stats(member: discord.Member):
 
 def fish_stats(member: discord.Member):
     """Retrieve fishing stats for the user, initializing fields if they don't exist."""
-    user_data = get_user_data(member)
+    user_data = get_hot_user_data(member)
 
     return {
         "fishing_level": user_data.get("fishing_level", 1),
@@ -208,38 +246,60 @@ def fish_stats(member: discord.Member):
 
 def highlow_stats(member: discord.Member):
     """Retrieve highlow stats for the user, initializing fields if they don't exist."""
-    user_data = get_user_data(member)
-
     return {
-        "highlow_won": user_data.get("highlow_won", 0),
-        "highlow_lost": user_data.get("highlow_lost", 0),
-        "highlow_played": user_data.get("highlow_played", 0),
-        "highlow_total_winnings": user_data.get("highlow_total_winnings", 0),
-        "highlow_total_losses": user_data.get("highlow_total_losses", 0),
-        "highlow_biggest_multiplier": user_data.get("highlow_biggest_multiplier", 0),
+        f"highlow_{field}": value
+        for field, value in game_stats(member, "highlow").items()
     }
 
 
 def roulette_stats(member: discord.Member):
     """Retrieve roulette stats for the user, initializing fields if they don't exist."""
-    user_data = get_user_data(member)
-
     return {
-        "roulette_won": user_data.get("roulette_won", 0),
-        "roulette_lost": user_data.get("roulette_lost", 0),
-        "roulette_played": user_data.get("roulette_played", 0),
-        "roulette_total_winnings": user_data.get("roulette_total_winnings", 0),
-        "roulette_total_losses": user_data.get("roulette_total_losses", 0),
+        f"roulette_{field}": value
+        for field, value in game_stats(member, "roulette").items()
     }
 
 
+DUEL_FIELDS = ("win", "lose", "tie", "amount_won", "amount_lost")
+
+
+@uses_index(
+    duel_records,
+    [("user_id", ASCENDING), ("opponent_id", ASCENDING)],
+    query={"user_id": 0},
+    unique=True,
+)
+def duel_totals(user_ids: list) -> dict:
+    """Sum each user's duel records across opponents, in one indexed aggregation."""
+    totals = {}
+    for row in duel_records.aggregate(
+        [
+            {"$match": {"user_id": {"$in": list(user_ids)}}},
+            {
+                "$group": {
+                    "_id": "$user_id",
+                    **{field: {"$sum": f"${field}"} for field in DUEL_FIELDS},
+                }
+            },
+        ]
+    ):
+        totals[row.pop("_id")] = row
+    return totals
+
+
+@uses_index(
+    duel_records,
+    [("user_id", ASCENDING), ("opponent_id", ASCENDING)],
+    query={"user_id": 0, "opponent_id": 0},
+    unique=True,
+)
 def duel_stats(user: discord.User, opponent: discord.User = None):
     """Return duel stats for a user. If opponent is given, return head-to-head."""
-    user_data = get_user_data(user)
-    duel_data = user_data.get("duel_stats", {})
-
     if opponent:
-        vs_stats = duel_data.get(str(opponent.id), {})
+        vs_stats = (
+            duel_records.find_one({"user_id": user.id, "opponent_id": opponent.id})
+            or {}
+        )
         return {
             "wins": vs_stats.get("win", 0),
             "losses": vs_stats.get("lose", 0),
@@ -249,75 +309,38 @@ def duel_stats(user: discord.User, opponent: discord.User = None):
             "amount_lost": vs_stats.get("amount_lost", 0),
         }
     else:
-        wins = losses = ties = amount_won = amount_lost = 0
-        for record in duel_data.values():
-            wins += record.get("win", 0)
-            losses += record.get("lose", 0)
-            ties += record.get("tie", 0)
-            amount_won += record.get("amount_won", 0)
-            amount_lost += record.get("amount_lost", 0)
+        totals = duel_totals([user.id]).get(user.id, {})
+        wins = totals.get("win", 0)
+        losses = totals.get("lose", 0)
+        ties = totals.get("tie", 0)
 
         return {
             "duels_won": wins,
             "duels_lost": losses,
             "duels_tied": ties,
             "duels_played": wins + losses + ties,
-            "total_amount_won": amount_won,
-            "total_amount_lost": amount_lost,
+            "total_amount_won": totals.get("amount_won", 0),
+            "total_amount_lost": totals.get("amount_lost", 0),
         }
 
 
 def all_stats(member: discord.Member):
     user_data = get_user_data(member)
-
-    duel_stats = user_data.get("duel_stats", {})
-    total_duels_won = total_duels_lost = total_amount_won = total_amount_lost = (
-        total_duels_tied
-    ) = total_duels_played = 0
-    for record in duel_stats.values():
-        total_duels_won += record.get("win", 0)
-        total_duels_lost += record.get("lose", 0)
-        total_duels_tied += record.get("tie", 0)
-        total_amount_won += record.get("amount_won", 0)
-        total_amount_lost += record.get("amount_lost", 0)
-
-    total_duels_played = total_duels_won + total_duels_lost + total_duels_tied
+    duels = duel_stats(member)
 
     return {
-        "gamble": {
-            "won": user_data.get("gambles_won", 0),
-            "lost": user_data.get("gambles_lost", 0),
-            "played": user_data.get("gambles_played", 0),
-            "total_winnings": user_data.get("gambles_total_winnings", 0),
-            "total_losses": user_data.get("gambles_total_losses", 0),
-        },
-        "blackjack": {
-            "won": user_data.get("blackjacks_won", 0),
-            "lost": user_data.get("blackjacks_lost", 0),
-            "played": user_data.get("blackjacks_played", 0),
-            "total_winnings": user_data.get("blackjacks_total_winnings", 0),
-            "total_losses": user_data.get("blackjacks_total_losses", 0),
-        },
-        "slots": {
-            "won": user_data.get("slots_won", 0),
-            "lost": user_data.get("slots_lost", 0),
-            "played": user_data.get("slots_played", 0),
-            "total_winnings": user_data.get("slots_total_winnings", 0),
-            "total_losses": user_data.get("slots_total_losses", 0),
-        },
+        "gamble": game_counters(user_data, "gamble"),
+        "blackjack": game_counters(user_data, "blackjack"),
+        "slots": game_counters(user_data, "slots"),
         "duel": {
-            "played": total_duels_played,
-            "won": total_duels_won,
-            "lost": total_duels_lost,
-            "ties": total_duels_tied,
-            "total_amount_won": total_amount_won,
-            "total_amount_lost": total_amount_lost,
-        },
-        "wordle": {
-            "won": user_data.get("wordles_won", 0),
-            "lost": user_data.get("wordles_lost", 0),
-            "played": user_data.get("wordles_played", 0),
+            "played": duels["duels_played"],
+            "won": duels["duels_won"],
+            "lost": duels["duels_lost"],
+            "ties": duels["duels_tied"],
+            "total_amount_won": duels["total_amount_won"],
+            "total_amount_lost": duels["total_amount_lost"],
         },
+        "wordle": game_counters(user_data, "wordle"),
         "heist": {
             "joined": user_data.get("heists_joined", 0),
             "won": user_data.get("heists_won", 0),
@@ -351,21 +374,9 @@ def all_stats(member: discord.Member):
             "fishing_xp": user_data.get("fishing_xp", 0),
             "fishing_next_level_xp": user_data.get("fishing_next_level_xp", 50),
         },
-        "highlow": {
-            "won": user_data.get("highlow_won", 0),
-            "lost": user_data.get("highlow_lost", 0),
-            "played": user_data.get("highlow_played", 0),
-            "total_winnings": user_data.get("highlow_total_winnings", 0),
-            "total_losses": user_data.get("highlow_total_losses", 0),
-            "biggest_multiplier": user_data.get("highlow_biggest_multiplier", 0),
-        },
-        "roulette": {
-            "won": user_data.get("roulette_won", 0),
-            "lost": user_data.get("roulette_lost", 0),
-            "played": user_data.get("roulette_played", 0),
-            "total_winnings": user_data.get("roulette_total_winnings", 0),
-            "total_losses": user_data.get("roulette_total_losses", 0),
-        },
+        "highlow": game_counters(user_data, "highlow"),
+        "roulette": game_counters(user_data, "roulette"),
+        "horserace": game_counters(user_data, "horserace"),
         "player": {
             "hp": user_data.get("player_hp", 100),
             "attack": user_data.get("player_attack", 5),
@@ -380,7 +391,7 @@ def all_stats(member: discord.Member):
 
 def bank_stats(member: discord.Member):
     """Retrieve bank stats for the user, initializing fields if they don't exist."""
-    user_data = get_user_data(member)
+    user_data = get_hot_user_data(member)
     return (
         user_data.get("bank", 0),
         user_data.get("bank_cap", 1000000),
@@ -390,7 +401,18 @@ def bank_stats(member: discord.Member):
 
 def player_stats(member: discord.Member):
     """Retrieve player stats for the user, initializing fields if they don't exist."""
-    user_data = get_user_data(member)
+    user_data = get_user_data(
+        member,
+        (
+            "player_hp",
+            "player_attack",
+            "player_defense",
+            "player_speed",
+            "player_level",
+            "player_xp",
+            "player_next_level_xp",
+        ),
+    )
 
     return {
         "player_hp": user_data.get("player_hp", 100),
@@ -403,14 +425,43 @@ def player_stats(member: discord.Member):
     }
 
 
+def _update_user(
+    user_id: int,
+    update: dict,
+    return_fields: tuple = None,
+    upsert: bool = False,
+    query: dict = None,
+):
+    """Apply an update to a user document.
+
+    With return_fields, the write is a find_one_and_update and those fields
+    of the updated document are returned, so callers don't read them again.
+    An extra query makes the update conditional; None is returned if it
+    doesn't match.
+    """
+    search = {"_id": user_id, **(query or {})}
+    if not return_fields:
+        collection.update_one(search, update, upsert=upsert)
+        return None
+
+    return collection.find_one_and_update(
+        search,
+        update,
+        projection=dict.fromkeys(return_fields, 1),
+        return_document=ReturnDocument.AFTER,
+        upsert=upsert,
+    )
+
+
 def update_user_heist_stats(
     user: discord.User,
     loot_change: int = 0,
     won: bool = False,
     betrayed_others: bool = False,
     was_betrayed: bool = False,
+    return_fields: tuple = None,
 ):
-    user_data = get_user_data(user)
+    user_data = get_user_data(user, ("balance",))
     new_balance = max(0, user_data.get("balance", 0) + loot_change)
 
     update_fields = {
@@ -426,7 +477,9 @@ def update_user_heist_stats(
         },
     }
 
-    collection.update_one({"_id": user.id}, update_fields, upsert=True)
+    updated = _update_user(user.id, update_fields, return_fields, upsert=True)
+    record_balance_change(user.id, new_balance - user_data.get("balance", 0), "heist")
+    return updated
 
 
 def update_user_duel_stats(
@@ -434,35 +487,40 @@ def update_user_duel_stats(
     opponent: discord.User,
     result: str,  # 'win', 'lose', or 'tie'
     balance_change: int = 0,
+    return_fields: tuple = None,
 ):
-    user_data = get_user_data(user)
-    opponent_id = str(opponent.id)
-
-    base_path = f"duel_stats.{opponent_id}"
-    update_query = {"$inc": {f"{base_path}.{result}": 1}}
-
+    record_update = {result: 1}
     if balance_change > 0:
         # User won this amount from the opponent
-        update_query["$inc"][f"{base_path}.amount_won"] = balance_change
-        update_query["$inc"]["balance"] = balance_change
+        record_update["amount_won"] = balance_change
     elif balance_change < 0:
         # User lost this amount to the opponent
-        update_query["$inc"][f"{base_path}.amount_lost"] = abs(balance_change)
-        update_query["$inc"]["balance"] = balance_change  # still apply to balance
+        record_update["amount_lost"] = abs(balance_change)
 
-    collection.update_one({"_id": user.id}, update_query)
+    duel_records.update_one(
+        {"user_id": user.id, "opponent_id": opponent.id},
+        {"$inc": record_update},
+        upsert=True,
+    )
 
+    updated = None
+    if balance_change or return_fields:
+        updated = _update_user(
+            user.id, {"$inc": {"balance": balance_change}}, return_fields
+        )
+    record_balance_change(user.id, balance_change, "duel")
+    return updated
 
-def update_user_steal_stats(
-    user: discord.User,
+
+def steal_stats_update(
     success: bool,
     amount: int,
-    balance: int,
     update_last_steal: bool = False,
     got_stolen: bool = False,
     gained_on_fail: int = 0,
-    update_last_stolen: bool = False,  # NEW PARAM
-):
+    update_last_stolen: bool = False,
+) -> dict:
+    """Build the steal counter update for one side of a steal, without the balance."""
     now = datetime.utcnow()
 
     update_fields = {
@@ -478,46 +536,88 @@ def update_user_steal_stats(
             "times_stolen_from": 1 if got_stolen else 0,
             "amount_gained_from_failed_steals": gained_on_fail if got_stolen else 0,
         },
-        "$set": {
-            "balance": balance,
-        },
     }
 
+    timestamps = {}
     if update_last_steal and not got_stolen:
-        update_fields["$set"]["last_steal"] = now
+        timestamps["last_steal"] = now
 
     if update_last_stolen:
-        update_fields["$set"]["last_stolen"] = now
+        timestamps["last_stolen"] = now
 
-    collection.update_one({"_id": user.id}, update_fields, upsert=True)
+    if timestamps:
+        update_fields["$set"] = timestamps
 
+    return update_fields
 
-def update_user_mine_stats(
-    user: discord.User, xp_gain: int, balance_change: int, user_data: dict
+
+def update_user_steal_stats(
+    user: discord.User,
+    success: bool,
+    amount: int,
+    balance: int,
+    update_last_steal: bool = False,
+    got_stolen: bool = False,
+    gained_on_fail: int = 0,
+    update_last_stolen: bool = False,
+    return_fields: tuple = None,
 ):
-    # user_data = get_user_data(user)
+    update_fields = steal_stats_update(
+        success,
+        amount,
+        update_last_steal=update_last_steal,
+        got_stolen=got_stolen,
+        gained_on_fail=gained_on_fail,
+        update_last_stolen=update_last_stolen,
+    )
+    update_fields.setdefault("$set", {})["balance"] = balance
 
-    current_xp = user_data.get("mining_xp", 0) + xp_gain
-    base_xp = 50
-    exponent = 1.5
+    return _update_user(user.id, update_fields, return_fields, upsert=True)
+
+
+# Mining and fishing levels: level n -> n + 1 costs int(50 * n ** 1.5) XP
+SKILL_BASE_XP = 50
+SKILL_XP_EXPONENT = 1.5
+SKILL_MAX_LEVEL = 199
+
+
+def skill_xp_thresholds() -> list[int]:
+    """Total XP needed to reach each level from 2 up to SKILL_MAX_LEVEL."""
+    thresholds = []
+    total = 0
+    for level in range(1, SKILL_MAX_LEVEL):
+        total += int(SKILL_BASE_XP * (level**SKILL_XP_EXPONENT))
+        thresholds.append(total)
+    return thresholds
 
+
+def skill_level(total_xp: int) -> tuple[int, int]:
+    """Return the mining/fishing level for a total XP and the XP still needed for the next."""
     # Determine new level and total XP needed up to that level
     new_level = 1
     total_xp_required = 0
-    xp_for_next = int(base_xp * (new_level**exponent))
+    xp_for_next = int(SKILL_BASE_XP * (new_level**SKILL_XP_EXPONENT))
 
-    while current_xp >= total_xp_required + xp_for_next:
+    while total_xp >= total_xp_required + xp_for_next:
         total_xp_required += xp_for_next
         new_level += 1
-        xp_for_next = int(base_xp * (new_level**exponent))
+        xp_for_next = int(SKILL_BASE_XP * (new_level**SKILL_XP_EXPONENT))
 
-    # Cap the level at 99
-    new_level = min(new_level, 199)
+    new_level = min(new_level, SKILL_MAX_LEVEL)
 
     # XP needed for next level
-    next_level_xp = int(base_xp * ((new_level) ** exponent))
-    xp_progress = current_xp - total_xp_required
-    xp_needed = next_level_xp - xp_progress
+    next_level_xp = int(SKILL_BASE_XP * (new_level**SKILL_XP_EXPONENT))
+    xp_progress = total_xp - total_xp_required
+    return new_level, next_level_xp - xp_progress
+
+
+def update_user_mine_stats(
+    user: discord.User, xp_gain: int, balance_change: int, user_data: dict
+):
+    # user_data = get_user_data(user)
+
+    current_xp = user_data.get("mining_xp", 0) + xp_gain
+    new_level, xp_needed = skill_level(current_xp)
 
     # Check for rewards if the user leveled up
     reward_message = reward_player_for_level_up(user, new_level, type="mining")
@@ -536,34 +636,16 @@ def update_user_mine_stats(
             },
         },
     )
+    record_balance_change(user.id, balance_change, "mine")
 
     return new_level, current_xp, xp_needed, reward_message
 
 
 def update_user_fish_stats(user: discord.User, xp_gain: int, balance_change: int):
-    user_data = get_user_data(user)
+    user_data = get_hot_user_data(user)
 
     current_xp = user_data.get("fishing_xp", 0) + xp_gain
-    base_xp = 50
-    exponent = 1.5
-
-    # Determine new level and total XP needed up to that level
-    new_level = 1
-    total_xp_required = 0
-    xp_for_next = int(base_xp * (new_level**exponent))
-
-    while current_xp >= total_xp_required + xp_for_next:
-        total_xp_required += xp_for_next
-        new_level += 1
-        xp_for_next = int(base_xp * (new_level**exponent))
-
-    # Cap the level at 99
-    new_level = min(new_level, 199)
-
-    # XP needed for next level
-    next_level_xp = int(base_xp * ((new_level) ** exponent))
-    xp_progress = current_xp - total_xp_required
-    xp_needed = next_level_xp - xp_progress
+    new_level, xp_needed = skill_level(current_xp)
 
     # Check for rewards if the user leveled up
     reward_message = reward_player_for_level_up(user, new_level, type="fishing")
@@ -582,37 +664,11 @@ def update_user_fish_stats(user: discord.User, xp_gain: int, balance_change: int
             },
         },
     )
+    record_balance_change(user.id, balance_change, "fish")
 
     return new_level, current_xp, xp_needed, reward_message
 
 
-def update_user_highlow_stats(
-    user: discord.User,
-    result: str,
-    amount: int = 0,
-    multiplier: float = 0.0,
-):
-    user_data = get_user_data(user)
-    update_fields = {"$inc": {}}
-
-    if result == "win":
-        # Ensure $set exists before using it
-        if "$set" not in update_fields:
-            update_fields["$set"] = {}
-        update_fields["$inc"]["highlow_won"] = 1
-        update_fields["$inc"]["highlow_total_winnings"] = amount
-        update_fields["$set"]["highlow_biggest_multiplier"] = max(
-            user_data.get("highlow_biggest_multiplier", 0), multiplier
-        )
-    elif result == "lose":
-        update_fields["$inc"]["highlow_lost"] = 1
-        update_fields["$inc"]["highlow_total_losses"] = amount
-
-    update_fields["$inc"]["highlow_played"] = 1
-
-    collection.update_one({"_id": user.id}, update_fields)
-
-
 def add_item_to_inventory(
     user,
     item_name,
@@ -622,7 +678,7 @@ def add_item_to_inventory(
     type="tool",
 ):
     # Fetch user data from the database
-    user_data = get_user_data(user)
+    user_data = get_user_data(user, ("inventory",))
     message = ""
 
     # Check if the item already exists in the inventory
@@ -662,7 +718,7 @@ def add_item_to_inventory(
 
 def remove_item_from_inventory(user, item_name, quantity=1):
     # Fetch user data from the database
-    user_data = get_user_data(user)
+    user_data = get_user_data(user, ("inventory",))
 
     # Find the item in the inventory
     for item in user_data["inventory"]:
@@ -682,7 +738,7 @@ def remove_item_from_inventory(user, item_name, quantity=1):
 
 
 def get_user_inventory(user: discord.Member) -> set[str]:
-    user_data = get_user_data(user)
+    user_data = get_user_data(user, ("inventory",))
 
     if not user_data or "inventory" not in user_data:
         return set()
@@ -767,106 +823,373 @@ def update_user_bank_stats(
     level: int,
 ) -> tuple[int, bool]:
     # Fetch user data from the database
-    user_data = get_user_data(user)
+    user_data = get_hot_user_data(user)
 
     # Get current balance, cap, and level (with defaults if not found)
     current_balance = user_data.get("bank", 0)
 
     # Update balance
     new_balance = current_balance + amount
-    collection.update_one({"_id": user.id}, {"$set": {"bank": new_balance}})
-    collection.update_one({"_id": user.id}, {"$set": {"bank_cap": cap}})
-    collection.update_one({"_id": user.id}, {"$set": {"bank_level": level}})
+    collection.update_one(
+        {"_id": user.id},
+        {"$set": {"bank": new_balance, "bank_cap": cap, "bank_level": level}},
+    )
 
     return new_balance, cap, level
 
 
-def update_balance(user: discord.User, amount: int) -> tuple[int, bool]:
+def update_balance(
+    user: discord.User,
+    amount: int,
+    source: str = "update_balance",
+    return_fields: tuple = None,
+) -> tuple[int, bool]:
     # Fetch user data from the database
-    user_data = get_user_data(user)
+    user_data = get_user_data(user, ("balance",))
 
     # Save new balance to the database
-    collection.update_one({"_id": user.id}, {"$set": {"balance": amount}})
+    updated = _update_user(user.id, {"$set": {"balance": amount}}, return_fields)
+    record_balance_change(user.id, amount - user_data["balance"], source)
+    return updated
 
 
-def update_user_slots_stats(
-    user: discord.User,
-    result: str,
-    amount: int = 0,
-):
-    user_data = get_user_data(user)
-    update_fields = {"$inc": {}}
+def _merge_updates(base: dict, extra: dict = None) -> dict:
+    """Combine two update documents operator by operator."""
+    merged = {op: dict(fields) for op, fields in base.items()}
+    for op, fields in (extra or {}).items():
+        merged.setdefault(op, {}).update(fields)
+    return merged
 
-    if result == "win":
-        update_fields["$inc"]["slots_won"] = 1
-        update_fields["$inc"]["slots_total_winnings"] = amount
-    elif result == "lose":
-        update_fields["$inc"]["slots_lost"] = 1
-        update_fields["$inc"]["slots_total_losses"] = amount
-
-    update_fields["$inc"]["slots_played"] = 1
 
-    collection.update_one({"_id": user.id}, update_fields)
-
-
-def update_user_gamble_stats(
-    user: discord.User,
-    result: str,
-    amount: int = 0,
+def transfer_balance(
+    sender: discord.User,
+    receiver: discord.User,
+    amount: int,
+    source: str = "give",
+    sender_update: dict = None,
+    receiver_update: dict = None,
 ):
-    user_data = get_user_data(user)
-    update_fields = {"$inc": {}}
+    """Move money from sender to receiver without creating or destroying any.
+
+    The debit, the credit and the record in the Transfers collection are
+    committed in one transaction. Servers without transaction support fall
+    back to a debit guarded on the sender's balance followed by the credit.
+    sender_update/receiver_update are extra update operators (e.g. stat
+    counters) applied in the same write as each side's balance change.
+
+    Returns (sender_balance, receiver_balance) after the transfer, or None if
+    the sender doesn't have enough money.
+    """
+    global _transactions_supported
+
+    debit = _merge_updates({"$inc": {"balance": -amount}}, sender_update)
+    credit = _merge_updates({"$inc": {"balance": amount}}, receiver_update)
+
+    def apply(session=None):
+        sender_doc = collection.find_one_and_update(
+            {"_id": sender.id, "balance": {"$gte": amount}},
+            debit,
+            projection={"balance": 1},
+            return_document=ReturnDocument.AFTER,
+            session=session,
+        )
+        if sender_doc is None:
+            return None
+
+        receiver_doc = collection.find_one_and_update(
+            {"_id": receiver.id},
+            credit,
+            projection={"balance": 1},
+            return_document=ReturnDocument.AFTER,
+            session=session,
+        )
+        if receiver_doc is None:
+            if session is None:
+                # No transaction to roll back, so refund the debit by hand
+                collection.update_one({"_id": sender.id}, {"$inc": {"balance": amount}})
+            raise ValueError(f"No user document for receiver {receiver.id}")
 
-    if result == "win":
-        update_fields["$inc"]["gambles_won"] = 1
-        update_fields["$inc"]["gambles_total_winnings"] = amount
-    elif result == "lose":
-        update_fields["$inc"]["gambles_lost"] = 1
-        update_fields["$inc"]["gambles_total_losses"] = amount
+        transfers.insert_one(
+            {
+                "from_id": sender.id,
+                "to_id": receiver.id,
+                "amount": amount,
+                "source": source,
+                "at": datetime.utcnow(),
+            },
+            session=session,
+        )
+        return sender_doc["balance"], receiver_doc["balance"]
+
+    balances = None
+    if _transactions_supported:
+        try:
+            with cluster.start_session() as session:
+                balances = session.with_transaction(apply)
+        except OperationFailure as e:
+            # 20 = IllegalOperation: transactions need a replica set or mongos
+            if e.code != 20:
+                raise
+            _transactions_supported = False
 
-    update_fields["$inc"]["gambles_played"] = 1
+    if not _transactions_supported:
+        balances = apply()
 
-    collection.update_one({"_id": user.id}, update_fields)
+    if balances is not None:
+        record_balance_change(sender.id, -amount, source)
+        record_balance_change(receiver.id, amount, source)
+    return balances
 
 
-def update_user_blackjack_stats(
+def record_game_result(
     user: discord.User,
+    game: str,
     result: str,
     amount: int = 0,
+    return_fields: tuple = None,
+    balance_change: int = 0,
+    min_balance: int = None,
+    query: dict = None,
+    extra_update: dict = None,
+    **maxima,
 ):
-    user_data = get_user_data(user)
-    update_fields = {"$inc": {}}
-
+    """Record one finished game as a single blind write.
+
+    result is "win", "lose" or "tie"; amount goes to total_winnings or
+    total_losses accordingly. A balance_change and any extra_update are
+    applied in the same write; with min_balance or a query the whole write
+    only happens if the user document matches, and None is returned
+    otherwise. Extra keyword arguments are kept as running maximums, e.g.
+    biggest_multiplier for highlow. With return_fields the updated fields
+    are returned; pass (f"games.{game}",) and use game_counters to get the
+    footer counters.
+    """
+    prefix = f"games.{game}"
+    increments = {f"{prefix}.played": 1}
     if result == "win":
-        update_fields["$inc"]["blackjacks_won"] = 1
-        update_fields["$inc"]["blackjacks_total_winnings"] = amount
+        increments[f"{prefix}.won"] = 1
+        increments[f"{prefix}.total_winnings"] = amount
     elif result == "lose":
-        update_fields["$inc"]["blackjacks_lost"] = 1
-        update_fields["$inc"]["blackjacks_total_losses"] = amount
+        increments[f"{prefix}.lost"] = 1
+        increments[f"{prefix}.total_losses"] = amount
 
-    update_fields["$inc"]["blackjacks_played"] = 1
+    if balance_change:
+        increments["balance"] = balance_change
 
-    collection.update_one({"_id": user.id}, update_fields)
+    update = {"$inc": increments}
+    if maxima:
+        update["$max"] = {f"{prefix}.{key}": value for key, value in maxima.items()}
+
+    query = dict(query or {})
+    if min_balance is not None:
+        query["balance"] = {"$gte": min_balance}
+    return _update_user(
+        user.id, _merge_updates(update, extra_update), return_fields, query=query
+    )
 
 
-def update_user_roulette_stats(
+def record_game_batch(
     user: discord.User,
-    result: str,
-    amount: int = 0,
+    game: str,
+    won: int,
+    lost: int,
+    played: int,
+    total_winnings: int = 0,
+    total_losses: int = 0,
+    balance_change: int = 0,
+    return_fields: tuple = None,
+    min_balance: int = None,
 ):
-    user_data = get_user_data(user)
-    update_fields = {"$inc": {}}
+    """Record many finished games of one kind, and their net balance change, as one write.
+
+    As with record_game_result, min_balance makes the write conditional on
+    the balance being at least that much, and None is returned if it isn't.
+    """
+    prefix = f"games.{game}"
+    increments = {
+        f"{prefix}.played": played,
+        f"{prefix}.won": won,
+        f"{prefix}.lost": lost,
+        f"{prefix}.total_winnings": total_winnings,
+        f"{prefix}.total_losses": total_losses,
+    }
+    if balance_change:
+        increments["balance"] = balance_change
+    query = {"balance": {"$gte": min_balance}} if min_balance is not None else None
+    return _update_user(user.id, {"$inc": increments}, return_fields, query=query)
+
+
+def _backfill_defaults(doc: dict) -> dict:
+    """Schema 1: add any DEFAULT_USER_DATA field the document is missing."""
+    missing = {
+        key: value
+        for key, value in DEFAULT_USER_DATA.items()
+        if key not in doc and key not in ("_id", "schema_version")
+    }
+    return {"$set": missing}
+
+
+def _nest_game_stats(doc: dict) -> dict:
+    """Schema 2: move the flat per-game counters (gambles_won, ...) into games.<name>."""
+    update = {}
+    for game, prefix in LEGACY_GAME_PREFIXES.items():
+        for field in GAME_STAT_FIELDS[game]:
+            legacy = f"{prefix}_{field}"
+            if legacy not in doc:
+                continue
+            # $inc/$max rather than $set so games recorded meanwhile are kept
+            operator = "$max" if field in GAME_MAXIMUMS else "$inc"
+            update.setdefault(operator, {})[f"games.{game}.{field}"] = doc[legacy]
+            update.setdefault("$unset", {})[legacy] = ""
+    return update
+
+
+def _split_duel_stats(doc: dict) -> dict:
+    """Schema 3: move the duel_stats map into DuelRecords, one document per opponent.
+
+    Each record is flagged as migrated in the same upsert, so a record
+    whose legacy counts were already added hits the unique index instead
+    of being added twice if the step runs again.
+    """
+    ops = [
+        UpdateOne(
+            {
+                "user_id": doc["_id"],
+                "opponent_id": int(opponent_id),
+                "migrated": {"$ne": True},
+            },
+            {
+                "$inc": {field: record.get(field, 0) for field in DUEL_FIELDS},
+                "$set": {"migrated": True},
+            },
+            upsert=True,
+        )
+        for opponent_id, record in doc.get("duel_stats", {}).items()
+        if isinstance(record, dict)
+    ]
+    if ops:
+        try:
+            duel_records.bulk_write(ops, ordered=False)
+        except BulkWriteError as e:
+            if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                raise
+    return {"$unset": {"duel_stats": ""}}
+
+
+# (version, step) pairs in order; each step builds the update from the old document
+_MIGRATIONS = [
+    (1, _backfill_defaults),
+    (2, _nest_game_stats),
+    (3, _split_duel_stats),
+]
+
+
+def _migration_ops(doc: dict) -> list[UpdateOne]:
+    """Build one update per pending step for a document.
+
+    Each update only matches while the document is still below that step's
+    version, so a step is never applied twice, even if two upgrades race.
+    """
+    current = doc.get("schema_version", 0)
+    ops = []
+    for version, step in _MIGRATIONS:
+        if version <= current:
+            continue
+        update = step(doc)
+        update.setdefault("$set", {})["schema_version"] = version
+        ops.append(
+            UpdateOne(
+                {"_id": doc["_id"], "schema_version": {"$not": {"$gte": version}}},
+                update,
+            )
+        )
+    return ops
+
+
+def _upgrade_user(user_id: int):
+    """Bring a single user document up to SCHEMA_VERSION."""
+    doc = collection.find_one({"_id": user_id})
+    ops = _migration_ops(doc) if doc else []
+    if ops:
+        collection.bulk_write(ops, ordered=True)
+
+
+def migrate_user_documents(batch_size: int = 500) -> int:
+    """Upgrade every document below SCHEMA_VERSION, batch_size documents per bulk write.
+
+    Steps for one document run in order (ordered bulk write), and re-running
+    after an interruption picks up where it stopped. Returns the number of
+    documents upgraded.
+    """
+    outdated = {"schema_version": {"$not": {"$gte": SCHEMA_VERSION}}}
+
+    migrated = 0
+    ops = []
+    for doc in collection.find(outdated, batch_size=batch_size):
+        ops.extend(_migration_ops(doc))
+        migrated += 1
+
+        if migrated % batch_size == 0:
+            collection.bulk_write(ops, ordered=True)
+            ops = []
+
+    if ops:
+        collection.bulk_write(ops, ordered=True)
+    return migrated
+
+
+def sync_users(user_ids, chunk_size: int = 1000, progress=None) -> dict:
+    """Create missing user documents and upgrade outdated ones in bulk.
+
+    Each chunk of IDs costs one $in query to find what is missing or below
+    SCHEMA_VERSION, then a single bulk_write. progress(done, total) is called
+    after every chunk. Blocking; run it in a thread from async code.
+    Returns counts of created, upgraded, up_to_date and failed users.
+    """
+    user_ids = list(user_ids)
+    counts = {"created": 0, "upgraded": 0, "up_to_date": 0, "failed": 0}
+
+    for start in range(0, len(user_ids), chunk_size):
+        chunk = user_ids[start : start + chunk_size]
+        try:
+            versions = {
+                doc["_id"]: doc.get("schema_version", 0)
+                for doc in collection.find(
+                    {"_id": {"$in": chunk}}, {"schema_version": 1}
+                )
+            }
+            missing = [user_id for user_id in chunk if user_id not in versions]
+            outdated = [
+                user_id
+                for user_id, version in versions.items()
+                if version < SCHEMA_VERSION
+            ]
+
+            ops = [
+                UpdateOne(
+                    {"_id": user_id},
+                    {"$setOnInsert": {**DEFAULT_USER_DATA, "_id": user_id}},
+                    upsert=True,
+                )
+                for user_id in missing
+            ]
+            if outdated:
+                for doc in collection.find({"_id": {"$in": outdated}}):
+                    ops.extend(_migration_ops(doc))
+            if ops:
+                collection.bulk_write(ops, ordered=True)
 
-    if result == "win":
-        update_fields["$inc"]["roulette_won"] = 1
-        update_fields["$inc"]["roulette_total_winnings"] = amount
-    elif result == "lose":
-        update_fields["$inc"]["roulette_lost"] = 1
-        update_fields["$inc"]["roulette_total_losses"] = amount
+            counts["created"] += len(missing)
+            counts["upgraded"] += len(outdated)
+            counts["up_to_date"] += len(chunk) - len(missing) - len(outdated)
+        except Exception as e:
+            logger.error(f"Failed to sync {len(chunk)} users: {e}")
+            counts["failed"] += len(chunk)
 
-    update_fields["$inc"]["roulette_played"] = 1
+        if progress:
+            progress(min(start + chunk_size, len(user_ids)), len(user_ids))
 
-    collection.update_one({"_id": user.id}, update_fields)
+    return counts
 
 
 # Example XP formula: base 50 XP, +25 per level
@@ -882,8 +1205,15 @@ def update_user_player_stats(
     speed_change: int = 0,
     level_change: int = 0,
     xp_change: int = 0,
+    return_fields: tuple = None,
 ):
-    user_data = get_user_data(user)
+    user_data = get_user_data(
+        user,
+        (
+            "player_level",
+            "player_xp",
+        ),
+    )
     update_fields = {"$inc": {}}
     manual_set_fields = {}
 
@@ -923,11 +1253,11 @@ def update_user_player_stats(
         update_fields["$set"] = manual_set_fields
 
     # Apply update
-    collection.update_one({"_id": user.id}, update_fields)
+    return _update_user(user.id, update_fields, return_fields)
 
 
 def apply_shop_item_effect(user, item_key):
-    user_data = get_user_data(user)
+    user_data = get_hot_user_data(user)
     # Apply effects based on the item purchased
     if item_key == "bank_upgrade":
         current_cap = user_data.get("bank_cap", 1000000)
@@ -0,0 +1,108 @@
+import asyncio
+import re
+import time
+from collections import namedtuple
+
+import aiohttp
+
+APP_DETAILS_URL = "https://store.steampowered.com/api/appdetails"
+APP_REVIEWS_URL = "https://store.steampowered.com/appreviews/{app_id}"
+APP_ID = re.compile(r"/app/(\d+)")
+
+# Store metadata barely changes, and re-posting an update should not refetch it
+CACHE_TTL = 6 * 60 * 60
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=10)
+MAX_TAGS = 5
+
+SteamApp = namedtuple(
+    "SteamApp", "app_id title description tags price reviews review_count image"
+)
+
+_cache: dict[int, tuple[float, SteamApp]] = {}
+
+
+class SteamError(Exception):
+    pass
+
+
+def parse_app_id(link: str) -> int:
+    match = APP_ID.search(link)
+    if not match:
+        raise SteamError(f"{link} is not a Steam store link")
+    return int(match.group(1))
+
+
+def _price(details: dict) -> str:
+    if details.get("is_free"):
+        return "Free"
+    price = details.get("price_overview")
+    if not price:
+        return "N/A"
+    if price.get("discount_percent"):
+        return f"~~{price['initial_formatted']}~~\n{price['final_formatted']}"
+    return price["final_formatted"]
+
+
+async def _get_json(session: aiohttp.ClientSession, url: str, params: dict) -> dict:
+    async with session.get(url, params=params) as response:
+        response.raise_for_status()
+        body = await response.json(content_type=None)
+    # Steam answers unknown or rate-limited lookups with null
+    if not isinstance(body, dict):
+        raise SteamError(f"Steam returned no data for {url}")
+    return body
+
+
+async def fetch_app(link: str) -> SteamApp:
+    """Return store metadata for the app a Steam link points at.
+
+    Uses the store's JSON endpoints rather than scraping the page, fetching
+    details and the review summary concurrently. Results are cached by app
+    ID for CACHE_TTL seconds, so repeat lookups make no request at all.
+    """
+    app_id = parse_app_id(link)
+    cached = _cache.get(app_id)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    async with aiohttp.ClientSession(timeout=REQUEST_TIMEOUT) as session:
+        details, reviews = await asyncio.gather(
+            _get_json(
+                session,
+                APP_DETAILS_URL,
+                {"appids": app_id, "cc": "us", "l": "english"},
+            ),
+            _get_json(
+                session,
+                APP_REVIEWS_URL.format(app_id=app_id),
+                {
+                    "json": 1,
+                    "language": "all",
+                    "purchase_type": "all",
+                    "num_per_page": 0,
+                },
+            ),
+        )
+
+    entry = details.get(str(app_id)) or {}
+    if not entry.get("success"):
+        raise SteamError(f"Steam has no store page for app {app_id}")
+    data = entry["data"]
+    summary = reviews.get("query_summary", {})
+
+    app = SteamApp(
+        app_id=app_id,
+        title=data["name"],
+        description=data.get("short_description", ""),
+        tags=[genre["description"] for genre in data.get("genres", [])][:MAX_TAGS],
+        price=_price(data),
+        reviews=summary.get("review_score_desc", "No user reviews"),
+        review_count=summary.get("total_reviews", 0),
+        image=data.get("header_image"),
+    )
+    now = time.monotonic()
+    # Drop expired entries as new ones come in, so the cache can't grow forever
+    for expired in [key for key, (until, _) in _cache.items() if until <= now]:
+        del _cache[expired]
+    _cache[app_id] = (now + CACHE_TTL, app)
+    return app
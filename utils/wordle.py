@@ -0,0 +1,82 @@
+import random
+from array import array
+
+# Common words that can be the answer
+WORD_LIST = "public/wordle_words.txt"
+# Every word accepted as a guess, answers included
+GUESS_LIST = "public/wordle_guesses.txt"
+WORD_LENGTH = 5
+
+# Per-letter results of a guess
+ABSENT, PRESENT, CORRECT = 0, 1, 2
+
+
+def pack(word: str) -> int:
+    """Pack a lowercase five-letter word into 25 bits, five bits per letter."""
+    code = 0
+    for letter in word:
+        code = (code << 5) | (ord(letter) - 97)
+    return code
+
+
+def unpack(code: int) -> str:
+    letters = []
+    for _ in range(WORD_LENGTH):
+        letters.append(chr((code & 31) + 97))
+        code >>= 5
+    return "".join(reversed(letters))
+
+
+def _read_words(path: str):
+    with open(path) as f:
+        for line in f:
+            word = line.strip().lower()
+            if len(word) == WORD_LENGTH and word.isalpha() and word.isascii():
+                yield word
+
+
+def load_words(path: str = WORD_LIST) -> tuple[frozenset, array]:
+    """Read the bundled answer list into a set and a packed array for picks."""
+    words = frozenset(_read_words(path))
+    return words, array("I", sorted(pack(word) for word in words))
+
+
+def load_guesses(path: str = GUESS_LIST) -> frozenset:
+    return frozenset(_read_words(path))
+
+
+WORDS, PACKED_WORDS = load_words()
+# Answers are always valid guesses, even if the guess list misses one
+VALID_GUESSES = load_guesses() | WORDS
+
+
+def random_word() -> str:
+    return unpack(random.choice(PACKED_WORDS))
+
+
+def is_word(guess: str) -> bool:
+    return guess in VALID_GUESSES
+
+
+def score_guess(guess: str, target: str) -> list[int]:
+    """Score each letter of a guess as CORRECT, PRESENT or ABSENT.
+
+    Letters of the target that were not matched in place are counted once,
+    then spent left to right on the guess, so repeated letters are only
+    marked present as many times as the target still has them.
+    """
+    result = [ABSENT] * WORD_LENGTH
+    remaining = [0] * 26
+    for i in range(WORD_LENGTH):
+        if guess[i] == target[i]:
+            result[i] = CORRECT
+        else:
+            remaining[ord(target[i]) - 97] += 1
+
+    for i in range(WORD_LENGTH):
+        if result[i] == ABSENT:
+            letter = ord(guess[i]) - 97
+            if remaining[letter]:
+                remaining[letter] -= 1
+                result[i] = PRESENT
+    return result